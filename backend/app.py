@@ -5,6 +5,9 @@ import uvicorn
 
 # Import API routers
 from src.api import data_api, knowledge_api, model_api, user_api, predict_api
+from src.services.compute_executor import COMPUTE
+from src.services.report_service import REPORT_JOBS
+from src.services.script_runner import SCRIPT_POOL
 
 # Custom middleware to handle larger request bodies
 class LargeRequestMiddleware(BaseHTTPMiddleware):
@@ -44,6 +47,31 @@ app.include_router(user_api.router, prefix="/users", tags=["users"])
 app.include_router(predict_api.router, prefix="/predict", tags=["predict"])
 
 
+@app.on_event("startup")
+async def preload_models():
+    # Warm the model cache with every deployed experiment's artifact
+    try:
+        loaded = predict_api.preload_deployed_models()
+        print(f"Preloaded {loaded} deployed model(s)")
+    except Exception as e:
+        print(f"Model preload failed: {e}")
+
+
+@app.on_event("startup")
+async def start_script_workers():
+    # Preprocessing scripts run in pre-started sandbox processes; start them before the first request
+    SCRIPT_POOL.start()
+
+
+@app.on_event("shutdown")
+async def stop_workers():
+    # Drop queued training and report jobs and release worker threads and processes
+    model_api.TRAINING_SCHEDULER.shutdown()
+    REPORT_JOBS.shutdown()
+    SCRIPT_POOL.shutdown()
+    COMPUTE.shutdown()
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "DataSwift API"}
@@ -1,12 +1,30 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Query, Response, Body
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query, Request, Response, Body
 from typing import List, Dict, Any, Optional
-from ..services.eda_service import EDAService
+from ..services.eda_service import EDAService, DATASETS
+from ..services.ingest_service import spool_upload, UploadTooLarge
+from ..services.compute_executor import COMPUTE, run_compute
+from ..services.export_service import (
+    ARROW_STREAM_MEDIA_TYPE, accepts_arrow, arrow_available, arrow_stream_bytes,
+    check_export, export_filename, export_media_type,
+)
+from ..services.query_engine import page_response
+from ..services.script_runner import SCRIPT_POOL
+from ..services.pipeline_engine import PIPELINES, check_pipeline
+from ..services.clean_engine import auto_clean
+from ..services.dtype_optimizer import decode_categoricals
+from ..services.parser_engine import check_schema
+from ..services.chart_service import CHART_CACHE, CHART_FORMATS, DEFAULT_BINS, check_chart
+from ..services.report_service import ACTIVE_STATUSES as REPORT_ACTIVE_STATUSES, REPORT_FORMATS, REPORT_JOBS, drop_reports
 from datetime import datetime
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse
 import pandas as pd
+import asyncio
+import json
+import os
+import uuid
 
-# In-memory metadata for datasets
-DATASET_METADATA = {}
+# Dataset metadata lives alongside the data in the dataset store
+DATASET_METADATA = DATASETS.metadata
 
 router = APIRouter()
 
@@ -23,317 +41,528 @@ async def get_data_endpoints():
     }
 
 @router.post("/upload")
-async def upload_data(file: UploadFile = File(...)):
-    """Upload data file (CSV) and return dataset_id"""
+async def upload_data(file: UploadFile = File(...), pipeline: Optional[str] = Query(None),
+                      schema: Optional[str] = Query(None)):
+    """
+    Upload data file (CSV, Excel, JSON, JSON lines, Parquet or Arrow) and return dataset_id; `pipeline` replays a saved pipeline on it.
+    `schema`: JSON column type hints for CSV, e.g. {"price": "float", "day": "datetime"};
+    hinted columns are parsed as that type instead of inferred.
+    """
+    path = None
     try:
-        # Check file size (limit to 50MB)
-        file_bytes = await file.read()
-        if len(file_bytes) > 50 * 1024 * 1024:  # 50MB limit
-            raise HTTPException(status_code=413, detail="File size exceeds 50MB limit")
-        
-        dataset_id = EDAService.upload_dataset(file_bytes, file.filename)
+        steps = _saved_pipeline_steps(pipeline) if pipeline else None
+        hints = check_schema(json.loads(schema)) if schema else None
+        # Spool the upload to disk in chunks; streamable formats (CSV, JSON lines, Parquet,
+        # Arrow) are not size capped, Excel/JSON documents keep the buffered upload limit
+        path, size, digest = await spool_upload(file)
+        # Identical bytes reuse the already parsed dataset (see upload_dataset_file)
+        dataset_id, ingest = await run_compute("upload", EDAService.upload_dataset_file, path, file.filename, digest, hints)
         
         # Store metadata
         DATASET_METADATA[dataset_id] = {
             "dataset_id": dataset_id,
             "filename": file.filename,
-            "size": len(file_bytes),
+            "size": size,
+            "sha256": digest,
+            # Parsed vs stored (dtype-optimized) in-memory size
+            "memory": ingest["memory"],
             "upload_date": datetime.utcnow().isoformat(),
             "status": "ready"
         }
         
-        return {"dataset_id": dataset_id, "filename": file.filename}
+        response = {"dataset_id": dataset_id, "filename": file.filename, **ingest}
+        if steps is not None:
+            # The upload is kept even if the pipeline fails on it
+            try:
+                response["pipeline"] = await run_compute("pipeline", EDAService.run_pipeline, dataset_id, steps)
+            except Exception as e:
+                response["pipeline_error"] = str(e)
+        return response
     except HTTPException:
         raise
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        if path is not None:
+            os.remove(path)
 
-@router.get("/list")
-async def list_datasets():
-    """List all uploaded datasets (in memory)"""
-    from ..services.eda_service import DATASETS
+def _list_datasets():
+    """Blocking part of /list, run on the compute executor"""
     datasets = []
     for dataset_id, metadata in DATASET_METADATA.items():
-        df = DATASETS.get(dataset_id)
-        if df is not None:
-            # Map pandas dtypes to frontend-friendly types
-            def map_dtype(dtype):
-                if pd.api.types.is_numeric_dtype(dtype):
-                    return 'number'
-                elif pd.api.types.is_datetime64_any_dtype(dtype):
-                    return 'date'
-                elif pd.api.types.is_bool_dtype(dtype):
-                    return 'boolean'
-                else:
-                    return 'string'
-            
-            dataset_info = {
-                **metadata,
-                "features": list(df.columns),
-                "types": {col: map_dtype(dtype) for col, dtype in df.dtypes.items()}
-            }
-            datasets.append(dataset_info)
+        if dataset_id not in DATASETS:
+            continue
+        # Column names/types are memoized per dataset version and come from the
+        # store's schema, so listing does not open or decode any dataset
+        dataset_info = {
+            **metadata,
+            "version": DATASETS.version(dataset_id),
+            **EDAService.dataset_columns(dataset_id),
+        }
+        datasets.append(dataset_info)
     return datasets
 
+@router.get("/list")
+async def list_datasets():
+    """List all uploaded datasets (in memory)"""
+    return await run_compute("list", _list_datasets)
+
+def _wants_arrow(request: Request) -> bool:
+    """Content negotiation: Arrow IPC for clients that ask for it (when pyarrow is installed), else JSON"""
+    return accepts_arrow(request.headers.get("accept")) and arrow_available()
+
+def _analysis_table_arrow(dataset_id: str, mode: str, table: str) -> bytes:
+    tables = EDAService.analysis_tables(dataset_id, mode)
+    if table not in tables:
+        raise ValueError(f"Unknown table: {table}. Use one of {', '.join(tables)}")
+    return arrow_stream_bytes(tables[table])
+
 @router.get("/analyze")
-async def analyze_data(dataset_id: str = Query(...)):
-    """Analyze uploaded data and return EDA results"""
+async def analyze_data(request: Request, dataset_id: str = Query(...), mode: str = Query('exact'),
+                       table: str = Query('preview')):
+    """
+    Analyze uploaded data and return EDA results (mode=approx uses sketches with error bounds).
+    With `Accept: application/vnd.apache.arrow.stream` one section is returned as an Arrow
+    IPC stream instead: table=preview|summary|missing|dtypes|correlation.
+    """
     try:
-        result = EDAService.analyze_dataset(dataset_id)
+        if _wants_arrow(request):
+            body = await run_compute("analyze", _analysis_table_arrow, dataset_id, mode, table)
+            return Response(content=body, media_type=ARROW_STREAM_MEDIA_TYPE)
+        result = await run_compute("analyze", EDAService.analyze_dataset, dataset_id, mode)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+def _query_rows(dataset_id: str, arrow: bool, **query):
+    result = EDAService.query_rows(dataset_id, **query)
+    if arrow:
+        return result, arrow_stream_bytes(result["frame"])
+    return result, page_response(result)
+
+@router.get("/rows")
+async def query_rows(request: Request, dataset_id: str = Query(...), offset: int = Query(0), limit: int = Query(100),
+                     cursor: Optional[str] = Query(None), columns: Optional[str] = Query(None),
+                     filter: List[str] = Query([]), sort: Optional[str] = Query(None), count: bool = Query(False)):
+    """
+    Page through a dataset server-side. `columns=a,b` projects, `filter=col:op:value` (repeatable,
+    ANDed; op in eq|ne|lt|le|gt|ge|in|contains|isnull|notnull) filters, `sort=a,-b` orders.
+    Follow `next_cursor` for the next page. With an Arrow Accept header the rows come back as
+    an Arrow IPC stream and the paging fields as X- headers.
+    """
+    try:
+        arrow = _wants_arrow(request)
+        result, body = await run_compute("rows", _query_rows, dataset_id, arrow, filters=filter, sort=sort,
+                                         columns=columns, offset=offset, limit=limit, cursor=cursor, count=count)
+        if not arrow:
+            return body
+        headers = {"X-Returned-Rows": str(result["returned"]), "X-Has-More": str(result["has_more"]).lower()}
+        if result["next_cursor"]:
+            headers["X-Next-Cursor"] = result["next_cursor"]
+        if result["total"] is not None:
+            headers["X-Total-Count"] = str(result["total"])
+        return Response(content=body, media_type=ARROW_STREAM_MEDIA_TYPE, headers=headers)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/visualize")
-async def visualize_data(dataset_id: str = Query(...), column: Optional[str] = Query(None)):
-    """Generate data visualizations (histogram) and return as PNG image"""
+async def visualize_data(dataset_id: str = Query(...), column: Optional[str] = Query(None),
+                         format: str = Query('png'), bins: int = Query(DEFAULT_BINS), binning: str = Query('fixed')):
+    """
+    Chart of a column (histogram, or category counts for non-numeric columns) as PNG or SVG.
+    format=json returns the binned data instead, for the frontend to draw itself.
+    binning=adaptive uses equal-frequency instead of equal-width histogram bins.
+    """
     try:
-        img_bytes = EDAService.visualize_dataset(dataset_id, column)
-        return Response(content=img_bytes, media_type="image/png")
+        check_chart(format, bins)
+        if format == 'json':
+            return await run_compute("visualize", EDAService.chart_data, dataset_id, column, bins, binning)
+        img_bytes = await run_compute("visualize", EDAService.visualize_dataset, dataset_id, column, format,
+                                      bins, binning)
+        return Response(content=img_bytes, media_type=CHART_FORMATS[format])
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+def _export_response(dataset_id: str, format: str, compression: Optional[str], filename_stem: str) -> StreamingResponse:
+    """Stream a dataset in chunks (csv, jsonl, parquet or arrow, optionally gzip/zstd compressed)"""
+    check_export(format, compression)
+    # export_chunks is a generator, so the dataset is opened and serialized on worker threads
+    chunks = COMPUTE.stream("export", EDAService.export_chunks(dataset_id, format, compression))
+    return StreamingResponse(chunks, media_type=export_media_type(format, compression), headers={
+        'Content-Disposition': f'attachment; filename="{export_filename(filename_stem, format, compression)}"'
+    })
+
 @router.get("/export")
-async def export_data(dataset_id: str = Query(...)):
-    """Export processed data as CSV"""
+async def export_data(dataset_id: str = Query(...), format: str = Query('csv'), compression: Optional[str] = Query(None)):
+    """Export processed data as CSV, JSON lines, Parquet or Arrow (streamed, optional gzip/zstd)"""
     try:
-        csv_bytes = EDAService.export_dataset(dataset_id)
-        return Response(content=csv_bytes, media_type="text/csv")
+        if dataset_id not in DATASETS:
+            raise ValueError("Dataset not found")
+        return _export_response(dataset_id, format, compression, f"dataset_{dataset_id}")
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+# Seconds between progress checks while waiting on a report job
+REPORT_POLL_SECONDS = 0.25
+
+def _report_file_response(job: Dict[str, Any]) -> FileResponse:
+    path = REPORT_JOBS.path(job["job_id"])
+    if not os.path.exists(path):
+        raise ValueError("Report is no longer available, generate it again")
+    return FileResponse(path, media_type=REPORT_FORMATS[job["format"]],
+                        filename=f"eda_report_{job['dataset_id']}.{job['format']}")
+
+async def _wait_for_report(job_id: str) -> Dict[str, Any]:
+    while True:
+        job = REPORT_JOBS.get(job_id)
+        if job is None:
+            raise ValueError("Report job not found")
+        if job["status"] not in REPORT_ACTIVE_STATUSES:
+            return job
+        await asyncio.sleep(REPORT_POLL_SECONDS)
+
 @router.get("/export_report")
 async def export_report(dataset_id: str = Query(...), format: str = Query('html')):
-    """Export EDA report as PDF or HTML"""
+    """Export EDA report as PDF or HTML (waits for the background job; reused until the data changes)"""
     try:
-        report_bytes = EDAService.export_report(dataset_id, format)
-        if format == 'pdf':
-            return Response(content=report_bytes, media_type='application/pdf', headers={
-                'Content-Disposition': f'attachment; filename="eda_report_{dataset_id}.pdf"'
-            })
-        else:
-            return Response(content=report_bytes, media_type='text/html', headers={
-                'Content-Disposition': f'attachment; filename="eda_report_{dataset_id}.html"'
-            })
+        job = await _wait_for_report(REPORT_JOBS.submit(dataset_id, format)["job_id"])
+        if job["status"] != "completed":
+            raise ValueError(job["error"])
+        return _report_file_response(job)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/report")
+async def start_report(dataset_id: str = Query(...), format: str = Query('html')):
+    """Start generating an EDA report in the background; returns the job (already completed if cached)"""
+    try:
+        return REPORT_JOBS.submit(dataset_id, format)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/report/stats")
+async def report_stats():
+    """Report job counters"""
+    return REPORT_JOBS.stats()
+
+@router.get("/report/{job_id}")
+async def report_status(job_id: str):
+    """Status and progress of a report job"""
+    job = REPORT_JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
+
+@router.get("/report/{job_id}/events")
+async def report_events(job_id: str):
+    """Server-sent events with the job's progress, until it completes or fails"""
+    if REPORT_JOBS.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+
+    async def events():
+        revision = None
+        while True:
+            job = REPORT_JOBS.get(job_id)
+            if job is None:
+                return
+            if job["revision"] != revision:
+                revision = job["revision"]
+                event = "progress" if job["status"] in REPORT_ACTIVE_STATUSES else job["status"]
+                yield f"event: {event}\ndata: {json.dumps(job)}\n\n"
+            if job["status"] not in REPORT_ACTIVE_STATUSES:
+                return
+            await asyncio.sleep(REPORT_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.get("/report/{job_id}/download")
+async def download_report(job_id: str):
+    """The finished report file"""
+    job = REPORT_JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    try:
+        return _report_file_response(job)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _preprocess_dataset(dataset_id: str, script: str):
+    """Blocking part of /preprocess, run on the compute executor"""
+    from ..services.eda_service import DATASETS
+    if dataset_id not in DATASETS:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    # The script runs in a sandboxed worker process with CPU, wall-time and memory limits
+    try:
+        columns = EDAService.run_script(dataset_id, script)
+        return {"success": True, "message": "Preprocessing complete.", "columns": columns}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Script error: {str(e)}")
+
 @router.post("/preprocess")
 async def preprocess_data(dataset_id: str = Query(...), script: str = Body(...)):
     """Run a preprocessing script on the dataset and update it in memory."""
     try:
-        from ..services.eda_service import DATASETS
-        import pandas as pd
-        df = DATASETS.get(dataset_id)
-        if df is None:
-            raise HTTPException(status_code=404, detail="Dataset not found")
-        # Define a safe namespace for script execution
-        local_vars = {"df": df.copy(), "pd": pd}
+        return await run_compute("preprocess", _preprocess_dataset, dataset_id, script)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _clean_dataset(dataset_id: str, method: str, options: Optional[dict]):
+    """Blocking part of /clean, run on the compute executor"""
+    from ..services.eda_service import DATASETS
+    df = DATASETS.get(dataset_id)
+    if df is None:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    if method == "auto":
+        # Text stored as categoricals is cleaned as parsed text (e.g. numbers in quotes become numbers)
+        cleaned, report = auto_clean(decode_categoricals(df)[0])
+        columns = EDAService.replace_dataset(dataset_id, cleaned)
+        return {"success": True, "message": "Auto clean complete.", "columns": columns, "report": report}
+    elif method == "manual":
+        # Manual cleaning: execute user script
+        script = options.get('script') if options else None
+        if not script:
+            raise HTTPException(status_code=400, detail="No script provided for manual cleaning.")
         try:
-            exec(script, {}, local_vars)
-            new_df = local_vars.get("df")
-            if not isinstance(new_df, pd.DataFrame):
-                raise ValueError("Script must assign the processed DataFrame back to variable 'df'.")
-            DATASETS[dataset_id] = new_df
-            return {"success": True, "message": "Preprocessing complete."}
+            columns = EDAService.run_script(dataset_id, script)
+            return {"success": True, "message": "Manual cleaning complete.", "columns": columns}
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Script error: {str(e)}")
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    else:
+        raise HTTPException(status_code=400, detail="Unknown cleaning method.")
 
 @router.post("/clean")
 async def clean_data(dataset_id: str = Query(...), method: str = Query("auto"), options: dict = Body(None)):
     """Clean the dataset using auto or manual method."""
     try:
-        from ..services.eda_service import DATASETS
-        import pandas as pd
-        import numpy as np
-        import re
-        df = DATASETS.get(dataset_id)
-        if df is None:
-            raise HTTPException(status_code=404, detail="Dataset not found")
-        if method == "auto":
-            # 1. Remove columns/rows with >50% missing
-            thresh_col = int(0.5 * len(df))
-            df = df.dropna(axis=1, thresh=thresh_col)
-            thresh_row = int(0.5 * len(df.columns))
-            df = df.dropna(axis=0, thresh=thresh_row)
-            # 2. Fill missing values
-            for col in df.columns:
-                if pd.api.types.is_numeric_dtype(df[col]):
-                    df[col] = df[col].fillna(df[col].median())
-                else:
-                    mode = df[col].mode()
-                    if not mode.empty:
-                        df[col] = df[col].fillna(mode[0])
-                    else:
-                        df[col] = df[col].fillna('')
-            # 3. Type detection/conversion
-            for col in df.columns:
-                try:
-                    df[col] = pd.to_numeric(df[col])
-                except:
-                    try:
-                        df[col] = pd.to_datetime(df[col])
-                    except:
-                        pass
-            # 4. Remove duplicates
-            df = df.drop_duplicates()
-            # 5. Outlier removal (IQR, numeric columns)
-            for col in df.select_dtypes(include=[np.number]).columns:
-                Q1 = df[col].quantile(0.25)
-                Q3 = df[col].quantile(0.75)
-                IQR = Q3 - Q1
-                mask = (df[col] >= Q1 - 1.5 * IQR) & (df[col] <= Q3 + 1.5 * IQR)
-                df = df[mask]
-            # 6. Whitespace/case normalization
-            for col in df.select_dtypes(include=[object]).columns:
-                df[col] = df[col].astype(str).str.strip().str.lower()
-            # 7. Column name standardization
-            df.columns = [re.sub(r'[^a-zA-Z0-9_]', '', c.replace(' ', '_')).lower() for c in df.columns]
-            # 8. One-hot encoding for categoricals
-            cat_cols = df.select_dtypes(include=[object]).columns
-            if len(cat_cols) > 0:
-                df = pd.get_dummies(df, columns=cat_cols, drop_first=True)
-            # 9. Basic error correction (stub: remove invalid datetimes)
-            for col in df.columns:
-                if pd.api.types.is_datetime64_any_dtype(df[col]):
-                    df = df[~df[col].isna()]
-            DATASETS[dataset_id] = df.reset_index(drop=True)
-            return {"success": True, "message": "Auto clean complete."}
-        elif method == "manual":
-            # Manual cleaning: execute user script
-            script = options.get('script') if options else None
-            if not script:
-                raise HTTPException(status_code=400, detail="No script provided for manual cleaning.")
-            local_vars = {"df": df.copy(), "pd": pd}
-            try:
-                exec(script, {}, local_vars)
-                new_df = local_vars.get("df")
-                if not isinstance(new_df, pd.DataFrame):
-                    raise ValueError("Script must assign the processed DataFrame back to variable 'df'.")
-                DATASETS[dataset_id] = new_df
-                return {"success": True, "message": "Manual cleaning complete."}
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"Script error: {str(e)}")
-        else:
-            raise HTTPException(status_code=400, detail="Unknown cleaning method.")
+        return await run_compute("clean", _clean_dataset, dataset_id, method, options)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.post("/split")
-async def split_dataset(dataset_id: str = Body(...), train_ratio: float = Body(...)):
+def _saved_pipeline_steps(name: str) -> List[Dict[str, Any]]:
+    record = PIPELINES.get(name)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Pipeline not found: {name}")
+    return record["steps"]
+
+def _pipeline_steps(spec: dict) -> List[Dict[str, Any]]:
+    """Steps of an inline spec ({"steps": [...]}) or of a saved one ({"pipeline": name})"""
+    if "pipeline" in spec:
+        return _saved_pipeline_steps(spec["pipeline"])
+    return check_pipeline(spec)
+
+@router.post("/pipeline")
+async def run_pipeline(dataset_id: str = Query(...), spec: dict = Body(...)):
     """
-    Split the dataset into train and test sets and store them in memory.
-    Returns new dataset IDs for train and test sets and their sizes.
+    Run a transformation pipeline (impute, cast, dedupe, filter, encode, scale steps) on the
+    dataset and store the result. Filters run first on just the columns they reference and
+    each column's steps are fused into one pass over the surviving rows.
     """
+    try:
+        steps = _pipeline_steps(spec)
+        if dataset_id not in DATASETS:
+            raise HTTPException(status_code=404, detail="Dataset not found")
+        return await run_compute("pipeline", EDAService.run_pipeline, dataset_id, steps)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/pipeline/plan")
+async def plan_pipeline(dataset_id: str = Query(...), spec: dict = Body(...)):
+    """Explain how a pipeline would run on the dataset, without running it"""
+    try:
+        steps = _pipeline_steps(spec)
+        if dataset_id not in DATASETS:
+            raise HTTPException(status_code=404, detail="Dataset not found")
+        return await run_compute("pipeline", EDAService.plan_pipeline, dataset_id, steps)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/pipelines")
+async def list_pipelines():
+    """Saved pipelines"""
+    return {"pipelines": PIPELINES.entries()}
+
+@router.put("/pipelines/{name}")
+async def save_pipeline(name: str, spec: dict = Body(...)):
+    """Save (or replace) a named pipeline for replaying on other datasets and new uploads"""
+    try:
+        return PIPELINES.save(name, spec)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/pipelines/{name}")
+async def get_pipeline(name: str):
+    try:
+        record = PIPELINES.get(name)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if record is None:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+    return record
+
+@router.delete("/pipelines/{name}")
+async def delete_pipeline(name: str):
+    try:
+        deleted = PIPELINES.delete(name)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+    return {"success": True}
+
+def _split_dataset(dataset_id: str, train_ratio: Optional[float], method: str, ratios: Optional[Dict[str, float]],
+                   column: Optional[str], folds: int, seed: int):
+    """Blocking part of /split, run on the compute executor"""
     from ..services.eda_service import DATASETS
-    import numpy as np
-    import pandas as pd
-    import uuid
 
-    df = DATASETS.get(dataset_id)
-    if df is None:
+    if dataset_id not in DATASETS:
         raise HTTPException(status_code=404, detail="Dataset not found")
+    if ratios is None and train_ratio is not None:
+        ratios = {"train": train_ratio, "test": 1 - train_ratio}
+    try:
+        parts = EDAService.split_dataset(dataset_id, method=method, ratios=ratios, column=column, folds=folds, seed=seed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    # Shuffle and split
-    df_shuffled = df.sample(frac=1, random_state=42).reset_index(drop=True)
-    train_size = int(len(df_shuffled) * train_ratio)
-    train_df = df_shuffled.iloc[:train_size]
-    test_df = df_shuffled.iloc[train_size:]
-
-    # Store new datasets
-    train_id = str(uuid.uuid4())
-    test_id = str(uuid.uuid4())
-    DATASETS[train_id] = train_df
-    DATASETS[test_id] = test_df
-
-    # Optionally, update DATASET_METADATA if you want them to appear in /list
-    from datetime import datetime
-    DATASET_METADATA[train_id] = {
-        "dataset_id": train_id,
-        "filename": f"train_{dataset_id}.csv",
-        "size": len(train_df),
-        "upload_date": datetime.utcnow().isoformat(),
-        "status": "split-train"
-    }
-    DATASET_METADATA[test_id] = {
-        "dataset_id": test_id,
-        "filename": f"test_{dataset_id}.csv",
-        "size": len(test_df),
-        "upload_date": datetime.utcnow().isoformat(),
-        "status": "split-test"
-    }
+    split_id = uuid.uuid4().hex
+    for name, part in parts.items():
+        DATASET_METADATA[part["dataset_id"]] = {
+            "dataset_id": part["dataset_id"],
+            "filename": f"{name}_{dataset_id}.csv",
+            "size": part["rows"],
+            "upload_date": datetime.utcnow().isoformat(),
+            "status": f"split-{name.split('_')[-1]}",
+            "parent_dataset_id": dataset_id,
+            "split_id": split_id,
+        }
+    # download_train/download_test on the parent serve its latest split
+    info = DATASET_METADATA.get(dataset_id)
+    if info is not None:
+        DATASET_METADATA[dataset_id] = {**info, "latest_split": {name: part["dataset_id"] for name, part in parts.items()}}
 
-    return {
-        "train_dataset_id": train_id,
-        "test_dataset_id": test_id,
-        "train_size": len(train_df),
-        "test_size": len(test_df)
-    }
+    response = {"split_id": split_id, "method": method, "parts": parts}
+    if method == "kfold":
+        response["folds"] = [{
+            "fold": fold,
+            "train_dataset_id": parts[f"fold{fold}_train"]["dataset_id"],
+            "test_dataset_id": parts[f"fold{fold}_test"]["dataset_id"],
+            "train_size": parts[f"fold{fold}_train"]["rows"],
+            "test_size": parts[f"fold{fold}_test"]["rows"],
+        } for fold in range(folds)]
+    else:
+        for name, part in parts.items():
+            response[f"{name}_dataset_id"] = part["dataset_id"]
+            response[f"{name}_size"] = part["rows"]
+    return response
+
+@router.post("/split")
+async def split_dataset(dataset_id: str = Body(...), train_ratio: Optional[float] = Body(None),
+                        method: str = Body("random"), ratios: Optional[Dict[str, float]] = Body(None),
+                        column: Optional[str] = Body(None), folds: int = Body(5), seed: int = Body(42)):
+    """
+    Split the dataset into train/test (or train/val/test via `ratios`, or k folds) parts.
+    method: random, stratified/group/time (by `column`) or kfold. Each part is a new
+    dataset id stored as row positions over the parent; rows are only materialized
+    when a part is read (exported, analyzed, trained on).
+    """
+    return await run_compute("split", _split_dataset, dataset_id, train_ratio, method, ratios, column, folds, seed)
 
 @router.delete("/delete")
 async def delete_dataset(dataset_id: str = Query(...)):
     """Delete a dataset by dataset_id (in memory)"""
     try:
-        from ..services.eda_service import DATASETS
+        from ..services.eda_service import DATASETS, EDA_RESULTS
         if dataset_id in DATASETS:
             del DATASETS[dataset_id]
         if dataset_id in DATASET_METADATA:
             del DATASET_METADATA[dataset_id]
+        EDA_RESULTS.pop(dataset_id, None)
+        CHART_CACHE.drop_dataset(dataset_id)
+        drop_reports(dataset_id)
         return {"success": True}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/store/stats")
+async def store_stats():
+    """Dataset store memory usage and eviction/reload counters"""
+    return DATASETS.stats()
+
+@router.get("/compute/stats")
+async def compute_stats():
+    """Compute executor pool sizes and per-endpoint concurrency/latency counters"""
+    return COMPUTE.stats()
+
+@router.get("/scripts/stats")
+async def script_stats():
+    """Script sandbox pool size, limits and outcome counters"""
+    return SCRIPT_POOL.stats()
+
+@router.get("/charts/stats")
+async def chart_stats():
+    """Rendered chart cache size and hit/miss counters"""
+    return CHART_CACHE.stats()
+
 @router.get("/correlation")
-async def correlation_matrix(dataset_id: str = Query(...)):
-    """Return correlation matrix for numeric columns of the dataset"""
+async def correlation_matrix(request: Request, dataset_id: str = Query(...)):
+    """Return correlation matrix for numeric columns of the dataset (JSON, or Arrow IPC if accepted)"""
     try:
-        result = EDAService.correlation_matrix(dataset_id)
+        if _wants_arrow(request):
+            body = await run_compute("correlation", _analysis_table_arrow, dataset_id, 'exact', 'correlation')
+            return Response(content=body, media_type=ARROW_STREAM_MEDIA_TYPE)
+        result = await run_compute("correlation", EDAService.correlation_matrix, dataset_id)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/outliers")
-async def outliers(dataset_id: str = Query(...)):
+async def outliers(dataset_id: str = Query(...), mode: str = Query('exact')):
     """Return outlier info for numeric columns of the dataset"""
     try:
-        result = EDAService.detect_outliers(dataset_id)
+        result = await run_compute("outliers", EDAService.detect_outliers, dataset_id, mode)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/insights")
-async def insights(dataset_id: str = Query(...)):
+async def insights(dataset_id: str = Query(...), mode: str = Query('exact')):
     """Return AI-generated insights for the dataset"""
     try:
-        result = EDAService.generate_insights(dataset_id)
+        result = await run_compute("insights", EDAService.generate_insights, dataset_id, mode)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+def _split_part(dataset_id: str, part: str) -> str:
+    """A dataset's latest split part of that name, or the dataset itself (e.g. already a split part)"""
+    info = DATASET_METADATA.get(dataset_id) or {}
+    if info.get("parent_dataset_id"):
+        return dataset_id
+    return info.get("latest_split", {}).get(part, dataset_id)
+
 @router.get("/download_train")
-async def download_train(dataset_id: str = Query(...)):
-    """Download the training split as CSV"""
-    from ..services.eda_service import DATASETS
-    df = DATASETS.get(dataset_id)
-    if df is None:
+async def download_train(dataset_id: str = Query(...), format: str = Query('csv'), compression: Optional[str] = Query(None)):
+    """Download the training split (CSV by default, streamed)"""
+    dataset_id = _split_part(dataset_id, "train")
+    if dataset_id not in DATASETS:
         raise HTTPException(status_code=404, detail="Train dataset not found")
-    import io
-    buf = io.BytesIO()
-    df.to_csv(buf, index=False)
-    buf.seek(0)
-    return Response(content=buf.read(), media_type="text/csv")
+    try:
+        return _export_response(dataset_id, format, compression, f"train_{dataset_id}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/download_test")
-async def download_test(dataset_id: str = Query(...)):
-    """Download the test split as CSV"""
-    from ..services.eda_service import DATASETS
-    df = DATASETS.get(dataset_id)
-    if df is None:
+async def download_test(dataset_id: str = Query(...), format: str = Query('csv'), compression: Optional[str] = Query(None)):
+    """Download the test split (CSV by default, streamed)"""
+    dataset_id = _split_part(dataset_id, "test")
+    if dataset_id not in DATASETS:
         raise HTTPException(status_code=404, detail="Test dataset not found")
-    import io
-    buf = io.BytesIO()
-    df.to_csv(buf, index=False)
-    buf.seek(0)
-    return Response(content=buf.read(), media_type="text/csv")
+    try:
+        return _export_response(dataset_id, format, compression, f"test_{dataset_id}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -4,16 +4,22 @@ from typing import List, Dict, Any
 from ..models.db import db, USE_MONGO
 import os
 import pandas as pd # For batch predict demo
-import time # For training demo
-import pickle
 from ..services.eda_service import EDAService, DATASETS
+from ..services.ingest_service import read_dataframe, spool_upload
+from ..services.compute_executor import run_compute
+from ..services.inference_service import ConstantModel, predict_frame, prediction_records
+from ..services.model_registry import MODEL_REGISTRY
+from ..services.training_service import TRAINING_SCHEDULER, TrainingQueueFull
+from .predict_api import load_deployed_model
 from bson import ObjectId
 import json
 import io
+import logging
 import random
 import math
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 def clean_nans(obj):
     if isinstance(obj, float) and (math.isnan(obj) or math.isinf(obj)):
@@ -32,12 +38,13 @@ def clean_nans(obj):
 @router.post("/upload")
 async def upload_dataset(file: UploadFile = File(...)):
     """Upload a dataset"""
+    path = None
     try:
-        # Read file content
-        content = await file.read()
+        # Spool file content to disk
+        path, _, digest = await spool_upload(file)
         
         # Upload to EDA service
-        dataset_id = EDAService.upload_dataset(content, file.filename)
+        dataset_id, _ = await run_compute("upload", EDAService.upload_dataset_file, path, file.filename, digest)
         
         return {
             "success": True,
@@ -46,6 +53,9 @@ async def upload_dataset(file: UploadFile = File(...)):
         }
     except Exception as e:
         return {"success": False, "error": str(e)}
+    finally:
+        if path is not None:
+            os.remove(path)
 
 @router.post("/experiments")
 async def create_experiment(payload: Dict[str, Any]):
@@ -111,13 +121,45 @@ async def delete_experiment(experiment_id: str):
             db.experiments.delete_one({"_id": obj_id})
         else:
             db.experiments.delete_one({"_id": experiment_id})
+        MODEL_REGISTRY.evict(experiment_id)
         return {"success": True}
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid experiment ID: {e}")
 
+def _training_source(dataset_id: str):
+    """What a training worker reads: the dataset's column directory when stored on disk, else the frame"""
+    if dataset_id not in DATASETS:
+        raise ValueError(f"Dataset {dataset_id} not found")
+    if hasattr(DATASETS, "dataset_dir"):
+        return DATASETS.dataset_dir(dataset_id)
+    return DATASETS[dataset_id]
+
+def _record_training_update(query: Dict[str, Any]):
+    """
+    Build the scheduler callback that mirrors job status changes onto the experiment record.
+    It runs on the scheduler's update thread, so the database write never blocks the event loop.
+    """
+    def on_update(job: Dict[str, Any]):
+        fields = {"status": job["status"], "job_id": job["job_id"], "error": job["error"]}
+        if job["status"] == "complete":
+            result = job["result"]
+            fields.update({
+                "metrics": result["metrics"],
+                "artifact_path": result["artifact_path"],
+                "trained_features": result["features"],
+                "training_seconds": result["training_seconds"],
+            })
+        db.experiments.update_one(query, {"$set": fields})
+        if job["status"] == "complete":
+            # Deployed experiments serve the retrained artifact from the next prediction on;
+            # evicted after the record points at it, so a concurrent lookup cannot cache the old state
+            MODEL_REGISTRY.evict(job["experiment_id"])
+        logger.info("Training job %s for %s: %s", job["job_id"], job["experiment_id"], job["status"])
+    return on_update
+
 @router.post("/train")
 async def train_model(payload: Dict[str, Any]):
-    """Start model training"""
+    """Queue model training; the fit runs in a worker process and updates the experiment when done"""
     try:
         experiment_id = payload.get("experiment_id")
         
@@ -143,84 +185,46 @@ async def train_model(payload: Dict[str, Any]):
             print(f"ERROR: Could not find experiment {experiment_id}")
             return {"success": False, "error": "Experiment not found"}
         
-        print(f"Found experiment: {experiment}")
-        
-        # Update experiment status to training
         if USE_MONGO:
             # Use the _id from the found experiment
-            obj_id = experiment["_id"]
-            result = db.experiments.update_one(
-                {"_id": obj_id},
-                {"$set": {"status": "training"}}
-            )
-            print(f"Updated status to training: {result.modified_count} documents modified")
+            query = {"_id": experiment["_id"]}
         else:
-            result = db.experiments.update_one(
-                {"experiment_id": experiment_id},
-                {"$set": {"status": "training"}}
-            )
-            print(f"Updated status to training: {result.modified_count} documents modified")
-        
-        # Simulate training completion with mock results
-        task = experiment.get("config", {}).get("task", "classification")
-        
-        mock_metrics = {}
-        if task == "classification":
-            mock_metrics = {
-                "accuracy": round(random.uniform(0.75, 0.95), 3),
-                "f1_score": round(random.uniform(0.70, 0.93), 3),
-                "precision": round(random.uniform(0.72, 0.94), 3),
-                "recall": round(random.uniform(0.68, 0.92), 3)
-            }
-        elif task == "regression":
-            mock_metrics = {
-                "rmse": round(random.uniform(0.1, 0.5), 3),
-                "mae": round(random.uniform(0.08, 0.4), 3),
-                "r2": round(random.uniform(0.6, 0.9), 3)
-            }
-        elif task == "clustering":
-            mock_metrics = {
-                "silhouette_score": round(random.uniform(0.3, 0.8), 3),
-                "davies_bouldin": round(random.uniform(0.5, 2.0), 3)
-            }
-        
-        # Update experiment with completed status and metrics
-        if USE_MONGO:
-            result = db.experiments.update_one(
-                {"_id": obj_id},
-                {"$set": {
-                    "status": "complete",
-                    "metrics": mock_metrics
-                }}
-            )
-            print(f"MongoDB update result: {result.modified_count} documents modified")
-        else:
-            result = db.experiments.update_one(
-                {"experiment_id": experiment_id},
-                {"$set": {
-                    "status": "complete",
-                    "metrics": mock_metrics
-                }}
-            )
-            print(f"Non-MongoDB update result: {result.modified_count} documents modified")
-        
-        print(f"Training completed for experiment {experiment_id}: status=complete, metrics={mock_metrics}")
-        
-        # Verify the update worked
-        if USE_MONGO:
-            updated_exp = db.experiments.find_one({"_id": obj_id})
-        else:
-            updated_exp = db.experiments.find_one({"experiment_id": experiment_id})
-        
-        if updated_exp:
-            print(f"Verification - Updated experiment status: {updated_exp.get('status')}, metrics: {updated_exp.get('metrics')}")
-        else:
-            print(f"ERROR: Could not find updated experiment {experiment_id}")
-        
-        return {"success": True, "status": "training_completed"}
+            query = {"experiment_id": experiment_id}
+        
+        source = _training_source(experiment.get("dataset_id"))
+        job = TRAINING_SCHEDULER.submit(
+            experiment.get("experiment_id") or experiment_id,
+            source,
+            experiment.get("config", {}),
+            on_update=_record_training_update(query),
+        )
+        return {
+            "success": True,
+            "status": job["status"],
+            "job_id": job["job_id"],
+            "queue_position": job.get("queue_position"),
+        }
+    except TrainingQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+@router.post("/train/{experiment_id}/cancel")
+async def cancel_training(experiment_id: str):
+    """Cancel a queued or running training job"""
+    try:
+        job = TRAINING_SCHEDULER.cancel(experiment_id)
+        return {"success": True, "job": job}
+    except KeyError:
+        raise HTTPException(status_code=404, detail="No training job for this experiment")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/queue")
+async def training_queue_stats():
+    """Training queue depth, running jobs and outcome counters"""
+    return {"success": True, "queue": TRAINING_SCHEDULER.stats()}
+
 @router.get("/status/{experiment_id}")
 async def get_training_status(experiment_id: str):
     """Get training status for an experiment"""
@@ -237,7 +241,8 @@ async def get_training_status(experiment_id: str):
         if USE_MONGO:
             experiment["_id"] = str(experiment["_id"])
         
-        return {"success": True, "experiment": experiment}
+        job = TRAINING_SCHEDULER.get(experiment.get("experiment_id") or experiment_id)
+        return {"success": True, "status": experiment.get("status"), "experiment": experiment, "job": job}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -257,6 +262,10 @@ async def get_training_results(experiment_id: str):
         if USE_MONGO:
             experiment["_id"] = str(experiment["_id"])
         
+        # Metrics recorded by a finished training job
+        if experiment.get("metrics"):
+            return {"success": True, "results": experiment}
+        
         # Generate mock results for demonstration
         config = experiment.get("config", {})
         task = config.get("task", "classification")
@@ -359,6 +368,8 @@ async def deploy_model(experiment_id: str):
         
         if updated_exp:
             print(f"Verification - Updated experiment deployed: {updated_exp.get('deployed')}")
+            # Keep the deployed model warm so predictions skip deserialization
+            await run_compute("predict", MODEL_REGISTRY.load, updated_exp)
         else:
             print(f"ERROR: Could not find updated experiment {experiment_id}")
         
@@ -371,59 +382,23 @@ async def deploy_model(experiment_id: str):
 
 @router.post("/predict/{experiment_id}")
 async def batch_predict(experiment_id: str, file: UploadFile = File(...)):
+    path = None
     try:
         if USE_MONGO:
             obj_id = ObjectId(experiment_id)
         else:
             obj_id = experiment_id
         
-        df = pd.read_csv(file.file)
-        predictions = [{"input": row.to_dict(), "prediction": 1} for _, row in df.iterrows()]
+        # Any supported format, parsed once from the spooled upload
+        path, _, _ = await spool_upload(file, any_extension=True)
+        df = await run_compute("predict", read_dataframe, path, file.filename)
+        # Cached model for the experiment (placeholder when it has no artifact); scored in vectorized batches
+        model = await run_compute("predict", load_deployed_model, experiment_id) or ConstantModel(1)
+        result = await run_compute("predict", predict_frame, model, df)
+        predictions = prediction_records(df, result)
         return {"success": True, "predictions": predictions}
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid experiment ID: {e}")
-
-# --- Helper: Background Training Job ---
-def run_training_job(experiment_id: str):
-    time.sleep(5) # Simulate training
-    try:
-        artifact_path = f"/tmp/model_{experiment_id}.pkl"
-        # Save a dummy model as Pickle
-        dummy_model = {"model": "dummy", "experiment_id": experiment_id}
-        os.makedirs(os.path.dirname(artifact_path), exist_ok=True)
-        with open(artifact_path, "wb") as f:
-            pickle.dump(dummy_model, f)
-        if USE_MONGO:
-            obj_id = ObjectId(experiment_id)
-            db.experiments.update_one(
-                {"_id": obj_id},
-                {"$set": {
-                    "status": "complete",
-                    "metrics": {
-                        "accuracy": 0.95,
-                        "f1": 0.93,
-                        "charts": [
-                            {"title": "Confusion Matrix", "url": "/static/confusion_matrix.png"}
-                        ]
-                    },
-                    "artifact_path": artifact_path
-                }}
-            )
-        else:
-            db.experiments.update_one(
-                {"_id": experiment_id},
-                {"$set": {
-                    "status": "complete",
-                    "metrics": {
-                        "accuracy": 0.95,
-                        "f1": 0.93,
-                        "charts": [
-                            {"title": "Confusion Matrix", "url": "/static/confusion_matrix.png"}
-                        ]
-                    },
-                    "artifact_path": artifact_path
-                }}
-            )
-    except Exception as e:
-        print(f"Error in background job: {e}")
-        pass  # Ignore errors in background job
+    finally:
+        if path is not None:
+            os.remove(path)
@@ -2,8 +2,14 @@ from fastapi import APIRouter, HTTPException, UploadFile, File, Body, Form
 from typing import Dict, Any, List
 from ..models.db import db, USE_MONGO
 from bson import ObjectId
+from ..services.inference_service import DemoRuleModel, mock_actual_values, predict_frame, prediction_records
+from ..services.model_registry import MODEL_REGISTRY
+from ..services.compute_executor import run_compute
+from ..services.ingest_service import read_dataframe, spool_upload
 import json
+import os
 import pandas as pd
+import numpy as np
 import io
 import random
 import math
@@ -20,6 +26,28 @@ def clean_nans(obj):
     else:
         return obj
 
+def find_experiment(experiment_id: str):
+    """Look an experiment up by experiment_id, falling back to the database _id"""
+    experiment = db.experiments.find_one({"experiment_id": experiment_id})
+    if not experiment:
+        try:
+            obj_id = ObjectId(experiment_id) if USE_MONGO else experiment_id
+            experiment = db.experiments.find_one({"_id": obj_id})
+        except:
+            pass
+    return experiment
+
+def load_deployed_model(experiment_id: str):
+    """
+    Return the in-memory model for an experiment, loading its artifact on first use.
+    Blocking on a miss (database lookup, unpickling), so endpoints call it through run_compute.
+    """
+    return MODEL_REGISTRY.resolve(experiment_id, find_experiment)
+
+def preload_deployed_models() -> int:
+    """Load every deployed experiment's artifact into the model cache"""
+    return MODEL_REGISTRY.preload(db.experiments.find({"deployed": True}))
+
 @router.post("/deploy")
 async def deploy_model(payload: Dict[str, Any]):
     """Deploy a model for prediction"""
@@ -44,6 +72,11 @@ async def deploy_model(payload: Dict[str, Any]):
                 {"$set": {"deployed": True, "endpoint_url": endpoint_url}}
             )
 
+        # Keep the deployed model warm so predictions skip deserialization
+        experiment = await run_compute("predict", find_experiment, experiment_id)
+        if experiment:
+            await run_compute("predict", MODEL_REGISTRY.load, experiment)
+
         return {"success": True, "endpoint_url": endpoint_url}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -99,75 +132,33 @@ async def get_deployed_models():
 @router.post("/predict")
 async def predict_with_file(file: UploadFile = File(...), model_id: str = Form(...)):
     """Make predictions using a deployed model"""
+    path = None
     try:
-        # Read and parse the uploaded file
-        content = await file.read()
-        
-        # Try to read as CSV
+        # Spool the upload to disk and parse it once, in the format sniffed from its content
+        path, _, _ = await spool_upload(file, any_extension=True)
         try:
-            df = pd.read_csv(io.BytesIO(content))
-        except:
-            # If CSV fails, try Excel
-            try:
-                df = pd.read_excel(io.BytesIO(content))
-            except:
-                raise HTTPException(status_code=400, detail="Unsupported file format. Please upload CSV or Excel file.")
+            df = await run_compute("predict", read_dataframe, path, file.filename)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Could not parse the file (CSV, Excel, JSON, Parquet or Arrow): {e}")
         
-        # Generate varied predictions based on the actual data
-        predictions = []
-        actual_values = []
+        # Score the whole file in vectorized batches with the cached deployed model,
+        # or the rule-based demo model when the experiment has no artifact
+        model = await run_compute("predict", load_deployed_model, model_id) or DemoRuleModel()
+        result = await run_compute("predict", predict_frame, model, df)
+        prediction = result["prediction"]
         
-        for index, row in df.iterrows():
-            # Convert row to dictionary for input features
-            input_features = row.to_dict()
-            
-            # Generate varied predictions based on the input data
-            # This simulates a real model making predictions
-            if 'feature1' in input_features and 'feature2' in input_features:
-                # Simple rule-based prediction for demonstration
-                feature1_val = float(input_features['feature1'])
-                feature2_val = float(input_features['feature2'])
-                
-                # Create varied predictions based on input values
-                if feature1_val > 2.0 and feature2_val > 3.0:
-                    prediction = 1
-                    probability = min(0.95, 0.7 + (feature1_val + feature2_val) * 0.05)
-                elif feature1_val < 1.0 and feature2_val < 2.0:
-                    prediction = 0
-                    probability = max(0.05, 0.3 - (feature1_val + feature2_val) * 0.05)
-                else:
-                    # Random prediction for middle values
-                    prediction = random.choice([0, 1])
-                    probability = random.uniform(0.4, 0.8)
-                
-                # Add some randomness to make predictions more realistic
-                if random.random() < 0.1:  # 10% chance of "wrong" prediction
-                    prediction = 1 - prediction
-                    probability = 1 - probability
-                
-            else:
-                # Fallback for different column names
-                prediction = random.choice([0, 1])
-                probability = random.uniform(0.3, 0.9)
-            
-            predictions.append({
-                "input": input_features,
-                "prediction": prediction,
-                "probability": round(probability, 3)
-            })
-            
-            # Generate mock actual values for confusion matrix (in real scenario, these would come from the dataset)
-            if 'target' in input_features:
-                actual_values.append(int(input_features['target']))
-            else:
-                # Generate realistic actual values based on predictions
-                actual = prediction if random.random() < 0.8 else (1 - prediction)  # 80% accuracy
-                actual_values.append(actual)
+        # Mock actual values for confusion matrix (in real scenario, these would come from the dataset)
+        if 'target' in df.columns:
+            actual = df['target'].to_numpy()
+            if pd.api.types.is_numeric_dtype(actual.dtype):
+                actual = actual.astype(int)
+        else:
+            # Realistic actual values based on the predictions (none for regressors)
+            actual = mock_actual_values(model, prediction)
         
         # Limit to first 50 predictions to avoid overwhelming the UI
-        if len(predictions) > 50:
-            predictions = predictions[:50]
-            actual_values = actual_values[:50]
+        predictions = prediction_records(df, result, limit=50)
+        actual_values = actual[:50].tolist()
 
         result = {
             "success": True,
@@ -178,6 +169,14 @@ async def predict_with_file(file: UploadFile = File(...), model_id: str = Form(.
         return clean_nans(result)
     except Exception as e:
         return {"success": False, "error": str(e)}
+    finally:
+        if path is not None:
+            os.remove(path)
+
+@router.get("/cache")
+async def model_cache_stats():
+    """Loaded-model cache contents and hit/miss/eviction counters"""
+    return MODEL_REGISTRY.stats()
 
 @router.post("/batch")
 async def batch_predict(payload: Dict[str, Any]):
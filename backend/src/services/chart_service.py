@@ -0,0 +1,118 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+CHART_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+DEFAULT_BINS = 10
+MAX_BINS = 500
+# Bar charts show the most frequent categories only
+MAX_BAR_CATEGORIES = 50
+# Rendered chart bytes kept across requests (LRU)
+CHART_CACHE_BYTES = int(os.getenv("DATASWIFT_CHART_CACHE_MB", "64")) * 1024 * 1024
+
+
+def check_chart(fmt: str, bins: int = DEFAULT_BINS) -> None:
+    if fmt not in CHART_FORMATS and fmt != 'json':
+        raise ValueError(f"Unsupported chart format: {fmt}. Use one of {', '.join(list(CHART_FORMATS) + ['json'])}")
+    if not 1 <= bins <= MAX_BINS:
+        raise ValueError(f"bins must be between 1 and {MAX_BINS}")
+
+
+def bar_data(series: pd.Series, limit: int = MAX_BAR_CATEGORIES) -> Dict[str, Any]:
+    """Category counts of a column, most frequent first"""
+    counts = series.value_counts()
+    # Categoricals also count categories no row has
+    counts = counts[counts > 0]
+    return {
+        "column": str(series.name),
+        "kind": "bar",
+        "labels": [str(label) for label in counts.index[:limit]],
+        "counts": counts.to_numpy()[:limit].tolist(),
+        "categories": int(len(counts)),
+        "nulls": int(series.isna().sum()),
+    }
+
+
+def render_chart(data: Dict[str, Any], fmt: str = 'png') -> bytes:
+    """
+    Rasterize chart data with the object-oriented Agg API. Each call owns its Figure, so
+    (unlike pyplot) calls are safe from any thread or worker process.
+    """
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    if data["kind"] == "histogram":
+        edges = np.asarray(data["edges"], dtype=np.float64)
+        if len(edges):
+            axes.bar(edges[:-1], data["counts"], width=np.diff(edges), align='edge')
+        axes.grid(True)
+        axes.set_title(f"Histogram of {data['column']}")
+    else:
+        positions = np.arange(len(data["labels"]))
+        axes.bar(positions, data["counts"], width=0.5)
+        axes.set_xticks(positions, data["labels"], rotation=90)
+        axes.set_title(f"Bar Chart of {data['column']}")
+        figure.tight_layout()
+    buf = io.BytesIO()
+    figure.savefig(buf, format=fmt)
+    return buf.getvalue()
+
+
+class ChartCache:
+    """Rendered chart bytes keyed by (dataset, version, column, parameters), LRU within a byte budget"""
+
+    def __init__(self, budget: int = CHART_CACHE_BYTES):
+        self.budget = budget
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.resident_bytes = 0
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return data
+
+    def put(self, key: Hashable, data: bytes) -> None:
+        with self._lock:
+            if key in self._entries:
+                self.resident_bytes -= len(self._entries.pop(key))
+            if len(data) > self.budget:
+                return
+            self._entries[key] = data
+            self.resident_bytes += len(data)
+            while self.resident_bytes > self.budget:
+                _, evicted = self._entries.popitem(last=False)
+                self.resident_bytes -= len(evicted)
+                self.counters["evictions"] += 1
+
+    def carry_forward(self, dataset_id: str, old_version: int, version: int, columns) -> None:
+        """Re-key a dataset's charts of `columns` to a new version in which those columns are unchanged"""
+        keep = set(columns)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == dataset_id and k[1] == old_version and k[2] in keep]:
+                self._entries[(dataset_id, version) + key[2:]] = self._entries.pop(key)
+
+    def drop_dataset(self, dataset_id: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == dataset_id]:
+                self.resident_bytes -= len(self._entries.pop(key))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "resident_bytes": self.resident_bytes,
+                    "budget_bytes": self.budget, **self.counters}
+
+
+CHART_CACHE = ChartCache()
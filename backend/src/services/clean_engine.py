@@ -0,0 +1,269 @@
+import os
+import re
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+import numpy as np
+import pandas as pd
+
+# Threads for per-column auto-clean work (fill values, type inference, outlier masks, text normalization)
+CLEAN_THREADS = int(os.getenv("DATASWIFT_CLEAN_THREADS", str(min(8, os.cpu_count() or 1))))
+# Values per column that type inference tries before converting the whole column
+INFERENCE_SAMPLE_ROWS = 1000
+
+# Conversion failures type inference treats as "not this type"
+_CONVERSION_ERRORS = (ValueError, TypeError, OverflowError)
+
+
+def _column_map(fn: Callable, items: Iterable[Any]) -> List[Any]:
+    """fn over independent columns on a short-lived thread pool, results in input order"""
+    items = list(items)
+    if CLEAN_THREADS <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(CLEAN_THREADS, len(items)), thread_name_prefix="dataswift-clean") as pool:
+        return list(pool.map(fn, items))
+
+
+def _replace_columns(df: pd.DataFrame, columns: Dict[int, Any]) -> pd.DataFrame:
+    # Swap whole columns by position on a shallow copy: no other column is copied
+    if not columns:
+        return df
+    df = df.copy(deep=False)
+    for position, values in columns.items():
+        df.isetitem(position, values)
+    return df
+
+
+def _positions(df: pd.DataFrame, predicate: Callable) -> List[int]:
+    return [i for i, dtype in enumerate(df.dtypes) if predicate(dtype)]
+
+
+def _is_number(dtype) -> bool:
+    # What select_dtypes(include=[np.number]) picks: numeric, not boolean
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+def _is_text(dtype) -> bool:
+    # Ingest stores low-cardinality text as categoricals (see dtype_optimizer)
+    return dtype == object or isinstance(dtype, pd.CategoricalDtype)
+
+
+def _names(df: pd.DataFrame, positions: Iterable[int]) -> List[str]:
+    return [str(df.columns[i]) for i in positions]
+
+
+# --- Steps: each returns (frame, rows affected, columns affected) ---
+
+def _drop_sparse(df: pd.DataFrame) -> Tuple[pd.DataFrame, int, List[str]]:
+    """Drop columns, then rows, with more than half of their values missing"""
+    keep = df.count().to_numpy() >= int(0.5 * len(df))
+    dropped = _names(df, np.flatnonzero(~keep))
+    if not keep.all():
+        df = df.iloc[:, keep]
+    present = df.notna().sum(axis=1).to_numpy()
+    rows = present >= int(0.5 * df.shape[1])
+    removed = int(len(rows) - rows.sum())
+    return (df[rows] if removed else df), removed, dropped
+
+
+def _fill_missing(df: pd.DataFrame) -> Tuple[pd.DataFrame, int, List[str]]:
+    """Fill nulls with the column median (numeric) or mode (anything else, '' without one)"""
+    def fill(position: int):
+        column = df.iloc[:, position]
+        if not column.hasnans:
+            return None
+        missing = column.isna().to_numpy()
+        if pd.api.types.is_numeric_dtype(column.dtype):
+            value = column.median()
+            if pd.isna(value):
+                return None
+        else:
+            mode = column.mode()
+            value = mode.iloc[0] if not mode.empty else ''
+            if isinstance(column.dtype, pd.CategoricalDtype) and value not in column.cat.categories:
+                column = column.cat.add_categories([value])
+        return column.fillna(value), missing
+
+    filled = {i: result for i, result in enumerate(_column_map(fill, range(df.shape[1]))) if result is not None}
+    rows = np.zeros(len(df), dtype=bool)
+    for _, missing in filled.values():
+        rows |= missing
+    return _replace_columns(df, {i: values for i, (values, _) in filled.items()}), int(rows.sum()), _names(df, filled)
+
+
+def _sample(column: pd.Series) -> pd.Series:
+    if len(column) <= INFERENCE_SAMPLE_ROWS:
+        return column
+    # Evenly spaced rather than the head, so sorted or grouped files are sampled throughout
+    return column.iloc[np.linspace(0, len(column) - 1, INFERENCE_SAMPLE_ROWS).astype(np.int64)]
+
+
+def _to_datetime(column: pd.Series) -> pd.Series:
+    return pd.to_datetime(column)
+
+
+def _infer_types(df: pd.DataFrame) -> Tuple[pd.DataFrame, int, List[str]]:
+    """
+    Convert text columns that hold numbers (else dates) in full. Each conversion is first
+    tried on a sample, so columns that are clearly text never pay for a failed full-column
+    parse; a column whose sample passes but which fails in full is left as it was.
+    """
+    def infer(position: int):
+        column = df.iloc[:, position]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            column = column.astype(object)
+        sample = _sample(column)
+        for convert in (pd.to_numeric, _to_datetime):
+            try:
+                convert(sample)
+            except _CONVERSION_ERRORS:
+                continue
+            try:
+                return convert(column)
+            except _CONVERSION_ERRORS:
+                continue
+        return None
+
+    with warnings.catch_warnings():
+        # Format inference warnings from pd.to_datetime on free text
+        warnings.simplefilter('ignore', UserWarning)
+        positions = _positions(df, _is_text)
+        results = _column_map(infer, positions)
+    converted = {i: values for i, values in zip(positions, results) if values is not None}
+    return _replace_columns(df, converted), len(df) if converted else 0, _names(df, converted)
+
+
+def _drop_duplicates(df: pd.DataFrame) -> Tuple[pd.DataFrame, int, List[str]]:
+    duplicated = df.duplicated().to_numpy()
+    removed = int(duplicated.sum())
+    return (df[~duplicated] if removed else df), removed, []
+
+
+def _remove_outliers(df: pd.DataFrame) -> Tuple[pd.DataFrame, int, List[str]]:
+    """
+    Drop rows outside [Q1 - 1.5 IQR, Q3 + 1.5 IQR] in any numeric column. Quartiles of every
+    column are taken over the same rows and the per-column masks are ANDed into one filter.
+    """
+    def inliers(position: int) -> np.ndarray:
+        values = df.iloc[:, position].to_numpy(dtype=np.float64, na_value=np.nan)
+        with np.errstate(invalid='ignore'):
+            q1, q3 = np.nanquantile(values, [0.25, 0.75])
+            iqr = q3 - q1
+            return (values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)
+
+    positions = _positions(df, _is_number)
+    with warnings.catch_warnings():
+        # All-null columns: no quartiles, and (as before) no row passes
+        warnings.simplefilter('ignore', RuntimeWarning)
+        masks = _column_map(inliers, positions)
+    if not masks:
+        return df, 0, []
+    keep = np.logical_and.reduce(masks)
+    removed = int(len(keep) - keep.sum())
+    flagged = [position for position, mask in zip(positions, masks) if not mask.all()]
+    return (df[keep] if removed else df), removed, _names(df, flagged)
+
+
+def _normalize_text(df: pd.DataFrame) -> Tuple[pd.DataFrame, int, List[str]]:
+    """Strip and lowercase text columns (as strings)"""
+    def normalize(position: int):
+        column = df.iloc[:, position]
+        if isinstance(column.dtype, pd.CategoricalDtype) and not column.hasnans:
+            # Normalize the categories; equal results merge into one category
+            categories = column.cat.categories
+            normalized = categories.astype(str).str.strip().str.lower()
+            mapping, merged = pd.factorize(normalized, sort=True)
+            codes = column.cat.codes.to_numpy()
+            values = pd.Series(pd.Categorical.from_codes(mapping[codes], categories=merged, validate=False),
+                               index=column.index, name=column.name)
+            return values, (normalized.to_numpy() != categories.to_numpy())[codes]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            column = column.astype(object)
+        if pd.api.types.infer_dtype(column, skipna=False) == 'string':
+            # Normalize each distinct value once and map back through the codes
+            codes, uniques = pd.factorize(column)
+            normalized = pd.Index(uniques).str.strip().str.lower()
+            changed = (normalized.to_numpy() != uniques)[codes]
+            values = pd.Series(normalized.to_numpy()[codes], index=column.index, name=column.name)
+        else:
+            values = column.astype(str).str.strip().str.lower()
+            changed = (values != column).to_numpy()
+        return values, changed
+
+    positions = _positions(df, _is_text)
+    results = _column_map(normalize, positions)
+    rows = np.zeros(len(df), dtype=bool)
+    columns, changed_columns = {}, []
+    for position, (values, changed) in zip(positions, results):
+        columns[position] = values
+        if changed.any():
+            rows |= changed
+            changed_columns.append(position)
+    return _replace_columns(df, columns), int(rows.sum()), _names(df, changed_columns)
+
+
+def _standardize_names(df: pd.DataFrame) -> Tuple[pd.DataFrame, int, List[str]]:
+    names = [re.sub(r'[^a-zA-Z0-9_]', '', str(c).replace(' ', '_')).lower() for c in df.columns]
+    renamed = [str(old) for old, new in zip(df.columns, names) if str(old) != new]
+    if renamed:
+        df = df.set_axis(names, axis=1, copy=False)
+    return df, 0, renamed
+
+
+def _encode_categoricals(df: pd.DataFrame) -> Tuple[pd.DataFrame, int, List[str]]:
+    """One-hot encode text columns (first level dropped)"""
+    columns = df.select_dtypes(include=[object, 'category']).columns
+    if not len(columns):
+        return df, 0, []
+    # Categories no remaining row has would become all-zero columns
+    df = _replace_columns(df, {i: df.iloc[:, i].cat.remove_unused_categories()
+                               for i in _positions(df, lambda dtype: isinstance(dtype, pd.CategoricalDtype))})
+    return pd.get_dummies(df, columns=columns, drop_first=True), len(df), [str(c) for c in columns]
+
+
+def _drop_invalid_datetimes(df: pd.DataFrame) -> Tuple[pd.DataFrame, int, List[str]]:
+    """Drop rows with a missing (unparseable) value in any datetime column"""
+    positions = _positions(df, pd.api.types.is_datetime64_any_dtype)
+    if not positions:
+        return df, 0, []
+    invalid = df.iloc[:, positions].isna().to_numpy().any(axis=1)
+    removed = int(invalid.sum())
+    return (df[~invalid] if removed else df), removed, _names(df, positions)
+
+
+AUTO_CLEAN_STEPS = [
+    ("drop_sparse", _drop_sparse),
+    ("fill_missing", _fill_missing),
+    ("infer_types", _infer_types),
+    ("drop_duplicates", _drop_duplicates),
+    ("remove_outliers", _remove_outliers),
+    ("normalize_text", _normalize_text),
+    ("standardize_names", _standardize_names),
+    ("encode_categoricals", _encode_categoricals),
+    ("drop_invalid_datetimes", _drop_invalid_datetimes),
+]
+
+
+def auto_clean(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Run the auto-clean steps in order. Returns the cleaned frame and a report with each
+    step's wall time, rows affected (removed by dropping steps, changed by the others)
+    and the columns it dropped, changed or flagged.
+    """
+    started = time.perf_counter()
+    report = {"rows_before": int(len(df)), "columns_before": int(df.shape[1]), "steps": []}
+    for name, step in AUTO_CLEAN_STEPS:
+        step_started = time.perf_counter()
+        df, rows, columns = step(df)
+        report["steps"].append({
+            "step": name,
+            "seconds": round(time.perf_counter() - step_started, 4),
+            "rows_affected": rows,
+            "rows_after": int(len(df)),
+            "columns": columns,
+        })
+    df = df.reset_index(drop=True)
+    report.update({"rows_after": int(len(df)), "columns_after": int(df.shape[1]),
+                   "total_seconds": round(time.perf_counter() - started, 4)})
+    return df, report
@@ -0,0 +1,189 @@
+import asyncio
+import contextlib
+import functools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional
+
+# Threads for pandas/NumPy work, which releases the GIL in its heavy loops
+COMPUTE_THREADS = int(os.getenv("DATASWIFT_COMPUTE_THREADS", str(min(32, (os.cpu_count() or 1) + 4))))
+# Processes for GIL-bound fan-out (chart and report rendering, see map); 0 keeps everything on threads
+COMPUTE_PROCESSES = int(os.getenv("DATASWIFT_COMPUTE_PROCESSES", "2"))
+# Concurrent calls allowed per endpoint when it has no explicit limit
+DEFAULT_ENDPOINT_LIMIT = int(os.getenv("DATASWIFT_COMPUTE_ENDPOINT_LIMIT", "8"))
+ENDPOINT_LIMITS = {
+    "upload": 4,
+    "export": 4,
+    "visualize": 4,
+    "preprocess": 2,
+    "clean": 2,
+    "split": 2,
+}
+
+
+def _parse_limits(spec: str) -> Dict[str, int]:
+    # "export=2,visualize=4"
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        limits[name.strip()] = int(value)
+    return limits
+
+
+ENDPOINT_LIMITS.update(_parse_limits(os.getenv("DATASWIFT_COMPUTE_LIMITS", "")))
+
+
+class ComputeExecutor:
+    """
+    Runs blocking work for async endpoints off the event loop.
+    Calls go to a thread pool; map/imap fan GIL-bound pieces of a call (rendering)
+    out to a process pool. Each endpoint name gets its own semaphore so one
+    expensive endpoint cannot occupy every worker; callers over the limit wait on
+    the event loop without holding a thread.
+    """
+
+    def __init__(self, threads: int = COMPUTE_THREADS, processes: int = COMPUTE_PROCESSES,
+                 limits: Optional[Dict[str, int]] = None, default_limit: int = DEFAULT_ENDPOINT_LIMIT):
+        self.threads = max(1, threads)
+        self.processes = max(0, processes)
+        self.limits = dict(ENDPOINT_LIMITS if limits is None else limits)
+        self.default_limit = max(1, default_limit)
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._semaphores: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def _threads(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="dataswift-compute")
+            return self._thread_pool
+
+    def _processes(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._process_pool is None:
+                # spawn: forking a process that runs an event loop and thread pools is unsafe
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.processes, mp_context=multiprocessing.get_context("spawn"))
+            return self._process_pool
+
+    def _semaphore(self, endpoint: str) -> asyncio.Semaphore:
+        # One semaphore per endpoint and event loop
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._semaphores.get(endpoint)
+            if entry is None or entry[0] is not loop:
+                entry = (loop, asyncio.Semaphore(self.limits.get(endpoint, self.default_limit)))
+                self._semaphores[endpoint] = entry
+            return entry[1]
+
+    def _counters(self, endpoint: str) -> Dict[str, Any]:
+        counters = self._stats.get(endpoint)
+        if counters is None:
+            counters = {"active": 0, "waiting": 0, "completed": 0, "failed": 0,
+                        "total_seconds": 0.0, "max_seconds": 0.0, "max_wait_seconds": 0.0}
+            self._stats[endpoint] = counters
+        return counters
+
+    @contextlib.asynccontextmanager
+    async def _slot(self, endpoint: str):
+        # Holds one of the endpoint's concurrency slots and records wait/run times
+        counters = self._counters(endpoint)
+        semaphore = self._semaphore(endpoint)
+        queued = time.perf_counter()
+        counters["waiting"] += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            counters["waiting"] -= 1
+        counters["active"] += 1
+        started = time.perf_counter()
+        counters["max_wait_seconds"] = max(counters["max_wait_seconds"], round(started - queued, 4))
+        try:
+            yield
+            counters["completed"] += 1
+        except BaseException:
+            counters["failed"] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            counters["active"] -= 1
+            counters["total_seconds"] = round(counters["total_seconds"] + elapsed, 4)
+            counters["max_seconds"] = max(counters["max_seconds"], round(elapsed, 4))
+            semaphore.release()
+
+    async def run(self, endpoint: str, fn: Callable, *args, **kwargs) -> Any:
+        """Await `fn(*args, **kwargs)` on a worker thread"""
+        async with self._slot(endpoint):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._threads(), functools.partial(fn, *args, **kwargs))
+
+    def map(self, fn: Callable, items: Iterable[Any]) -> List[Any]:
+        """
+        Blocking parallel map over the process pool, for code already running on a
+        worker thread (e.g. rendering every chart of a report). Results keep input
+        order; with the process pool disabled the items run inline.
+        """
+        return list(self.imap(fn, items))
+
+    def imap(self, fn: Callable, items: Iterable[Any]) -> Iterator[Any]:
+        """Like map, but yields each result (in input order) as soon as it is ready"""
+        items = list(items)
+        if not self.processes or not items:
+            yield from (fn(item) for item in items)
+            return
+        try:
+            yield from self._processes().map(fn, items)
+        except BrokenProcessPool:
+            with self._lock:
+                self._process_pool = None
+            raise
+
+    async def stream(self, endpoint: str, chunks: Iterable[Any]) -> AsyncIterator[Any]:
+        """
+        Drain a blocking iterator on the thread pool, one item per call, holding one
+        endpoint slot for the whole stream (e.g. a StreamingResponse body).
+        """
+        async with self._slot(endpoint):
+            loop = asyncio.get_running_loop()
+            iterator = iter(chunks)
+            done = object()
+            try:
+                while True:
+                    chunk = await loop.run_in_executor(self._threads(), next, iterator, done)
+                    if chunk is done:
+                        break
+                    yield chunk
+            finally:
+                # Release writers/buffers right away when the client disconnects mid-stream
+                if hasattr(iterator, "close"):
+                    iterator.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "threads": self.threads,
+            "processes": self.processes,
+            "limits": {**self.limits, "default": self.default_limit},
+            "endpoints": {name: dict(counters) for name, counters in self._stats.items()},
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pools = [self._thread_pool, self._process_pool]
+            self._thread_pool = self._process_pool = None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+
+COMPUTE = ComputeExecutor()
+
+
+async def run_compute(endpoint: str, fn: Callable, *args, **kwargs) -> Any:
+    """Shortcut for COMPUTE.run"""
+    return await COMPUTE.run(endpoint, fn, *args, **kwargs)
@@ -0,0 +1,1012 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Backend used for DATASETS: "columnar" (on-disk, memory-mapped) or "memory"
+DATASET_STORE_BACKEND = os.getenv("DATASWIFT_DATASET_STORE", "columnar")
+DATASET_STORE_DIR = os.getenv(
+    "DATASWIFT_DATA_DIR", os.path.join(tempfile.gettempdir(), "dataswift", "datasets")
+)
+# Memory budget for resident DataFrames; least recently used ones are evicted past it (0 = unlimited)
+DATASET_MEMORY_BUDGET = int(os.getenv("DATASWIFT_DATASET_MEMORY_MB", "1024")) * 1024 * 1024
+# Where the memory backend spills evicted datasets
+DATASET_SPILL_DIR = os.getenv(
+    "DATASWIFT_SPILL_DIR", os.path.join(tempfile.gettempdir(), "dataswift", "spill")
+)
+
+META_FILE = "meta.json"
+INFO_FILE = "info.json"
+ZONES_FILE = "zones.json"
+# Row positions of a view (see write_view)
+VIEW_ROWS_FILE = "rows.npy"
+# Files computed from the data (indexes, rendered reports), named by dataset version
+DERIVED_DIR = "derived"
+# Content index of the columnar store: ingest key -> dataset holding that content
+CONTENT_DIR = ".content"
+# View index of the columnar store: an empty file VIEWS_DIR/{parent}/{view} per view of a parent
+VIEWS_DIR = ".views"
+# Rows per zone map block (min/max/null count recorded per block of each numeric column)
+ZONE_BLOCK_ROWS = 65536
+
+
+# --- Columnar file format ---
+#
+# A dataset is a directory holding meta.json plus one file per column:
+# - numeric/bool/datetime columns are plain .npy files, read back memory-mapped
+# - object columns are dictionary encoded: int32 codes (.npy, memory-mapped) + uniques
+# - categoricals store their codes memory-mapped and categories alongside
+# - anything else (nullable extension dtypes, periods, ...) is pickled
+# zones.json holds per-block min/max/null counts of numeric, bool and datetime
+# columns so row queries can skip blocks that cannot match a filter.
+# derived/ holds files computed from one version of the data; rewrites start without it.
+# Column files are never modified once written, so a column carried over unchanged from
+# a stored dataset (and every file of a cloned dataset) is a hard link to the same file.
+#
+# A view directory holds no column files: meta.json names a parent dataset (a sibling
+# directory) and the parent version it was taken from, and rows.npy the parent row
+# positions it selects. Reading a view reads just those rows of the parent's columns.
+
+def _link_or_copy(source: str, target: str) -> None:
+    try:
+        os.link(source, target)
+    except OSError:
+        # Another filesystem, or links not supported
+        shutil.copyfile(source, target)
+
+
+def _mapped_file(values: np.ndarray) -> Optional[str]:
+    """The .npy file whose full, unmodified contents `values` maps (see _load_mapped), if any"""
+    base = values
+    while isinstance(base, np.ndarray) and not isinstance(base, np.memmap):
+        base = base.base
+    if not isinstance(base, np.memmap) or not base.filename:
+        return None
+    if (base.dtype != values.dtype or base.shape != values.shape or values.ndim != 1
+            or base.ctypes.data != values.ctypes.data or not values.flags.c_contiguous):
+        return None
+    try:
+        stored = np.load(base.filename, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    # Copy-on-write mappings can be written to in memory: only identical bytes are shared
+    if stored.dtype != values.dtype or stored.shape != values.shape:
+        return None
+    if not np.array_equal(stored.view(np.uint8), values.view(np.uint8)):
+        return None
+    return base.filename
+
+
+def _save(values: np.ndarray, path: str) -> None:
+    source = _mapped_file(values)
+    if source is not None:
+        try:
+            os.link(source, path)
+            return
+        except OSError:
+            pass
+    np.save(path, values)
+
+
+def _write_column(series: pd.Series, path: str) -> Dict[str, Any]:
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        _save(series.cat.codes.to_numpy(), path + ".npy")
+        pd.to_pickle(dtype.categories, path + ".categories.pkl")
+        return {"kind": "categorical", "ordered": bool(dtype.ordered)}
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        np.save(path + ".npy", series.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy())
+        return {"kind": "datetimetz", "tz": str(dtype.tz)}
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+        _save(series.to_numpy(), path + ".npy")
+        return {"kind": "npy"}
+    if dtype == object:
+        try:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        except TypeError:
+            # Unhashable values (lists, dicts) cannot be dictionary encoded
+            codes = None
+        if codes is not None:
+            np.save(path + ".npy", codes.astype(np.int32, copy=False))
+            np.save(path + ".uniques.npy", np.asarray(uniques, dtype=object), allow_pickle=True)
+            return {"kind": "dict"}
+    pd.to_pickle(series, path + ".pkl")
+    return {"kind": "pickle"}
+
+
+def _load_mapped(path: str) -> np.ndarray:
+    # Copy-on-write mapping: reads are zero-copy, in-place writes stay private.
+    # asarray drops the np.memmap subclass without copying
+    return np.asarray(np.load(path, mmap_mode="c"))
+
+
+def _read_column(spec: Dict[str, Any], path: str, rows: Optional[np.ndarray] = None):
+    """One column, or just the values at positions `rows` (taken before decoding)"""
+    kind = spec["kind"]
+
+    def mapped(file: str) -> np.ndarray:
+        values = _load_mapped(file)
+        return values if rows is None else values[rows]
+
+    if kind == "npy":
+        return mapped(path + ".npy")
+    if kind == "dict":
+        codes = mapped(path + ".npy")
+        uniques = np.load(path + ".uniques.npy", allow_pickle=True)
+        # The -1 missing-value sentinel picks the trailing NaN
+        return np.append(uniques, np.nan).take(codes)
+    if kind == "categorical":
+        codes = mapped(path + ".npy")
+        categories = pd.read_pickle(path + ".categories.pkl")
+        return pd.Categorical.from_codes(
+            codes, dtype=pd.CategoricalDtype(categories, ordered=spec["ordered"]), validate=False
+        )
+    if kind == "datetimetz":
+        values = pd.Series(mapped(path + ".npy"), copy=False)
+        return values.dt.tz_localize("UTC").dt.tz_convert(spec["tz"]).array
+    if kind == "pickle":
+        values = pd.read_pickle(path + ".pkl").array
+        return values if rows is None else values.take(rows)
+    raise ValueError(f"Unknown column encoding: {kind}")
+
+
+def _zone_map(values: np.ndarray, block_rows: int) -> Optional[Dict[str, list]]:
+    """Per-block min/max (None for an all-null block) and null counts of a plain NumPy column"""
+    kind = values.dtype.kind
+    if kind not in "biufM":
+        return None
+    if kind == "M":
+        nulls = np.isnat(values)
+        # Compared as integers in the column's own unit
+        values = values.view(np.int64)
+    elif kind == "f":
+        nulls = np.isnan(values)
+    else:
+        nulls = None
+    zone = {"min": [], "max": [], "nulls": []}
+    for start in range(0, len(values), block_rows):
+        block = values[start:start + block_rows]
+        if nulls is not None:
+            block_nulls = nulls[start:start + block_rows]
+            block = block[~block_nulls]
+            zone["nulls"].append(int(block_nulls.sum()))
+        else:
+            zone["nulls"].append(0)
+        if len(block):
+            zone["min"].append(block.min().item())
+            zone["max"].append(block.max().item())
+        else:
+            zone["min"].append(None)
+            zone["max"].append(None)
+    return zone
+
+
+def _store_column(series: pd.Series, directory: str, position: int, zones: Dict[str, Any]) -> Dict[str, Any]:
+    spec = _write_column(series, os.path.join(directory, f"c{position}"))
+    spec["name"] = series.name
+    spec["dtype"] = str(series.dtype)
+    zone = _zone_map(series.to_numpy(), ZONE_BLOCK_ROWS) if spec["kind"] == "npy" else None
+    if zone is not None:
+        zones[str(position)] = zone
+    return spec
+
+
+def _write_meta(directory: str, columns: List[Dict[str, Any]], index: Dict[str, Any],
+                zones: Dict[str, Any], rows: int, version: int) -> None:
+    with open(os.path.join(directory, ZONES_FILE), "w") as f:
+        json.dump({"block_rows": ZONE_BLOCK_ROWS, "rows": rows, "columns": zones}, f)
+    # meta.json goes last: its presence marks a complete dataset directory
+    meta = {"version": version, "rows": rows, "columns": columns, "index": index}
+    with open(os.path.join(directory, META_FILE), "w") as f:
+        json.dump(meta, f, default=str)
+
+
+def write_columnar(df: pd.DataFrame, directory: str, version: int = 1) -> None:
+    """Write a DataFrame to `directory` in the columnar format (the directory must not exist)"""
+    os.makedirs(directory)
+    zones = {}
+    columns = [_store_column(df.iloc[:, i], directory, i, zones) for i in range(df.shape[1])]
+    if isinstance(df.index, pd.RangeIndex):
+        index = {"kind": "range", "start": df.index.start, "stop": df.index.stop, "step": df.index.step}
+    else:
+        index = _write_column(df.index.to_series(), os.path.join(directory, "index"))
+    index["name"] = df.index.name
+    _write_meta(directory, columns, index, zones, len(df), version)
+
+
+def write_columnar_chunks(chunks: Iterable[pd.DataFrame], directory: str,
+                          transform: Optional[Callable[[pd.Series], pd.Series]] = None,
+                          version: int = 1) -> Optional[int]:
+    """
+    Write the frame pd.concat(chunks, ignore_index=True), with `transform` applied to each
+    of its columns, to `directory` in the columnar format without ever holding that frame:
+    every chunk is spilled to per-column part files as it arrives, then the columns are
+    combined, transformed and written one at a time. Returns the row count, or None (and
+    writes nothing) when the chunks do not all have the same columns.
+    """
+    os.makedirs(directory)
+    parts = os.path.join(directory, "parts")
+    os.makedirs(parts)
+    names, lengths = None, []
+    chunk = None
+    for chunk in chunks:
+        if names is None:
+            names = chunk.columns
+        elif not chunk.columns.equals(names):
+            shutil.rmtree(directory, ignore_errors=True)
+            return None
+        for i in range(chunk.shape[1]):
+            pd.to_pickle(chunk.iloc[:, i], os.path.join(parts, f"c{i}.{len(lengths)}.pkl"))
+        lengths.append(len(chunk))
+    # A slice (the multi-threaded CSV engine hands those out) keeps its whole parent alive
+    chunk = None
+    zones, columns = {}, []
+    for i in range(len(names) if names is not None else 0):
+        paths = [os.path.join(parts, f"c{i}.{k}.pkl") for k in range(len(lengths))]
+        series = pd.concat([pd.read_pickle(path) for path in paths], ignore_index=True)
+        for path in paths:
+            os.remove(path)
+        if transform is not None:
+            series = transform(series)
+        columns.append(_store_column(series, directory, i, zones))
+        series = None
+    shutil.rmtree(parts)
+    rows = sum(lengths)
+    index = {"kind": "range", "start": 0, "stop": rows, "step": 1, "name": None}
+    _write_meta(directory, columns, index, zones, rows, version)
+    return rows
+
+
+def replace_directory(staging: str, target: str, keep: Optional[str] = None) -> None:
+    """Atomically swap `staging` into place at `target`, carrying over the `keep` file if present"""
+    if os.path.exists(target):
+        if keep and os.path.exists(os.path.join(target, keep)):
+            shutil.copy2(os.path.join(target, keep), os.path.join(staging, keep))
+        trash = f"{target}.trash-{uuid.uuid4().hex}"
+        os.rename(target, trash)
+        os.rename(staging, target)
+        # Open mappings of the old files stay valid after unlink
+        shutil.rmtree(trash, ignore_errors=True)
+    else:
+        os.rename(staging, target)
+
+
+def write_view(directory: str, parent_dir: str, parent_meta: Dict[str, Any], rows: np.ndarray, version: int = 1) -> None:
+    """Write a view of `rows` of the dataset at `parent_dir` (a sibling) to `directory` (must not exist)"""
+    os.makedirs(directory)
+    np.save(os.path.join(directory, VIEW_ROWS_FILE), np.asarray(rows, dtype=np.int64))
+    meta = {
+        "version": version,
+        "rows": len(rows),
+        "view": {"parent": os.path.basename(parent_dir), "parent_version": parent_meta["version"]},
+        # Parent column specs, so the schema is known without reading the parent
+        "columns": parent_meta["columns"],
+        "index": {"kind": "range", "start": 0, "stop": len(rows), "step": 1, "name": None},
+    }
+    with open(os.path.join(directory, META_FILE), "w") as f:
+        json.dump(meta, f, default=str)
+
+
+def read_view_rows(directory: str) -> np.ndarray:
+    return np.load(os.path.join(directory, VIEW_ROWS_FILE))
+
+
+def read_zone_maps(directory: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(directory, ZONES_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def read_meta(directory: str) -> Dict[str, Any]:
+    with open(os.path.join(directory, META_FILE)) as f:
+        return json.load(f)
+
+
+def read_columnar(directory: str, meta: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """Read a dataset directory back as a DataFrame backed by memory-mapped columns"""
+    if meta is None:
+        meta = read_meta(directory)
+    if "view" in meta:
+        return _read_view(directory, meta)
+    spec = meta["index"]
+    if spec["kind"] == "range":
+        index = pd.RangeIndex(spec["start"], spec["stop"], spec["step"], name=spec["name"])
+    else:
+        index = pd.Index(_read_column(spec, os.path.join(directory, "index")), name=spec["name"])
+    arrays = {}
+    for i, spec in enumerate(meta["columns"]):
+        arrays[i] = _read_column(spec, os.path.join(directory, f"c{i}"))
+    return _frame(arrays, index, meta["columns"])
+
+
+def _frame(arrays: Dict[int, Any], index: pd.Index, columns: List[Dict[str, Any]]) -> pd.DataFrame:
+    # Build with integer keys so duplicate column labels survive, one block per column (no consolidation copy)
+    df = pd.DataFrame(arrays, index=index, copy=False)
+    df.columns = pd.Index([spec["name"] for spec in columns], dtype=object)
+    return df
+
+
+def _read_view(directory: str, meta: Dict[str, Any]) -> pd.DataFrame:
+    parent_dir = os.path.join(os.path.dirname(os.path.abspath(directory)), meta["view"]["parent"])
+    parent_meta = read_meta(parent_dir)
+    if parent_meta["version"] != meta["view"]["parent_version"]:
+        raise ValueError(f"View {os.path.basename(directory)} is stale: its parent dataset changed")
+    rows = read_view_rows(directory)
+    arrays = {i: _read_column(spec, os.path.join(parent_dir, f"c{i}"), rows)
+              for i, spec in enumerate(parent_meta["columns"])}
+    return _frame(arrays, pd.RangeIndex(len(rows)), parent_meta["columns"])
+
+
+# --- Resident frame cache ---
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Approximate resident size of a DataFrame, including Python string payloads"""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class FrameCache:
+    """
+    Size-bounded LRU of resident DataFrames.
+    `on_evict(dataset_id, entry)` is called for every entry pushed out by the budget.
+    """
+
+    def __init__(self, budget: int = DATASET_MEMORY_BUDGET, on_evict: Optional[Callable] = None):
+        self.budget = budget
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.resident_bytes = 0
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "reloads": 0, "evicted_bytes": 0}
+        # Ids evicted at least once, so the next load counts as a reload
+        self._evicted = set()
+
+    def get(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(dataset_id)
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self._entries.move_to_end(dataset_id)
+            self.counters["hits"] += 1
+            return entry
+
+    def put(self, dataset_id: str, df: pd.DataFrame, **extra) -> Dict[str, Any]:
+        with self._lock:
+            self.pop(dataset_id)
+            if dataset_id in self._evicted:
+                self._evicted.discard(dataset_id)
+                self.counters["reloads"] += 1
+            entry = {"df": df, "nbytes": frame_nbytes(df), **extra}
+            self._entries[dataset_id] = entry
+            self.resident_bytes += entry["nbytes"]
+            self._enforce_budget(keep=dataset_id)
+            return entry
+
+    def pop(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.pop(dataset_id, None)
+            if entry is not None:
+                self.resident_bytes -= entry["nbytes"]
+            return entry
+
+    def forget(self, dataset_id: str) -> None:
+        """Drop a dataset entirely (deleted, not evicted)"""
+        with self._lock:
+            self.pop(dataset_id)
+            self._evicted.discard(dataset_id)
+
+    def _enforce_budget(self, keep: str) -> None:
+        if not self.budget:
+            return
+        while self.resident_bytes > self.budget and len(self._entries) > 1:
+            dataset_id = next(iter(self._entries))
+            if dataset_id == keep:
+                self._entries.move_to_end(dataset_id)
+                dataset_id = next(iter(self._entries))
+            entry = self.pop(dataset_id)
+            if self.on_evict is not None:
+                self.on_evict(dataset_id, entry)
+            self._evicted.add(dataset_id)
+            self.counters["evictions"] += 1
+            self.counters["evicted_bytes"] += entry["nbytes"]
+
+    def __contains__(self, dataset_id) -> bool:
+        return dataset_id in self._entries
+
+    def keys(self):
+        return list(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.counters,
+                "resident_datasets": len(self._entries),
+                "resident_bytes": self.resident_bytes,
+                "budget_bytes": self.budget,
+            }
+
+
+# --- Stores ---
+
+class DatasetStore(MutableMapping, ABC):
+    """
+    Dict-like dataset store keyed by dataset_id. Backends implement the abstract methods
+    (and MutableMapping's item access, deletion, iteration and length).
+    `metadata` is a parallel mapping of dataset_id -> upload/listing info.
+    """
+    metadata: MutableMapping
+    cache: FrameCache
+    # Whether other processes opening a store with the same settings see the same datasets
+    shared_across_processes = False
+
+    def get_metadata(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        return self.metadata.get(dataset_id)
+
+    @abstractmethod
+    def version(self, dataset_id: str) -> Optional[int]:
+        """Monotonic per-dataset version, bumped on every write; None if the dataset does not exist"""
+
+    @abstractmethod
+    def write(self, dataset_id: str, df: pd.DataFrame) -> int:
+        """Store `df` as the dataset's next version and return that version (what `store[id] = df` does)"""
+
+    def __setitem__(self, dataset_id: str, df: pd.DataFrame) -> None:
+        self.write(dataset_id, df)
+
+    def schema(self, dataset_id: str) -> List[Tuple[Any, str]]:
+        """(column, dtype name) pairs of a dataset; raises KeyError if it does not exist"""
+        return [(name, str(dtype)) for name, dtype in self[dataset_id].dtypes.items()]
+
+    def zone_maps(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        """Per-block column statistics for skipping data in row queries (None if the store keeps none)"""
+        return None
+
+    def staging_dir(self) -> str:
+        """A fresh (not yet created) directory path for write_columnar output that adopt() can take over"""
+        return os.path.join(DATASET_SPILL_DIR, f".staging-{uuid.uuid4().hex}")
+
+    def adopt(self, dataset_id: str, directory: str) -> int:
+        """
+        Make a columnar directory (from staging_dir) the dataset's next version and return
+        that version; the directory is consumed
+        """
+        version = self.write(dataset_id, read_columnar(directory).copy())
+        shutil.rmtree(directory, ignore_errors=True)
+        return version
+
+    @abstractmethod
+    def add_view(self, view_id: str, parent_id: str, rows: np.ndarray) -> None:
+        """
+        Store `view_id` as the rows at positions `rows` of the parent's current version,
+        without copying any data: reads take just those rows. A view of a view selects from
+        the underlying dataset. Rewriting or deleting the parent materializes its views first.
+        """
+
+    def view_of(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        """{"parent", "parent_version", "rows"} if the dataset is a view, else None"""
+        return None
+
+    def clone(self, dataset_id: str, source_id: str) -> int:
+        """
+        Store the current data of `source_id` as `dataset_id`, sharing column buffers rather
+        than copying; returns the new version of `dataset_id`
+        """
+        return self.write(dataset_id, self[source_id].copy(deep=False))
+
+    def find_content(self, key: str) -> Optional[str]:
+        """A dataset still holding the data stored under `key` by remember_content (None if there is none)"""
+        return None
+
+    def remember_content(self, key: str, dataset_id: str) -> None:
+        """Record that the current version of `dataset_id` holds the data identified by `key` (e.g. an upload hash)"""
+
+    def read_derived(self, dataset_id: str, name: str, version: int) -> Optional[bytes]:
+        """A file previously saved with write_derived for this version of the dataset (None if absent)"""
+        return None
+
+    def write_derived(self, dataset_id: str, name: str, version: int, data: bytes) -> bool:
+        """Persist data computed from `version` of a dataset; False if the store keeps none or it is stale"""
+        return False
+
+    def add_eviction_listener(self, callback: Callable[[str], None]) -> None:
+        """Register a callback run with the dataset_id whenever a dataset leaves memory"""
+        self._eviction_listeners.append(callback)
+
+    def _notify_evicted(self, dataset_id: str) -> None:
+        for callback in self._eviction_listeners:
+            callback(dataset_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__, "datasets": len(self), **self.cache.stats()}
+
+
+class MemoryDatasetStore(DatasetStore):
+    """
+    Process-local store that keeps DataFrames in RAM up to `memory_budget` bytes.
+    Least recently used datasets past the budget are spilled to `spill_dir` in the
+    columnar format and reloaded (memory-mapped) on their next access.
+    """
+
+    def __init__(self, memory_budget: int = DATASET_MEMORY_BUDGET, spill_dir: str = DATASET_SPILL_DIR):
+        self.spill_dir = spill_dir
+        self.cache = FrameCache(memory_budget, on_evict=self._spill)
+        self.metadata = {}
+        self._eviction_listeners = []
+        # dataset_ids whose current data is on disk in spill_dir
+        self._spilled = set()
+        # Current version of each dataset; _counters keeps the last version handed out,
+        # also across deletes, so a version is never reused for a dataset_id
+        self._versions: Dict[str, int] = {}
+        self._counters: Dict[str, int] = {}
+        # Held while a write swaps data and version (reentrant: detaching views writes)
+        self._lock = threading.RLock()
+        # view_id -> {"parent", "parent_version", "rows"}; materialized views are cached like datasets
+        self._views: Dict[str, Dict[str, Any]] = {}
+        # content key -> (dataset_id, version)
+        self._content: Dict[str, Tuple[str, int]] = {}
+
+    def _spill_path(self, dataset_id: str) -> str:
+        return os.path.join(self.spill_dir, dataset_id)
+
+    def _spill(self, dataset_id: str, entry: Dict[str, Any]) -> None:
+        # A view's rows are re-taken from its parent on the next access, nothing to spill
+        if dataset_id not in self._spilled and dataset_id not in self._views:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            staging = os.path.join(self.spill_dir, f".staging-{uuid.uuid4().hex}")
+            write_columnar(entry["df"], staging)
+            replace_directory(staging, self._spill_path(dataset_id))
+            self._spilled.add(dataset_id)
+        self._notify_evicted(dataset_id)
+
+    def _drop_spill(self, dataset_id: str) -> None:
+        if dataset_id in self._spilled:
+            self._spilled.discard(dataset_id)
+            shutil.rmtree(self._spill_path(dataset_id), ignore_errors=True)
+
+    def __getitem__(self, dataset_id: str) -> pd.DataFrame:
+        entry = self.cache.get(dataset_id)
+        if entry is not None:
+            return entry["df"]
+        view = self._views.get(dataset_id)
+        if view is not None:
+            df = self[view["parent"]].iloc[view["rows"]].reset_index(drop=True)
+            self.cache.put(dataset_id, df)
+            return df
+        if dataset_id not in self._spilled:
+            raise KeyError(dataset_id)
+        # Transparent reload; the spill files stay valid until the dataset is rewritten
+        df = read_columnar(self._spill_path(dataset_id))
+        self.cache.put(dataset_id, df)
+        return df
+
+    def _detach_views(self, parent_id: str) -> None:
+        # The parent is about to change or go away: its views become standalone datasets
+        for view_id in [v for v, view in self._views.items() if view["parent"] == parent_id]:
+            df = self[view_id]
+            del self._views[view_id]
+            self.cache.put(view_id, df)
+
+    def _next_version(self, dataset_id: str) -> int:
+        # Called with the lock held; the new data is in place before its version is visible
+        version = self._counters.get(dataset_id, 0) + 1
+        self._counters[dataset_id] = self._versions[dataset_id] = version
+        return version
+
+    def write(self, dataset_id: str, df: pd.DataFrame) -> int:
+        with self._lock:
+            self._detach_views(dataset_id)
+            self._views.pop(dataset_id, None)
+            self._drop_spill(dataset_id)
+            self.cache.put(dataset_id, df)
+            return self._next_version(dataset_id)
+
+    def __delitem__(self, dataset_id: str) -> None:
+        with self._lock:
+            if dataset_id not in self:
+                raise KeyError(dataset_id)
+            self._detach_views(dataset_id)
+            self._views.pop(dataset_id, None)
+            self.cache.forget(dataset_id)
+            self._drop_spill(dataset_id)
+            self._versions.pop(dataset_id, None)
+            self.metadata.pop(dataset_id, None)
+
+    def add_view(self, view_id: str, parent_id: str, rows: np.ndarray) -> None:
+        with self._lock:
+            if parent_id not in self:
+                raise KeyError(parent_id)
+            rows = np.asarray(rows, dtype=np.int64)
+            parent = self._views.get(parent_id)
+            if parent is not None:
+                parent_id, rows = parent["parent"], parent["rows"][rows]
+            if view_id in self:
+                self._detach_views(view_id)
+                self._drop_spill(view_id)
+            self._views[view_id] = {"parent": parent_id, "parent_version": self._versions[parent_id], "rows": rows}
+            self.cache.forget(view_id)
+            self._next_version(view_id)
+
+    def view_of(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        view = self._views.get(dataset_id)
+        if view is None:
+            return None
+        return {"parent": view["parent"], "parent_version": view["parent_version"], "rows": len(view["rows"])}
+
+    def find_content(self, key: str) -> Optional[str]:
+        found = self._content.get(key)
+        if found is None:
+            return None
+        if self._versions.get(found[0]) != found[1]:
+            # Rewritten or deleted since
+            del self._content[key]
+            return None
+        return found[0]
+
+    def remember_content(self, key: str, dataset_id: str) -> None:
+        self._content[key] = (dataset_id, self._versions[dataset_id])
+
+    def schema(self, dataset_id: str) -> List[Tuple[Any, str]]:
+        view = self._views.get(dataset_id)
+        if view is not None and dataset_id not in self.cache:
+            # Same columns as the parent; no need to take the rows
+            return self.schema(view["parent"])
+        return super().schema(dataset_id)
+
+    def version(self, dataset_id: str) -> Optional[int]:
+        return self._versions.get(dataset_id)
+
+    def __contains__(self, dataset_id) -> bool:
+        return dataset_id in self.cache or dataset_id in self._spilled or dataset_id in self._views
+
+    def __iter__(self) -> Iterator[str]:
+        resident = self.cache.keys()
+        return iter(resident + [d for d in list(self._spilled) + list(self._views) if d not in resident])
+
+    def __len__(self) -> int:
+        return len(set(self.cache.keys()) | self._spilled | set(self._views))
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "views": len(self._views)}
+
+
+class _ColumnarMetadata(MutableMapping):
+    """Dataset metadata persisted as info.json next to the columnar files"""
+
+    def __init__(self, store: "ColumnarDatasetStore"):
+        self._store = store
+
+    def _path(self, dataset_id: str) -> str:
+        return os.path.join(self._store.dataset_dir(dataset_id), INFO_FILE)
+
+    def __getitem__(self, dataset_id: str) -> Dict[str, Any]:
+        try:
+            with open(self._path(dataset_id)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            raise KeyError(dataset_id)
+
+    def __setitem__(self, dataset_id: str, info: Dict[str, Any]) -> None:
+        if dataset_id not in self._store:
+            raise KeyError(dataset_id)
+        path = self._path(dataset_id)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(info, f, default=str)
+        os.replace(tmp, path)
+
+    def __delitem__(self, dataset_id: str) -> None:
+        try:
+            os.remove(self._path(dataset_id))
+        except FileNotFoundError:
+            raise KeyError(dataset_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return (dataset_id for dataset_id in self._store if os.path.exists(self._path(dataset_id)))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class ColumnarDatasetStore(DatasetStore):
+    """
+    On-disk store: one directory of column files per dataset under `root`.
+    Reads return memory-mapped frames, so every worker process pointed at the
+    same directory shares the page cache instead of holding its own copy.
+    Opened frames are kept in a `memory_budget`-bounded LRU; evicting one only
+    drops the mapping and materialized string columns, the files stay put.
+    """
+
+    shared_across_processes = True
+
+    def __init__(self, root: str = DATASET_STORE_DIR, memory_budget: int = DATASET_MEMORY_BUDGET):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.metadata = _ColumnarMetadata(self)
+        # Held while a new version is numbered and swapped in, and by write_derived
+        self._lock = threading.Lock()
+        # Last version handed out per dataset (also across deletes): never reused
+        self._counters: Dict[str, int] = {}
+        self._eviction_listeners = []
+        self.cache = FrameCache(memory_budget, on_evict=lambda dataset_id, _: self._notify_evicted(dataset_id))
+        # dataset_id -> (meta stamp, zone maps)
+        self._zone_maps: Dict[str, Any] = {}
+
+    def dataset_dir(self, dataset_id: str) -> str:
+        if not dataset_id or os.sep in dataset_id or dataset_id.startswith("."):
+            raise KeyError(dataset_id)
+        return os.path.join(self.root, dataset_id)
+
+    def _stamp(self, dataset_id: str):
+        st = os.stat(os.path.join(self.dataset_dir(dataset_id), META_FILE))
+        return (st.st_ino, st.st_mtime_ns)
+
+    def __getitem__(self, dataset_id: str) -> pd.DataFrame:
+        try:
+            stamp = self._stamp(dataset_id)
+        except FileNotFoundError:
+            self.cache.forget(dataset_id)
+            raise KeyError(dataset_id)
+        entry = self.cache.get(dataset_id)
+        # A different stamp means another worker rewrote the dataset
+        if entry is not None and entry["stamp"] == stamp:
+            return entry["df"]
+        directory = self.dataset_dir(dataset_id)
+        meta = read_meta(directory)
+        df = read_columnar(directory, meta)
+        self.cache.put(dataset_id, df, stamp=stamp, version=meta["version"])
+        return df
+
+    def schema(self, dataset_id: str) -> List[Tuple[Any, str]]:
+        # Answered from meta.json, without mapping or decoding any column
+        try:
+            meta = read_meta(self.dataset_dir(dataset_id))
+        except FileNotFoundError:
+            raise KeyError(dataset_id)
+        if any("dtype" not in spec for spec in meta["columns"]):
+            return super().schema(dataset_id)
+        return [(spec["name"], spec["dtype"]) for spec in meta["columns"]]
+
+    def zone_maps(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            stamp = self._stamp(dataset_id)
+        except (KeyError, FileNotFoundError):
+            return None
+        cached = self._zone_maps.get(dataset_id)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        zones = read_zone_maps(self.dataset_dir(dataset_id))
+        self._zone_maps[dataset_id] = (stamp, zones)
+        return zones
+
+    def _derived_path(self, dataset_id: str, name: str, version: int) -> str:
+        return os.path.join(self.dataset_dir(dataset_id), DERIVED_DIR, f"v{version}-{name}")
+
+    def read_derived(self, dataset_id: str, name: str, version: int) -> Optional[bytes]:
+        try:
+            with open(self._derived_path(dataset_id, name, version), "rb") as f:
+                return f.read()
+        except (KeyError, FileNotFoundError):
+            return None
+
+    def write_derived(self, dataset_id: str, name: str, version: int, data: bytes) -> bool:
+        path = self._derived_path(dataset_id, name, version)
+        with self._lock:
+            # Rewrites replace the directory under this lock, so a stale result cannot land in the new one
+            if self.version(dataset_id) != version:
+                return False
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            staging = f"{path}.{uuid.uuid4().hex}.part"
+            with open(staging, "wb") as f:
+                f.write(data)
+            os.replace(staging, path)
+        return True
+
+    def version(self, dataset_id: str) -> Optional[int]:
+        try:
+            stamp = self._stamp(dataset_id)
+            entry = self.cache.get(dataset_id)
+            if entry is not None and entry["stamp"] == stamp:
+                return entry["version"]
+            return read_meta(self.dataset_dir(dataset_id))["version"]
+        except (KeyError, FileNotFoundError):
+            return None
+
+    def _install(self, dataset_id: str, staging: str, prepare: Optional[Callable[[str, int], None]] = None) -> int:
+        """
+        Number a complete staging directory as the dataset's next version and swap it in,
+        both under the lock so concurrent writes get distinct versions. `prepare(staging,
+        version)` runs before the swap. Returns the version.
+        """
+        with self._lock:
+            meta = read_meta(staging)
+            version = max(self._counters.get(dataset_id, 0), self.version(dataset_id) or 0) + 1
+            self._counters[dataset_id] = meta["version"] = version
+            if prepare is not None:
+                prepare(staging, version)
+            with open(os.path.join(staging, META_FILE), "w") as f:
+                json.dump(meta, f, default=str)
+            # Keep listing info across rewrites of the data
+            replace_directory(staging, self.dataset_dir(dataset_id), keep=INFO_FILE)
+            self.cache.forget(dataset_id)
+        return version
+
+    def _view_marker(self, parent_id: str, view_id: str) -> str:
+        return os.path.join(self.root, VIEWS_DIR, parent_id, view_id)
+
+    def _unindex_view(self, parent_id: str, view_id: str) -> None:
+        try:
+            os.remove(self._view_marker(parent_id, view_id))
+        except FileNotFoundError:
+            pass
+
+    def _views_of(self, parent_id: str) -> List[str]:
+        try:
+            names = os.listdir(os.path.join(self.root, VIEWS_DIR, parent_id))
+        except FileNotFoundError:
+            return []
+        views = []
+        for view_id in names:
+            view = self.view_of(view_id)
+            if view is not None and view["parent"] == parent_id:
+                views.append(view_id)
+            else:
+                # Rewritten or deleted since
+                self._unindex_view(parent_id, view_id)
+        return views
+
+    def _detach_views(self, parent_id: str) -> None:
+        # The parent is about to change or go away: its views become standalone datasets
+        for view_id in self._views_of(parent_id):
+            try:
+                df = self[view_id]
+            except (KeyError, ValueError):
+                continue
+            self.write(view_id, df)
+            self._unindex_view(parent_id, view_id)
+
+    def add_view(self, view_id: str, parent_id: str, rows: np.ndarray) -> None:
+        parent_dir = self.dataset_dir(parent_id)
+        try:
+            parent_meta = read_meta(parent_dir)
+        except FileNotFoundError:
+            raise KeyError(parent_id)
+        rows = np.asarray(rows, dtype=np.int64)
+        if "view" in parent_meta:
+            rows = read_view_rows(parent_dir)[rows]
+            parent_id = parent_meta["view"]["parent"]
+            parent_dir = self.dataset_dir(parent_id)
+            parent_meta = read_meta(parent_dir)
+        if view_id in self:
+            self._detach_views(view_id)
+        staging = self.staging_dir()
+        write_view(staging, parent_dir, parent_meta, rows)
+        # Indexed before it exists: a concurrent rewrite of the parent must see it
+        marker = self._view_marker(parent_id, view_id)
+        os.makedirs(os.path.dirname(marker), exist_ok=True)
+        open(marker, "w").close()
+        self._install(view_id, staging)
+
+    def view_of(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            meta = read_meta(self.dataset_dir(dataset_id))
+        except (KeyError, FileNotFoundError):
+            return None
+        if "view" not in meta:
+            return None
+        return {**meta["view"], "rows": meta["rows"]}
+
+    def write(self, dataset_id: str, df: pd.DataFrame) -> int:
+        self._detach_views(dataset_id)
+        staging = self.staging_dir()
+        write_columnar(df, staging)
+        return self._install(dataset_id, staging)
+
+    def clone(self, dataset_id: str, source_id: str) -> int:
+        # Hard links to the source's files; results derived from its current version come along
+        source = self.dataset_dir(source_id)
+        try:
+            meta = read_meta(source)
+        except FileNotFoundError:
+            raise KeyError(source_id)
+        self._detach_views(dataset_id)
+        staging = self.staging_dir()
+        os.makedirs(os.path.join(staging, DERIVED_DIR))
+        derived, prefix = os.path.join(source, DERIVED_DIR), f"v{meta['version']}-"
+
+        def link_derived(staging: str, version: int) -> None:
+            for name in os.listdir(derived) if os.path.isdir(derived) else []:
+                if name.startswith(prefix) and not name.endswith(".part"):
+                    _link_or_copy(os.path.join(derived, name),
+                                  os.path.join(staging, DERIVED_DIR, f"v{version}-{name[len(prefix):]}"))
+
+        try:
+            for entry in os.scandir(source):
+                if entry.is_file() and entry.name not in (META_FILE, INFO_FILE):
+                    _link_or_copy(entry.path, os.path.join(staging, entry.name))
+            with open(os.path.join(staging, META_FILE), "w") as f:
+                json.dump(meta, f, default=str)
+            return self._install(dataset_id, staging, prepare=link_derived)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+    def _content_path(self, key: str) -> str:
+        return os.path.join(self.root, CONTENT_DIR, f"{key}.json")
+
+    def find_content(self, key: str) -> Optional[str]:
+        path = self._content_path(key)
+        try:
+            with open(path) as f:
+                found = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if self.version(found["dataset_id"]) != found["version"]:
+            # Rewritten or deleted since
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+        return found["dataset_id"]
+
+    def remember_content(self, key: str, dataset_id: str) -> None:
+        path = self._content_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"dataset_id": dataset_id, "version": self.version(dataset_id)}, f)
+        os.replace(tmp, path)
+
+    def staging_dir(self) -> str:
+        # Inside the root, so adopting it is a rename on the same filesystem
+        return os.path.join(self.root, f".staging-{uuid.uuid4().hex}")
+
+    def adopt(self, dataset_id: str, directory: str) -> int:
+        self._detach_views(dataset_id)
+        return self._install(dataset_id, directory)
+
+    def __delitem__(self, dataset_id: str) -> None:
+        target = self.dataset_dir(dataset_id)
+        self._detach_views(dataset_id)
+        view = self.view_of(dataset_id)
+        with self._lock:
+            self.cache.forget(dataset_id)
+            self._zone_maps.pop(dataset_id, None)
+            if not os.path.isdir(target):
+                raise KeyError(dataset_id)
+            shutil.rmtree(target, ignore_errors=True)
+        if view is not None:
+            self._unindex_view(view["parent"], dataset_id)
+        shutil.rmtree(os.path.join(self.root, VIEWS_DIR, dataset_id), ignore_errors=True)
+
+    def __contains__(self, dataset_id) -> bool:
+        try:
+            return os.path.exists(os.path.join(self.dataset_dir(dataset_id), META_FILE))
+        except KeyError:
+            return False
+
+    def __iter__(self) -> Iterator[str]:
+        for name in sorted(os.listdir(self.root)):
+            if not name.startswith(".") and name in self:
+                yield name
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+def create_dataset_store() -> DatasetStore:
+    if DATASET_STORE_BACKEND == "memory":
+        return MemoryDatasetStore(DATASET_MEMORY_BUDGET, DATASET_SPILL_DIR)
+    if DATASET_STORE_BACKEND == "columnar":
+        return ColumnarDatasetStore(DATASET_STORE_DIR, DATASET_MEMORY_BUDGET)
+    raise ValueError(f"Unknown dataset store backend: {DATASET_STORE_BACKEND}")
@@ -0,0 +1,165 @@
+import os
+import warnings
+from typing import Any, Dict, Iterable, List, Tuple
+import numpy as np
+import pandas as pd
+
+# Shrink dtypes of uploaded datasets (0 keeps pandas' parsed dtypes)
+OPTIMIZE_DTYPES = os.getenv("DATASWIFT_OPTIMIZE_DTYPES", "1") != "0"
+# Narrowest integer type ingest downcasts to. Arithmetic on narrow integers wraps around
+# (e.g. in preprocessing scripts), so the default stops at 32 bits; 8 or 16 save more
+MIN_INT_BITS = int(os.getenv("DATASWIFT_MIN_INT_BITS", "32"))
+# Text columns become categoricals when distinct values are at most this share of the values
+CATEGORY_MAX_RATIO = 0.5
+# Values per column tried as dates before parsing the whole column
+DATE_SAMPLE_ROWS = 1000
+
+_INT_TYPES = [np.dtype(np.int8), np.dtype(np.int16), np.dtype(np.int32)]
+
+
+def _downcast_int(values: np.ndarray):
+    if not len(values):
+        return None
+    low, high = values.min(), values.max()
+    for dtype in _INT_TYPES:
+        if dtype.itemsize * 8 < MIN_INT_BITS or dtype.itemsize >= values.dtype.itemsize:
+            continue
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return values.astype(dtype)
+    return None
+
+
+def _downcast_float(values: np.ndarray):
+    # Only when every value survives the round trip: statistics must not move
+    if values.dtype != np.float64:
+        return None
+    narrow = values.astype(np.float32)
+    with np.errstate(over='ignore'):
+        if np.array_equal(narrow.astype(np.float64), values, equal_nan=True):
+            return narrow
+    return None
+
+
+def _parse_dates(column: pd.Series):
+    present = column.dropna()
+    if not len(present):
+        return None
+    sample = present.iloc[np.linspace(0, len(present) - 1, min(len(present), DATE_SAMPLE_ROWS)).astype(np.int64)]
+    # Words like "May" parse as dates too; dates in files carry digits
+    if not sample.str.contains(r'\d', regex=True).all():
+        return None
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        try:
+            pd.to_datetime(sample)
+            parsed = pd.to_datetime(column)
+        except (ValueError, TypeError, OverflowError):
+            return None
+    # Mixed time zones come back as objects
+    return parsed if pd.api.types.is_datetime64_any_dtype(parsed) else None
+
+
+def _to_category(column: pd.Series):
+    codes, uniques = pd.factorize(column, sort=True)
+    present = int((codes >= 0).sum())
+    if not present or len(uniques) > CATEGORY_MAX_RATIO * present:
+        return None
+    categorical = pd.Categorical.from_codes(codes, categories=pd.Index(uniques, dtype=object), validate=False)
+    return pd.Series(categorical, index=column.index, name=column.name)
+
+
+def _optimize_column(column: pd.Series):
+    dtype = column.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'iu':
+        values = _downcast_int(column.to_numpy())
+    elif isinstance(dtype, np.dtype) and dtype.kind == 'f':
+        values = _downcast_float(column.to_numpy())
+    elif dtype == object and pd.api.types.infer_dtype(column, skipna=True) == 'string':
+        # Dates are parsed once here instead of on every analysis; the rest may be categorical
+        parsed = _parse_dates(column)
+        return parsed if parsed is not None else _to_category(column)
+    else:
+        return None
+    return None if values is None else pd.Series(values, index=column.index, name=column.name)
+
+
+def memory_report(index: pd.Index) -> Dict[str, Any]:
+    """An empty optimize_dtypes report for a frame with `index`, for optimize_column to fill in"""
+    nbytes = int(index.memory_usage(deep=True))
+    return {"before_bytes": nbytes, "after_bytes": nbytes, "converted": {}}
+
+
+def optimize_column(column: pd.Series, report: Dict[str, Any], keep: Iterable = ()) -> pd.Series:
+    """
+    optimize_dtypes for one column, for frames stored column by column: returns the column
+    in its smaller dtype (or the column itself) and adds its sizes and conversion to `report`
+    """
+    nbytes = int(column.memory_usage(index=False, deep=True))
+    report["before_bytes"] += nbytes
+    optimized = _optimize_column(column) if OPTIMIZE_DTYPES and column.name not in keep else None
+    if optimized is None:
+        report["after_bytes"] += nbytes
+        return column
+    report["after_bytes"] += int(optimized.memory_usage(index=False, deep=True))
+    report["converted"][str(column.name)] = f"{column.dtype} -> {optimized.dtype}"
+    return optimized
+
+
+def optimize_dtypes(df: pd.DataFrame, keep: Iterable = ()) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Store a freshly parsed frame in smaller dtypes: integers downcast (not below MIN_INT_BITS),
+    floats to float32 when lossless, date strings parsed to datetimes and low-cardinality
+    text as categoricals. Columns in `keep` (e.g. with schema hints) stay as they are.
+    Returns the frame and {"before_bytes", "after_bytes", "converted"}.
+    """
+    report = memory_report(df.index)
+    keep = set(keep)
+    columns = {}
+    for position in range(df.shape[1]):
+        column = df.iloc[:, position]
+        optimized = optimize_column(column, report, keep)
+        if optimized is not column:
+            columns[position] = optimized
+    if columns:
+        df = df.copy(deep=False)
+        for position, values in columns.items():
+            df.isetitem(position, values)
+    return df, report
+
+
+def decode_categoricals(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[Any]]:
+    """
+    Categorical text columns back to object, as pandas parses them, for code written
+    against parsed files (user scripts, auto-clean): fillna with a new value, string
+    concatenation or assigning new values fail on categoricals. Returns the frame and
+    the names of the decoded columns.
+    """
+    columns = {position: df.iloc[:, position].astype(object)
+               for position, dtype in enumerate(df.dtypes) if isinstance(dtype, pd.CategoricalDtype)}
+    if not columns:
+        return df, []
+    names = [df.columns[position] for position in columns]
+    df = df.copy(deep=False)
+    for position, values in columns.items():
+        df.isetitem(position, values)
+    return df, names
+
+
+def encode_categoricals(df: pd.DataFrame, names: Iterable) -> pd.DataFrame:
+    """Store columns decoded by decode_categoricals that are still low-cardinality text as categoricals again"""
+    names = set(names)
+    columns = {}
+    for position in range(df.shape[1]):
+        column = df.iloc[:, position]
+        if OPTIMIZE_DTYPES and column.name in names and column.dtype == object \
+                and pd.api.types.infer_dtype(column, skipna=True) == 'string':
+            categorical = _to_category(column)
+            if categorical is not None:
+                columns[position] = categorical
+    if not columns:
+        return df
+    df = df.copy(deep=False)
+    for position, values in columns.items():
+        df.isetitem(position, values)
+    return df
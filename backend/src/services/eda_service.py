@@ -1,50 +1,337 @@
-import io
 import uuid
+import functools
+import inspect
+import os
+import shutil
 import pandas as pd
-import matplotlib.pyplot as plt
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import numpy as np
+from .ingest_service import content_key, parse_chunks, read_dataframe
+from .dtype_optimizer import memory_report, optimize_column, optimize_dtypes
+from .dataset_store import DatasetStore, create_dataset_store, read_columnar, write_columnar, write_columnar_chunks
+from .script_runner import SCRIPT_POOL
+from .stats_engine import column_positions, compute_profile, describe_frame, diff_columns, numeric_matrix, update_profile
+from .sketches import DatasetSketch, sketch_dataframe
+from .export_service import iter_export
+from .query_engine import query_rows
+from .pipeline_engine import compile_pipeline, execute_pipeline, explain_plan
+from .split_engine import split_positions
+from .chart_service import CHART_CACHE, DEFAULT_BINS, bar_data, check_chart, render_chart
+from .histogram_index import build_index, column_index, histogram_from_index, index_from_bytes, index_to_bytes, indexable
+from .compute_executor import COMPUTE
 
-# In-memory storage for datasets and EDA results
-DATASETS: Dict[str, pd.DataFrame] = {}
+# Dataset storage (on-disk columnar by default, see dataset_store) and in-memory EDA results
+DATASETS: DatasetStore = create_dataset_store()
 EDA_RESULTS: Dict[str, Dict[str, Any]] = {}
+# "exact" statistics or "approx" (mergeable sketches, see sketches.py)
+EDA_MODES = ('exact', 'approx')
+HISTOGRAM_INDEX_FILE = "histograms.npz"
+# Uploads at least this large are sketched while they are parsed
+SKETCH_AT_INGEST_BYTES = int(os.getenv("DATASWIFT_SKETCH_AT_INGEST_MB", "64")) * 1024 * 1024
+
+
+def _drop_eda_results(dataset_id: str) -> None:
+    EDA_RESULTS.pop(dataset_id, None)
+
+
+# Results follow their dataset out of memory
+DATASETS.add_eviction_listener(_drop_eda_results)
+
+
+def _memoized(func):
+    """
+    Serve repeated EDA calls from EDA_RESULTS until the dataset version changes.
+    Results are keyed by method name and arguments (defaults applied) under the dataset's entry.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(dataset_id: str, *args, **kwargs):
+        version = DATASETS.version(dataset_id)
+        if version is None:
+            return func(dataset_id, *args, **kwargs)
+        bound = signature.bind(dataset_id, *args, **kwargs)
+        bound.apply_defaults()
+        key = (func.__name__,) + tuple(bound.arguments.items())[1:]
+        entry = _memo_entry(dataset_id, version)
+        if key not in entry["results"]:
+            entry["results"][key] = func(dataset_id, *args, **kwargs)
+        return entry["results"][key]
+    return wrapper
+
+
+def _memo_entry(dataset_id: str, version: int) -> Dict[str, Any]:
+    entry = EDA_RESULTS.get(dataset_id)
+    if entry is None or entry["version"] != version:
+        entry = {"version": version, "results": {}}
+        EDA_RESULTS[dataset_id] = entry
+    return entry
+
+
+def frontend_type(dtype) -> str:
+    """Map a pandas dtype (or its name) to the frontend's column types"""
+    if isinstance(dtype, str):
+        try:
+            dtype = pd.api.types.pandas_dtype(dtype)
+        except TypeError:
+            return 'string'
+    if pd.api.types.is_numeric_dtype(dtype):
+        return 'number'
+    elif pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'date'
+    elif pd.api.types.is_bool_dtype(dtype):
+        return 'boolean'
+    else:
+        return 'string'
+
+
+def _check_mode(mode: str) -> None:
+    if mode not in EDA_MODES:
+        raise ValueError(f"Unsupported mode: {mode}. Use one of {', '.join(EDA_MODES)}")
+
+def _outlier_entries(df: pd.DataFrame, stats: pd.DataFrame) -> Dict[str, Any]:
+    """IQR outliers of the columns in `stats`, in one vectorized comparison against the precomputed bounds"""
+    # stats rows follow the numeric columns in order (labels may repeat: the last one wins, as in to_dict)
+    wanted = set(stats.index)
+    positions = [i for i in column_positions(df, 'number') if df.columns[i] in wanted]
+    X = numeric_matrix(df, positions)
+    masks = (X < stats['lower'].to_numpy()) | (X > stats['upper'].to_numpy())
+    outliers = {}
+    for i, (position, col) in enumerate(zip(positions, stats.index)):
+        series = df.iloc[:, position]
+        mask = masks[:, i]
+        outliers[col] = {
+            'count': int(mask.sum()),
+            'indices': series[mask].index.tolist(),
+            'values': series[mask].replace({np.nan: None, np.inf: None, -np.inf: None}).tolist()
+        }
+    return outliers
+
+
+def _carry_forward(dataset_id: str, old: Dict[Any, Any], old_df: pd.DataFrame, version: int,
+                   df: pd.DataFrame, unchanged: List[Any]) -> None:
+    """
+    Seed the memoized results of a new dataset version (same rows) from the previous
+    version's: per-column results of `unchanged` columns are reused and only the
+    affected columns are recomputed. Everything else is rebuilt lazily as usual.
+    """
+    results = _memo_entry(dataset_id, version)["results"]
+    keep = set(unchanged)
+    profile = old.get(("dataset_profile", ("mode", "exact")))
+    if profile is not None:
+        profile = update_profile(profile, df, unchanged)
+        results[("dataset_profile", ("mode", "exact"))] = profile
+        outliers = old.get(("detect_outliers", ("mode", "exact")))
+        # Outlier row labels are only comparable if the index is
+        if outliers is not None and old_df.index.equals(df.index):
+            stats = profile['stats']
+            fresh = _outlier_entries(df, stats.loc[[col for col in stats.index if col not in keep]])
+            results[("detect_outliers", ("mode", "exact"))] = {
+                col: outliers[col] if col in keep else fresh[col] for col in stats.index
+            }
+    index = old.get(("histogram_index",))
+    if index is not None:
+        index = {
+            str(name): index[str(name)] if name in keep and str(name) in index else column_index(df[name])
+            for name, dtype in df.dtypes.items() if indexable(dtype)
+        }
+        results[("histogram_index",)] = index
+        DATASETS.write_derived(dataset_id, HISTOGRAM_INDEX_FILE, version, index_to_bytes(index))
+    kept_names = {str(col) for col in keep}
+    for key, value in old.items():
+        # Per-column chart data: ("chart_data", ("column", name), ("bins", n), ("binning", b))
+        if key[0] == "chart_data" and key[1][1] is not None and key[1][1] in kept_names:
+            results[key] = value
+
 
 class EDAService:
     @staticmethod
     def upload_dataset(file_bytes: bytes, filename: str) -> str:
-        # Support CSV, Excel, and JSON
-        ext = filename.lower().split('.')[-1]
-        if ext in ['csv']:
-            df = pd.read_csv(io.BytesIO(file_bytes))
-        elif ext in ['xlsx', 'xls']:
-            df = pd.read_excel(io.BytesIO(file_bytes))
-        elif ext in ['json']:
-            df = pd.read_json(io.BytesIO(file_bytes))
-        else:
-            raise ValueError(f"Unsupported file type: {ext}")
+        # CSV, Excel, JSON / JSON lines, Parquet or Arrow, sniffed from the content
+        df = read_dataframe(file_bytes, filename)
         dataset_id = str(uuid.uuid4())
-        DATASETS[dataset_id] = df
+        DATASETS[dataset_id], _ = optimize_dtypes(df)
         return dataset_id
 
     @staticmethod
-    def analyze_dataset(dataset_id: str) -> Dict[str, Any]:
+    def upload_dataset_file(path: str, filename: str, digest: Optional[str] = None,
+                            schema: Optional[Dict[str, str]] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        Parse a spooled upload from disk in row chunks (CSV, JSON lines) so the raw bytes
+        never sit in memory next to the parsed data, and store it in smaller dtypes. Chunks
+        are written to the store as they are parsed, so the whole frame is never held either.
+        `schema`: CSV column type hints (see parser_engine.check_schema).
+        Returns the dataset_id and {"deduplicated", "memory"} (optimize_dtypes' report).
+        """
+        content = content_key(filename, digest, schema) if digest else None
+        if content is not None:
+            # Same bytes as a dataset that has not changed since: share its data instead of parsing
+            source_id = DATASETS.find_content(content)
+            if source_id is not None:
+                dataset_id = str(uuid.uuid4())
+                source_version = DATASETS.version(source_id)
+                entry = EDA_RESULTS.get(source_id)
+                try:
+                    version = DATASETS.clone(dataset_id, source_id)
+                except (KeyError, OSError):
+                    pass  # the source changed meanwhile; parse as usual
+                else:
+                    # Results of the version that was cloned, if the source was not rewritten meanwhile
+                    if entry is not None and entry["version"] == source_version == DATASETS.version(source_id):
+                        _memo_entry(dataset_id, version)["results"].update(entry["results"])
+                    memory = (DATASETS.get_metadata(source_id) or {}).get("memory")
+                    return dataset_id, {"deduplicated": True, "memory": memory}
+        sketch = None
+        if os.path.getsize(path) >= SKETCH_AT_INGEST_BYTES:
+            # Large uploads get their approx-mode sketch built from the same chunks
+            sketch = DatasetSketch()
+        dataset_id = str(uuid.uuid4())
+        keep = set(schema or ())
+        memory = memory_report(pd.RangeIndex(0))
+        chunks = parse_chunks(path, filename, on_chunk=sketch.update if sketch else None, schema=schema)
+        staging = DATASETS.staging_dir()
+        try:
+            # Chunks go to disk as they are parsed and columns are optimized one at a time
+            rows = write_columnar_chunks(chunks, staging, lambda column: optimize_column(column, memory, keep))
+            if rows is not None:
+                version = DATASETS.adopt(dataset_id, staging)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        if rows is None:
+            # Chunks with differing columns (e.g. JSON lines with keys only in later rows): combine in memory
+            sketch = None
+            df, memory = optimize_dtypes(read_dataframe(path, filename, schema=schema), keep=keep)
+            version = DATASETS.write(dataset_id, df)
+        # Chunks can parse to other dtypes than the combined frame; keep the sketch only if it still matches
+        if sketch is not None and sketch.matches(DATASETS[dataset_id]):
+            key = (EDAService.dataset_sketch.__name__,)
+            _memo_entry(dataset_id, version)["results"][key] = sketch
+        if content is not None:
+            DATASETS.remember_content(content, dataset_id)
+        return dataset_id, {"deduplicated": False, "memory": memory}
+
+    @staticmethod
+    def replace_dataset(dataset_id: str, df: pd.DataFrame, staged: Optional[str] = None) -> Optional[Dict[str, List[str]]]:
+        """
+        Store a transformed version of a dataset (`staged`: `df` is already written to this
+        columnar directory, which the store adopts). When the rows are the same, cached EDA
+        results (profile, correlations, outliers, histogram index, charts) of the columns
+        the transform left untouched carry over and only affected columns are recomputed.
+        Returns the added/removed/changed columns, or None if every column is affected.
+        """
+        old_version = DATASETS.version(dataset_id)
+        old_df = DATASETS.get(dataset_id)
+        entry = EDA_RESULTS.get(dataset_id)
+        diff = diff_columns(old_df, df) if old_df is not None else None
+        if staged is not None:
+            version = DATASETS.adopt(dataset_id, staged)
+        else:
+            version = DATASETS.write(dataset_id, df)
+        info = DATASETS.get_metadata(dataset_id)
+        if info is not None and "latest_split" in info:
+            # That split was of the old data: download_train/download_test serve the dataset itself again
+            DATASETS.metadata[dataset_id] = {key: value for key, value in info.items() if key != "latest_split"}
+        if diff is None:
+            return None
+        stored = DATASETS.get(dataset_id)
+        # Results carry over to this write's version only, and only while no later write replaced it
+        if entry is not None and entry["version"] == old_version and DATASETS.version(dataset_id) == version:
+            _carry_forward(dataset_id, entry["results"], old_df, version, stored, diff["unchanged"])
+            CHART_CACHE.carry_forward(dataset_id, old_version, version, [str(col) for col in diff["unchanged"]])
+        return {key: [str(col) for col in cols] for key, cols in diff.items() if key != "unchanged"}
+
+    @staticmethod
+    def run_script(dataset_id: str, script: str) -> Optional[Dict[str, List[str]]]:
+        """
+        Run a user script (which reads and reassigns `df`) in the sandboxed script pool and
+        store its result as the dataset's next version. The worker maps the dataset's columnar
+        files and writes its result as a columnar directory that the store adopts.
+        """
+        if dataset_id not in DATASETS:
+            raise ValueError("Dataset not found")
+        temporary = not DATASETS.shared_across_processes
+        if temporary:
+            source = DATASETS.staging_dir()
+            write_columnar(DATASETS[dataset_id], source)
+        else:
+            source = DATASETS.dataset_dir(dataset_id)
+        output = DATASETS.staging_dir()
+        try:
+            SCRIPT_POOL.run(source, script, output)
+            return EDAService.replace_dataset(dataset_id, read_columnar(output), staged=output)
+        finally:
+            if temporary:
+                shutil.rmtree(source, ignore_errors=True)
+            shutil.rmtree(output, ignore_errors=True)
+
+    @staticmethod
+    def plan_pipeline(dataset_id: str, steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """The execution plan of normalized pipeline steps on a dataset, without running it"""
+        df = DATASETS.get(dataset_id)
+        if df is None:
+            raise ValueError("Dataset not found")
+        return explain_plan(compile_pipeline(df, steps))
+
+    @staticmethod
+    def run_pipeline(dataset_id: str, steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Run normalized pipeline steps on a dataset and store the result as its next version"""
+        df = DATASETS.get(dataset_id)
+        if df is None:
+            raise ValueError("Dataset not found")
+        result = execute_pipeline(df, steps)
+        columns = EDAService.replace_dataset(dataset_id, result["frame"])
+        return {"rows_before": len(df), "rows_after": len(result["frame"]), "columns": columns, "plan": result["plan"]}
+
+    @staticmethod
+    def split_dataset(dataset_id: str, **options) -> Dict[str, Dict[str, Any]]:
+        """
+        Split a dataset (see split_engine.split_positions for the options) into views:
+        each part is stored as row positions over the dataset, not as a copy.
+        Returns {part: {"dataset_id", "rows"}}.
+        """
+        df = DATASETS.get(dataset_id)
+        if df is None:
+            raise ValueError("Dataset not found")
+        parts = {}
+        for name, rows in split_positions(df, **options).items():
+            view_id = str(uuid.uuid4())
+            DATASETS.add_view(view_id, dataset_id, rows)
+            parts[name] = {"dataset_id": view_id, "rows": int(len(rows))}
+        return parts
+
+    @staticmethod
+    @_memoized
+    def dataset_sketch(dataset_id: str) -> DatasetSketch:
+        df = DATASETS.get(dataset_id)
+        if df is None:
+            raise ValueError("Dataset not found")
+        return sketch_dataframe(df)
+
+    @staticmethod
+    @_memoized
+    def dataset_profile(dataset_id: str, mode: str = 'exact') -> Dict[str, Any]:
+        # Single-pass statistics shared by every EDA endpoint (see stats_engine),
+        # or the sketch-based approximation of them
+        _check_mode(mode)
+        if mode == 'approx':
+            return EDAService.dataset_sketch(dataset_id).profile()
         df = DATASETS.get(dataset_id)
         if df is None:
             raise ValueError("Dataset not found")
+        return compute_profile(df)
+
+    @staticmethod
+    @_memoized
+    def analyze_dataset(dataset_id: str, mode: str = 'exact') -> Dict[str, Any]:
+        df = DATASETS.get(dataset_id)
+        if df is None:
+            raise ValueError("Dataset not found")
+        profile = EDAService.dataset_profile(dataset_id, mode)
         # Basic EDA: summary stats, missing values, dtypes
-        summary = df.describe(include='all').to_dict()
-        missing = df.isnull().sum().to_dict()
+        summary = describe_frame(df, profile).to_dict()
+        missing = profile['missing'].to_dict()
         # Map pandas dtypes to frontend-friendly types
-        def map_dtype(dtype):
-            if pd.api.types.is_numeric_dtype(dtype):
-                return 'number'
-            elif pd.api.types.is_datetime64_any_dtype(dtype):
-                return 'date'
-            elif pd.api.types.is_bool_dtype(dtype):
-                return 'boolean'
-            else:
-                return 'string'
-        dtypes = {col: map_dtype(dtype) for col, dtype in df.dtypes.items()}
+        dtypes = {col: frontend_type(dtype) for col, dtype in df.dtypes.items()}
 
         # Convert all NaN/inf/-inf to None for JSON compliance
         def clean_nans(obj):
@@ -67,80 +354,184 @@ class EDAService:
             "dtypes": dtypes,
             "preview": preview
         }
-        EDA_RESULTS[dataset_id] = result
+        if mode == 'approx':
+            result["error_bounds"] = profile['error_bounds']
         return result
 
     @staticmethod
-    def visualize_dataset(dataset_id: str, column: str = None) -> bytes:
+    @_memoized
+    def analysis_tables(dataset_id: str, mode: str = 'exact') -> Dict[str, pd.DataFrame]:
+        """analyze_dataset's sections (plus the correlation matrix) as DataFrames, for Arrow transport"""
         df = DATASETS.get(dataset_id)
         if df is None:
             raise ValueError("Dataset not found")
-        # For demo: histogram of first numeric column or specified column
+        profile = EDAService.dataset_profile(dataset_id, mode)
+        return {
+            # One row per dataset column, one column per statistic
+            "summary": describe_frame(df, profile).T.infer_objects().rename_axis('column').reset_index(),
+            "missing": profile['missing'].rename('missing').rename_axis('column').reset_index(),
+            "dtypes": pd.DataFrame({
+                "column": list(df.columns),
+                "dtype": [str(dtype) for dtype in df.dtypes],
+                "type": [frontend_type(dtype) for dtype in df.dtypes],
+            }),
+            "preview": df.head(5),
+            "correlation": profile['corr'].rename_axis('column').reset_index(),
+        }
+
+    @staticmethod
+    @_memoized
+    def dataset_columns(dataset_id: str) -> Dict[str, Any]:
+        """Column names and frontend types for /list, from the store's schema (no column data is read)"""
+        schema = DATASETS.schema(dataset_id)
+        return {
+            "features": [name for name, _ in schema],
+            "types": {name: frontend_type(dtype) for name, dtype in schema},
+        }
+
+    @staticmethod
+    def query_rows(dataset_id: str, filters: Optional[List[str]] = None, sort: Optional[str] = None,
+                   columns: Optional[str] = None, offset: int = 0, limit: int = 100,
+                   cursor: Optional[str] = None, count: bool = False) -> Dict[str, Any]:
+        """One page of filtered/sorted/projected rows, evaluated on the stored dataset"""
+        version = DATASETS.version(dataset_id)
+        df = DATASETS.get(dataset_id)
+        if df is None:
+            raise ValueError("Dataset not found")
+        return query_rows(df, DATASETS.zone_maps(dataset_id), version, filters=filters, sort=sort,
+                          columns=columns, offset=offset, limit=limit, cursor=cursor, count=count)
+
+    @staticmethod
+    @_memoized
+    def histogram_index(dataset_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-column histogram index of the numeric columns (see histogram_index), built in
+        one pass on first use and saved next to the dataset version it describes.
+        """
+        version = DATASETS.version(dataset_id)
+        if version is None:
+            raise ValueError("Dataset not found")
+        saved = DATASETS.read_derived(dataset_id, HISTOGRAM_INDEX_FILE, version)
+        if saved is not None:
+            return index_from_bytes(saved)
+        df = DATASETS.get(dataset_id)
+        if df is None:
+            raise ValueError("Dataset not found")
+        index = build_index(df)
+        DATASETS.write_derived(dataset_id, HISTOGRAM_INDEX_FILE, version, index_to_bytes(index))
+        return index
+
+    @staticmethod
+    @_memoized
+    def chart_data(dataset_id: str, column: str = None, bins: int = DEFAULT_BINS,
+                   binning: str = 'fixed') -> Dict[str, Any]:
+        """
+        Binned chart data for one column (first numeric column by default). Histograms are
+        merged from the histogram index; other columns get category counts.
+        """
+        try:
+            schema = {str(name): dtype for name, dtype in DATASETS.schema(dataset_id)}
+        except KeyError:
+            raise ValueError("Dataset not found")
         if column is None:
-            num_cols = df.select_dtypes(include='number').columns
-            if not num_cols.any():
+            numeric = [name for name, dtype in schema.items() if indexable(dtype)]
+            if not numeric:
                 raise ValueError("No numeric columns to visualize")
-            column = num_cols[0]
-        plt.figure()
-        df[column].hist()
-        plt.title(f"Histogram of {column}")
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png')
-        plt.close()
-        buf.seek(0)
-        return buf.read()
+            column = numeric[0]
+        if column not in schema:
+            raise ValueError(f"Column not found: {column}")
+        if indexable(schema[column]):
+            return histogram_from_index(column, EDAService.histogram_index(dataset_id)[column], bins, binning)
+        df = DATASETS.get(dataset_id)
+        if df is None:
+            raise ValueError("Dataset not found")
+        return bar_data(df[column])
+
+    @staticmethod
+    def render_charts(dataset_id: str, columns: List[str], format: str = 'png',
+                      bins: int = DEFAULT_BINS, binning: str = 'fixed') -> Dict[str, bytes]:
+        """
+        Chart images for several columns. Cached images (by dataset version, column and
+        parameters) are reused; the rest are rendered in parallel on the compute process pool.
+        """
+        check_chart(format, bins)
+        version = DATASETS.version(dataset_id)
+        charts, missing = {}, []
+        for column in columns:
+            key = (dataset_id, version, column, format, bins, binning)
+            cached = CHART_CACHE.get(key) if version is not None else None
+            if cached is None:
+                missing.append(column)
+            else:
+                charts[column] = cached
+        data = [EDAService.chart_data(dataset_id, column, bins, binning) for column in missing]
+        rendered = COMPUTE.map(functools.partial(render_chart, fmt=format), data)
+        for column, image in zip(missing, rendered):
+            if version is not None:
+                CHART_CACHE.put((dataset_id, version, column, format, bins, binning), image)
+            charts[column] = image
+        return {column: charts[column] for column in columns}
 
     @staticmethod
-    def export_dataset(dataset_id: str) -> bytes:
+    def visualize_dataset(dataset_id: str, column: str = None, format: str = 'png',
+                          bins: int = DEFAULT_BINS, binning: str = 'fixed') -> bytes:
+        # For demo: histogram of first numeric column or specified column
+        column = EDAService.chart_data(dataset_id, column, bins, binning)["column"]
+        return EDAService.render_charts(dataset_id, [column], format, bins, binning)[column]
+
+    @staticmethod
+    def export_dataset(dataset_id: str, format: str = 'csv', compression: str = None) -> bytes:
+        return b"".join(EDAService.export_chunks(dataset_id, format, compression))
+
+    @staticmethod
+    def export_chunks(dataset_id: str, format: str = 'csv', compression: str = None) -> Iterator[bytes]:
+        """
+        Serialized dataset in chunks (see export_service), for streaming responses.
+        Nothing is read until the first chunk is requested.
+        """
         df = DATASETS.get(dataset_id)
         if df is None:
             raise ValueError("Dataset not found")
-        buf = io.BytesIO()
-        df.to_csv(buf, index=False)
-        buf.seek(0)
-        return buf.read()
+        yield from iter_export(df, format, compression)
 
     @staticmethod
+    @_memoized
     def correlation_matrix(dataset_id: str) -> Dict[str, Any]:
         df = DATASETS.get(dataset_id)
         if df is None:
             raise ValueError("Dataset not found")
-        corr = df.corr(numeric_only=True)
+        corr = EDAService.dataset_profile(dataset_id)['corr']
         # Replace NaN/inf with None for JSON
         corr = corr.replace({np.nan: None, np.inf: None, -np.inf: None})
         return corr.to_dict()
 
     @staticmethod
-    def detect_outliers(dataset_id: str) -> Dict[str, Any]:
+    @_memoized
+    def detect_outliers(dataset_id: str, mode: str = 'exact') -> Dict[str, Any]:
         df = DATASETS.get(dataset_id)
         if df is None:
             raise ValueError("Dataset not found")
-        outliers = {}
-        for col in df.select_dtypes(include='number').columns:
-            series = df[col]
-            q1 = series.quantile(0.25)
-            q3 = series.quantile(0.75)
-            iqr = q3 - q1
-            lower = q1 - 1.5 * iqr
-            upper = q3 + 1.5 * iqr
-            mask = (series < lower) | (series > upper)
-            outlier_indices = series[mask].index.tolist()
-            outlier_values = series[mask].replace({np.nan: None, np.inf: None, -np.inf: None}).tolist()
-            outliers[col] = {
-                'count': int(mask.sum()),
-                'indices': outlier_indices,
-                'values': outlier_values
-            }
+        profile = EDAService.dataset_profile(dataset_id, mode)
+        stats = profile['stats']
+        outliers = _outlier_entries(df, stats)
+        for col in outliers:
+            if mode == 'approx':
+                # Bounds come from sketch quartiles; the mask itself is exact against them
+                outliers[col]['lower'] = float(stats.loc[col, 'lower'])
+                outliers[col]['upper'] = float(stats.loc[col, 'upper'])
+                outliers[col]['quantile_rank_error'] = profile['error_bounds']['quantile_rank_error']
         return outliers
 
     @staticmethod
-    def generate_insights(dataset_id: str) -> list:
+    @_memoized
+    def generate_insights(dataset_id: str, mode: str = 'exact') -> list:
         df = DATASETS.get(dataset_id)
         if df is None:
             raise ValueError("Dataset not found")
+        profile = EDAService.dataset_profile(dataset_id, mode)
         insights = []
         # High missingness
-        missing = df.isnull().mean()
+        missing = profile['missing'] / len(df) if len(df) else profile['missing'].astype(float)
         for col, frac in missing.items():
             if frac > 0.5:
                 insights.append({
@@ -153,140 +544,28 @@ class EDAService:
                     'message': f"Column '{col}' has {int(frac*100)}% missing values."
                 })
         # Strong correlations
-        corr = df.corr(numeric_only=True)
-        for col1 in corr.columns:
-            for col2 in corr.columns:
-                if col1 != col2 and abs(corr.loc[col1, col2]) > 0.8:
+        corr = profile['corr']
+        values = corr.to_numpy()
+        for i, col1 in enumerate(corr.columns):
+            for j, col2 in enumerate(corr.columns):
+                if col1 != col2 and abs(values[i, j]) > 0.8:
                     insights.append({
                         'type': 'info',
-                        'message': f"Columns '{col1}' and '{col2}' are strongly correlated (corr={corr.loc[col1, col2]:.2f})."
+                        'message': f"Columns '{col1}' and '{col2}' are strongly correlated (corr={values[i, j]:.2f})."
                     })
         # Outliers
-        for col in df.select_dtypes(include='number').columns:
-            series = df[col]
-            q1 = series.quantile(0.25)
-            q3 = series.quantile(0.75)
-            iqr = q3 - q1
-            lower = q1 - 1.5 * iqr
-            upper = q3 + 1.5 * iqr
-            mask = (series < lower) | (series > upper)
-            count = int(mask.sum())
+        for col, count in profile['stats']['outlier_count'].items():
+            count = int(count)
             if count > 0:
+                approx = "approximately " if mode == 'approx' else ""
                 insights.append({
                     'type': 'warning',
-                    'message': f"Column '{col}' has {count} outlier value(s) (IQR method)."
+                    'message': f"Column '{col}' has {approx}{count} outlier value(s) (IQR method)."
                 })
         # Suggestion: all numeric
-        if len(df.select_dtypes(include='number').columns) == df.shape[1]:
+        if len(profile['numeric_columns']) == df.shape[1]:
             insights.append({
                 'type': 'suggestion',
                 'message': "All columns are numeric. Consider dimensionality reduction or feature selection."
             })
-        return insights 
-
-    @staticmethod
-    def export_report(dataset_id: str, format: str = 'html') -> bytes:
-        import base64
-        df = DATASETS.get(dataset_id)
-        if df is None:
-            raise ValueError("Dataset not found")
-        # Try to use ydata-profiling (pandas-profiling)
-        try:
-            from ydata_profiling import ProfileReport
-            profile = ProfileReport(df, title="EDA Report", minimal=True)
-            if format == 'html':
-                html = profile.to_html()
-                return html.encode('utf-8')
-            elif format == 'pdf':
-                # Requires pdfkit and wkhtmltopdf installed
-                import pdfkit
-                html = profile.to_html()
-                pdf = pdfkit.from_string(html, False)
-                return pdf
-        except ImportError:
-            pass
-        # Fallback: comprehensive HTML summary
-        html = f"<html><head><title>EDA Report</title></head><body>"
-        html += f"<h1>EDA Report</h1>"
-        html += f"<h2>Shape</h2><p>{df.shape[0]} rows × {df.shape[1]} columns</p>"
-        html += f"<h2>Columns</h2><ul>"
-        for col in df.columns:
-            html += f"<li>{col} ({df[col].dtype})</li>"
-        html += "</ul>"
-        # Summary statistics
-        html += f"<h2>Summary Statistics</h2>"
-        html += df.describe(include='all').to_html()
-        # Missing values
-        html += f"<h2>Missing Values</h2>"
-        missing = df.isnull().sum()
-        html += missing.to_frame('Missing Count').to_html()
-        # Correlation matrix
-        html += f"<h2>Correlation Matrix</h2>"
-        corr = df.corr(numeric_only=True)
-        html += corr.to_html()
-        # Outlier summary
-        html += f"<h2>Outlier Summary</h2>"
-        outliers = EDAService.detect_outliers(dataset_id)
-        if outliers:
-            html += "<table border='1'><tr><th>Column</th><th>Outlier Count</th><th>Sample Outlier Values</th></tr>"
-            for col, info in outliers.items():
-                sample_vals = ', '.join(str(v) for v in (info['values'][:5] if info['values'] else []))
-                html += f"<tr><td>{col}</td><td>{info['count']}</td><td>{sample_vals}</td></tr>"
-            html += "</table>"
-        else:
-            html += "<p>No outliers detected.</p>"
-        # AI Insights
-        html += f"<h2>AI Insights</h2>"
-        insights = EDAService.generate_insights(dataset_id)
-        if insights:
-            html += "<ul>"
-            for ins in insights:
-                html += f"<li><b>{ins['type'].capitalize()}:</b> {ins['message']}</li>"
-            html += "</ul>"
-        else:
-            html += "<p>No insights generated.</p>"
-        # Charts: Numeric columns (histograms)
-        html += f"<h2>Numeric Distributions</h2>"
-        for col in df.select_dtypes(include='number').columns:
-            try:
-                import matplotlib.pyplot as plt
-                import io
-                plt.figure()
-                df[col].hist()
-                plt.title(f"Histogram of {col}")
-                buf = io.BytesIO()
-                plt.savefig(buf, format='png')
-                plt.close()
-                buf.seek(0)
-                img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-                html += f'<div><b>{col}</b><br><img src="data:image/png;base64,{img_base64}" style="max-width:400px;"></div>'
-            except Exception as e:
-                html += f'<div><b>{col}</b>: Error generating chart ({e})</div>'
-        # Charts: Categorical columns (bar charts)
-        html += f"<h2>Categorical Distributions</h2>"
-        for col in df.select_dtypes(include='object').columns:
-            try:
-                import matplotlib.pyplot as plt
-                import io
-                plt.figure()
-                df[col].value_counts().plot(kind='bar')
-                plt.title(f"Bar Chart of {col}")
-                buf = io.BytesIO()
-                plt.savefig(buf, format='png')
-                plt.close()
-                buf.seek(0)
-                img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-                html += f'<div><b>{col}</b><br><img src="data:image/png;base64,{img_base64}" style="max-width:400px;"></div>'
-            except Exception as e:
-                html += f'<div><b>{col}</b>: Error generating chart ({e})</div>'
-        html += "</body></html>"
-        if format == 'html':
-            return html.encode('utf-8')
-        elif format == 'pdf':
-            try:
-                import pdfkit
-                pdf = pdfkit.from_string(html, False)
-                return pdf
-            except ImportError:
-                raise ValueError('PDF export requires pdfkit and wkhtmltopdf.')
-        raise ValueError('Unsupported format') 
\ No newline at end of file
+        return insights
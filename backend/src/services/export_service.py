@@ -0,0 +1,232 @@
+import io
+import zlib
+from typing import Callable, Dict, Iterator, Optional
+import pandas as pd
+
+# Rows serialized per chunk (one Parquet row group / Arrow record batch each)
+EXPORT_CHUNK_ROWS = 100_000
+ARROW_STREAM_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+# format -> (media type, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': (ARROW_STREAM_MEDIA_TYPE, 'arrows'),
+}
+# compression -> (media type, file extension suffix)
+EXPORT_COMPRESSIONS = {
+    'gzip': ('application/gzip', 'gz'),
+    'zstd': ('application/zstd', 'zst'),
+}
+
+
+def _pyarrow(fmt: str):
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+        return pyarrow
+    except ImportError:
+        raise ValueError(f"{fmt} export requires pyarrow")
+
+
+def arrow_available() -> bool:
+    try:
+        _pyarrow('arrow')
+        return True
+    except ValueError:
+        return False
+
+
+def _zstd_compressor():
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("zstd compression requires the zstandard package")
+    return zstandard.ZstdCompressor().compressobj()
+
+
+def check_export(fmt: str, compression: Optional[str] = None) -> None:
+    """Validate the requested format/compression before a response starts streaming"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}. Use one of {', '.join(EXPORT_FORMATS)}")
+    if compression and compression not in EXPORT_COMPRESSIONS:
+        raise ValueError(f"Unsupported compression: {compression}. Use one of {', '.join(EXPORT_COMPRESSIONS)}")
+    if fmt in ('parquet', 'arrow'):
+        _pyarrow(fmt)
+    if compression == 'zstd':
+        _zstd_compressor()
+
+
+def export_media_type(fmt: str, compression: Optional[str] = None) -> str:
+    if compression:
+        return EXPORT_COMPRESSIONS[compression][0]
+    return EXPORT_FORMATS[fmt][0]
+
+
+def export_filename(stem: str, fmt: str, compression: Optional[str] = None) -> str:
+    name = f"{stem}.{EXPORT_FORMATS[fmt][1]}"
+    if compression:
+        name += f".{EXPORT_COMPRESSIONS[compression][1]}"
+    return name
+
+
+def _row_chunks(df: pd.DataFrame, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    # iloc slices are views, so only one chunk's serialized output is alive at a time
+    for start in range(0, len(df), max(1, chunk_rows)):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _iter_csv(df: pd.DataFrame, chunk_rows: int) -> Iterator[bytes]:
+    if len(df) == 0:
+        yield df.to_csv(index=False).encode('utf-8')
+        return
+    for i, chunk in enumerate(_row_chunks(df, chunk_rows)):
+        yield chunk.to_csv(index=False, header=(i == 0)).encode('utf-8')
+
+
+def _iter_jsonl(df: pd.DataFrame, chunk_rows: int) -> Iterator[bytes]:
+    for chunk in _row_chunks(df, chunk_rows):
+        text = chunk.to_json(orient='records', lines=True, date_format='iso')
+        yield (text if text.endswith('\n') else text + '\n').encode('utf-8')
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose contents are handed out (and released) piecewise"""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _as_text(value):
+    return None if value is None or (isinstance(value, float) and value != value) else str(value)
+
+
+def _arrow_schema(df: pd.DataFrame):
+    """
+    One Arrow schema for the whole frame, so a chunk that happens to be all-null keeps
+    its column type. Object columns Arrow cannot type (mixed values) become strings;
+    returns the schema and the positions of those columns.
+    """
+    pa = _pyarrow('arrow')
+    try:
+        return pa.Schema.from_pandas(df, preserve_index=False), set()
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        pass
+    fields, stringified = [], set()
+    for i in range(df.shape[1]):
+        column = df.iloc[:, i]
+        name = str(df.columns[i])
+        try:
+            fields.append(pa.Schema.from_pandas(column.to_frame(name), preserve_index=False).field(0))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            fields.append(pa.field(name, pa.string()))
+            stringified.add(i)
+    return pa.schema(fields), stringified
+
+
+def _arrow_table(chunk: pd.DataFrame, schema, stringified):
+    pa = _pyarrow('arrow')
+    arrays = []
+    for i, field in enumerate(schema):
+        column = chunk.iloc[:, i]
+        if i in stringified:
+            column = column.map(_as_text)
+        arrays.append(pa.Array.from_pandas(column, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _arrow_batches(df: pd.DataFrame, chunk_rows: int):
+    schema, stringified = _arrow_schema(df)
+    return schema, (_arrow_table(chunk, schema, stringified) for chunk in _row_chunks(df, chunk_rows))
+
+
+def _iter_parquet(df: pd.DataFrame, chunk_rows: int) -> Iterator[bytes]:
+    pq = _pyarrow('parquet').parquet
+    schema, tables = _arrow_batches(df, chunk_rows)
+    sink = _DrainableSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for table in tables:
+            writer.write_table(table, row_group_size=chunk_rows)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _iter_arrow(df: pd.DataFrame, chunk_rows: int) -> Iterator[bytes]:
+    pa = _pyarrow('arrow')
+    schema, tables = _arrow_batches(df, chunk_rows)
+    sink = _DrainableSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for table in tables:
+            writer.write_table(table)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def accepts_arrow(accept: Optional[str]) -> bool:
+    """Whether an Accept header asks for Arrow IPC (explicitly, with non-zero quality)"""
+    for media_range in (accept or '').split(','):
+        media_type, *params = [part.strip() for part in media_range.split(';')]
+        if media_type.lower() != ARROW_STREAM_MEDIA_TYPE:
+            continue
+        quality = next((p.split('=', 1)[1] for p in params if p.startswith('q=')), '1')
+        try:
+            return float(quality) > 0
+        except ValueError:
+            return True
+    return False
+
+
+def arrow_stream_bytes(df: pd.DataFrame) -> bytes:
+    """A whole (small) frame as one Arrow IPC stream, e.g. a preview or a stats table"""
+    return b''.join(_iter_arrow(df, max(1, len(df))))
+
+
+_WRITERS: Dict[str, Callable[[pd.DataFrame, int], Iterator[bytes]]] = {
+    'csv': _iter_csv,
+    'jsonl': _iter_jsonl,
+    'parquet': _iter_parquet,
+    'arrow': _iter_arrow,
+}
+
+
+def _compress(chunks: Iterator[bytes], compression: str) -> Iterator[bytes]:
+    if compression == 'gzip':
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    else:
+        compressor = _zstd_compressor()
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_export(df: pd.DataFrame, fmt: str = 'csv', compression: Optional[str] = None,
+                chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Serialize a frame chunk by chunk. Memory stays bounded by one chunk's output
+    instead of the whole file, so it can back a StreamingResponse.
+    """
+    check_export(fmt, compression)
+    chunks = (chunk for chunk in _WRITERS[fmt](df, chunk_rows) if chunk)
+    if compression:
+        chunks = _compress(chunks, compression)
+    return chunks
@@ -0,0 +1,117 @@
+import io
+import json
+from typing import Any, Dict, Tuple
+import numpy as np
+import pandas as pd
+
+# Fine equal-width bins kept per column. 5040 is divisible by every count from 1 to 10
+# (and 12, 14, 15, 16, 18, 20, ...), so those resolutions are exact merges of index bins
+INDEX_BINS = 5040
+# Equal-frequency (quantile) bins kept per column
+ADAPTIVE_BINS = 64
+BINNINGS = ('fixed', 'adaptive')
+
+
+def indexable(dtype) -> bool:
+    """Numeric, non-boolean columns get a histogram index"""
+    dtype = pd.api.types.pandas_dtype(dtype)
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+def column_index(series: pd.Series) -> Dict[str, Any]:
+    """
+    One pass over a numeric column: count, nulls, min/max, INDEX_BINS equal-width bin
+    counts over [min, max] (np.histogram's range) and ADAPTIVE_BINS quantile bins.
+    """
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    finite = values[np.isfinite(values)]
+    entry = {"count": int(len(finite)), "nulls": int(len(values) - len(finite)),
+             "min": None, "max": None, "low": None, "high": None,
+             "fixed": np.zeros(0, dtype=np.int64), "edges": np.zeros(0), "adaptive": np.zeros(0, dtype=np.int64)}
+    if not len(finite):
+        return entry
+    lo, hi = float(finite.min()), float(finite.max())
+    # Same degenerate range np.histogram uses for a constant column
+    low, high = (lo - 0.5, hi + 0.5) if lo == hi else (lo, hi)
+    positions = ((finite - low) * (INDEX_BINS / (high - low))).astype(np.int64)
+    np.clip(positions, 0, INDEX_BINS - 1, out=positions)
+    edges = np.unique(np.quantile(finite, np.linspace(0, 1, ADAPTIVE_BINS + 1)))
+    if len(edges) == 1:
+        edges = np.array([low, high])
+    entry.update({
+        "min": lo, "max": hi, "low": low, "high": high,
+        "fixed": np.bincount(positions, minlength=INDEX_BINS),
+        "edges": edges,
+        "adaptive": np.histogram(finite, bins=edges)[0],
+    })
+    return entry
+
+
+def build_index(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    return {str(name): column_index(df[name]) for name, dtype in df.dtypes.items() if indexable(dtype)}
+
+
+def index_to_bytes(index: Dict[str, Dict[str, Any]]) -> bytes:
+    """Compact .npz encoding (bin arrays as arrays, scalars as one JSON header)"""
+    arrays, header = {}, []
+    for i, (name, entry) in enumerate(index.items()):
+        header.append({"name": name, **{k: v for k, v in entry.items() if not isinstance(v, np.ndarray)}})
+        for key in ("fixed", "edges", "adaptive"):
+            arrays[f"c{i}_{key}"] = entry[key]
+    buf = io.BytesIO()
+    np.savez_compressed(buf, header=np.array(json.dumps(header)), **arrays)
+    return buf.getvalue()
+
+
+def index_from_bytes(data: bytes) -> Dict[str, Dict[str, Any]]:
+    with np.load(io.BytesIO(data)) as npz:
+        index = {}
+        for i, entry in enumerate(json.loads(str(npz["header"]))):
+            name = entry.pop("name")
+            index[name] = {**entry, **{key: npz[f"c{i}_{key}"] for key in ("fixed", "edges", "adaptive")}}
+        return index
+
+
+def fixed_bins(entry: Dict[str, Any], bins: int) -> Tuple[np.ndarray, np.ndarray, bool]:
+    """
+    `bins` equal-width bins over [min, max] by merging index bins: (edges, counts, exact).
+    When `bins` does not divide INDEX_BINS the index bins straddling a boundary are split
+    in proportion, so counts are approximate.
+    """
+    if not entry["count"]:
+        return np.zeros(0), np.zeros(0, dtype=np.int64), True
+    edges = np.linspace(entry["low"], entry["high"], bins + 1)
+    base = entry["fixed"]
+    if INDEX_BINS % bins == 0:
+        return edges, base.reshape(bins, -1).sum(axis=1), True
+    cumulative = np.concatenate([[0], np.cumsum(base)])
+    at_edges = np.interp(np.linspace(0, INDEX_BINS, bins + 1), np.arange(INDEX_BINS + 1), cumulative)
+    return edges, np.diff(np.round(at_edges)).astype(np.int64), False
+
+
+def adaptive_bins(entry: Dict[str, Any], bins: int) -> Tuple[np.ndarray, np.ndarray, bool]:
+    """About `bins` equal-frequency bins by merging runs of adjacent quantile bins (exact counts)"""
+    counts = entry["adaptive"]
+    if not len(counts):
+        return np.zeros(0), np.zeros(0, dtype=np.int64), True
+    cuts = np.unique(np.round(np.linspace(0, len(counts), min(bins, len(counts)) + 1)).astype(np.int64))
+    return entry["edges"][cuts], np.add.reduceat(counts, cuts[:-1]), True
+
+
+def histogram_from_index(name: str, entry: Dict[str, Any], bins: int,
+                         binning: str = 'fixed') -> Dict[str, Any]:
+    """Chart data for one indexed column, in O(index bins) without touching the column"""
+    if binning not in BINNINGS:
+        raise ValueError(f"Unsupported binning: {binning}. Use one of {', '.join(BINNINGS)}")
+    edges, counts, exact = (fixed_bins if binning == 'fixed' else adaptive_bins)(entry, bins)
+    return {
+        "column": name,
+        "kind": "histogram",
+        "binning": binning,
+        "edges": edges.tolist(),
+        "counts": counts.tolist(),
+        "exact": exact,
+        "min": entry["min"],
+        "max": entry["max"],
+        "nulls": entry["nulls"],
+    }
@@ -0,0 +1,138 @@
+import os
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+# Rows scored per model call; bounds the feature matrix held in memory at once
+PREDICT_BATCH_ROWS = int(os.getenv("DATASWIFT_PREDICT_BATCH_ROWS", "50000"))
+
+
+class ConstantModel:
+    """Placeholder model that predicts the same label for every row"""
+
+    def __init__(self, value: Any = 1):
+        self.value = value
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return np.full(len(X), self.value)
+
+
+class DemoRuleModel:
+    """
+    Rule-based stand-in used by /predict/predict until real artifacts are served.
+    Scores on `feature1`/`feature2` when present, otherwise guesses.
+    """
+    classes_ = np.array([0, 1])
+    feature_names_in_ = ['feature1', 'feature2']
+
+    def __init__(self, seed: Optional[int] = None):
+        self._rng = np.random.default_rng(seed)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X)
+        n = len(X)
+        if X.shape[1] < 2:
+            p = self._rng.uniform(0.3, 0.9, n)
+        else:
+            f1, f2 = X[:, 0], X[:, 1]
+            total = f1 + f2
+            p = self._rng.uniform(0.4, 0.8, n)
+            high = (f1 > 2.0) & (f2 > 3.0)
+            low = (f1 < 1.0) & (f2 < 2.0)
+            p[high] = np.minimum(0.95, 0.7 + total[high] * 0.05)
+            p[low] = np.maximum(0.05, 0.3 - total[low] * 0.05)
+            # 10% of rows get the "wrong" answer to look realistic
+            flip = self._rng.random(n) < 0.1
+            p[flip] = 1 - p[flip]
+        return np.column_stack([1 - p, p])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def model_features(model: Any, df: pd.DataFrame) -> List[str]:
+    """Columns fed to the model: its fitted feature names if known, else every numeric column"""
+    names = getattr(model, 'feature_names_in_', None)
+    if names is not None:
+        return [col for col in names if col in df.columns]
+    return list(df.select_dtypes(include=['number', 'bool']).columns)
+
+
+def feature_matrix(df: pd.DataFrame, features: List[str]) -> np.ndarray:
+    """Contiguous float64 matrix of the feature columns (missing values as NaN)"""
+    if not features:
+        return np.empty((len(df), 0), dtype=np.float64)
+    return np.ascontiguousarray(df[features].to_numpy(dtype=np.float64, na_value=np.nan))
+
+
+def predict_frame(model: Any, df: pd.DataFrame, features: Optional[List[str]] = None,
+                  batch_size: int = PREDICT_BATCH_ROWS) -> Dict[str, Optional[np.ndarray]]:
+    """
+    Score a whole frame in batches of `batch_size` rows, one model call per batch.
+    Classifiers with predict_proba get labels from the arg-max probability so each
+    batch is scored once; `probability` is P(positive class) for binary models and
+    the winning class probability otherwise.
+    """
+    if features is None:
+        features = model_features(model, df)
+    use_proba = hasattr(model, 'predict_proba') and hasattr(model, 'classes_')
+    # Models fitted on DataFrames expect their column names back (a zero-copy wrapper)
+    named = getattr(model, 'feature_names_in_', None) is not None
+    predictions, probabilities = [], []
+    for start in range(0, len(df), max(1, batch_size)):
+        X = feature_matrix(df.iloc[start:start + batch_size], features)
+        if named:
+            X = pd.DataFrame(X, columns=features, copy=False)
+        if use_proba:
+            proba = np.asarray(model.predict_proba(X))
+            predictions.append(np.asarray(model.classes_)[proba.argmax(axis=1)])
+            probabilities.append(proba[:, 1] if proba.shape[1] == 2 else proba.max(axis=1))
+        else:
+            predictions.append(np.asarray(model.predict(X)))
+    return {
+        "prediction": np.concatenate(predictions) if predictions else np.empty(0),
+        "probability": np.concatenate(probabilities) if probabilities else None,
+    }
+
+
+def prediction_records(df: pd.DataFrame, result: Dict[str, Optional[np.ndarray]],
+                       limit: Optional[int] = None, decimals: int = 3) -> List[Dict[str, Any]]:
+    """Assemble the per-row response from whole columns, only for the rows being returned"""
+    if limit is not None:
+        df = df.head(limit)
+    n = len(df)
+    inputs = df.replace({np.nan: None, np.inf: None, -np.inf: None}).to_dict(orient='records')
+    predictions = result["prediction"][:n].tolist()
+    if result["probability"] is None:
+        return [{"input": row, "prediction": pred} for row, pred in zip(inputs, predictions)]
+    probabilities = np.round(result["probability"][:n], decimals).tolist()
+    return [
+        {"input": row, "prediction": pred, "probability": prob}
+        for row, pred, prob in zip(inputs, predictions, probabilities)
+    ]
+
+
+def mock_actual_values(model: Any, prediction: np.ndarray, agreement: float = 0.8,
+                       seed: Optional[int] = None) -> np.ndarray:
+    """
+    Stand-in "actual" labels for the demo confusion matrix when an upload has no target
+    column: each prediction is kept with probability `agreement`, otherwise replaced by
+    another predicted label (0 <-> 1 for binary 0/1 predictions). Empty for models
+    without class labels (regressors), which have no confusion matrix.
+    """
+    prediction = np.asarray(prediction)
+    labels = np.unique(prediction) if len(prediction) else prediction
+    binary = isinstance(model, DemoRuleModel) or (
+        len(labels) > 0 and pd.api.types.is_numeric_dtype(labels.dtype) and bool(np.isin(labels, [0, 1]).all()))
+    if binary:
+        labels = np.array([0, 1])
+    elif not hasattr(model, "classes_"):
+        return prediction[:0]
+    if len(labels) < 2:
+        return prediction.copy()
+    rng = np.random.default_rng(seed)
+    n = len(prediction)
+    # Another label: a random nonzero step through the sorted labels
+    codes = np.searchsorted(labels, prediction)
+    other = labels[(codes + rng.integers(1, len(labels), n)) % len(labels)]
+    return np.where(rng.random(n) < agreement, prediction, other)
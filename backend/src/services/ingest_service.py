@@ -0,0 +1,238 @@
+import hashlib
+import io
+import json
+import os
+import tempfile
+from typing import Callable, Dict, Iterator, Optional, Tuple, Union
+import pandas as pd
+from .parser_engine import csv_engine, pandas_csv_options, read_csv
+
+# Bytes pulled from the upload stream per read
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Rows parsed per chunk for formats that can be read incrementally
+PARSE_CHUNK_ROWS = 100_000
+# Formats that are parsed row-chunk (or record batch) by row-chunk and are therefore not size capped
+STREAMABLE_EXTENSIONS = {'csv', 'jsonl', 'ndjson', 'parquet', 'pq', 'arrow', 'arrows', 'feather', 'ipc'}
+SUPPORTED_EXTENSIONS = STREAMABLE_EXTENSIONS | {'xlsx', 'xls', 'json'}
+# Formats read_dataframe parses; the format of a file is sniffed from its first bytes (see sniff_format)
+FILE_FORMATS = ('csv', 'jsonl', 'json', 'xlsx', 'xls', 'parquet', 'arrow', 'arrows')
+# Bytes sniff_format looks at
+SNIFF_BYTES = 64 * 1024
+
+# Leading bytes -> format: Parquet, Arrow IPC file (Feather v2), Arrow IPC stream
+# (continuation marker), xlsx (a zip archive), xls (OLE2 compound document)
+_MAGIC = [
+    (b'PAR1', 'parquet'),
+    (b'ARROW1', 'arrow'),
+    (b'\xff\xff\xff\xff', 'arrows'),
+    (b'PK\x03\x04', 'xlsx'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'xls'),
+]
+JSON_LINES_EXTENSIONS = {'jsonl', 'ndjson'}
+# Non-streamable formats (Excel, JSON documents) are parsed in one go, so keep them capped
+MAX_BUFFERED_UPLOAD_SIZE = int(os.getenv("DATASWIFT_MAX_BUFFERED_UPLOAD_MB", "50")) * 1024 * 1024
+# Optional global cap for streamable formats, 0 means unlimited
+MAX_STREAMED_UPLOAD_SIZE = int(os.getenv("DATASWIFT_MAX_STREAMED_UPLOAD_MB", "0")) * 1024 * 1024
+
+
+Source = Union[str, bytes]
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+def file_extension(filename: str) -> str:
+    return (filename or '').lower().split('.')[-1]
+
+
+def upload_size_limit(filename: str) -> Optional[int]:
+    """Return the byte limit for an upload, or None when it is unlimited"""
+    if file_extension(filename) in STREAMABLE_EXTENSIONS:
+        return MAX_STREAMED_UPLOAD_SIZE or None
+    return MAX_BUFFERED_UPLOAD_SIZE
+
+
+def content_key(filename: str, digest: str, schema: Optional[Dict[str, str]] = None) -> str:
+    """Identity of an upload's parsed content: the same bytes parse the same way for the same format and schema hints"""
+    key = f"{file_extension(filename)}-{digest}"
+    if schema:
+        key += "-" + hashlib.sha256(json.dumps(schema, sort_keys=True).encode()).hexdigest()[:16]
+    return key
+
+
+async def spool_upload(file, chunk_size: int = UPLOAD_CHUNK_SIZE, any_extension: bool = False) -> Tuple[str, int, str]:
+    """
+    Copy an UploadFile to a temporary file on disk chunk by chunk, hashing it on the way.
+    Returns the temporary path, the number of bytes written and their SHA-256 hex digest;
+    the caller owns the file. `any_extension`: accept files named with any extension
+    (their format is sniffed when they are parsed).
+    """
+    ext = file_extension(file.filename)
+    if ext not in SUPPORTED_EXTENSIONS and not any_extension:
+        raise ValueError(f"Unsupported file type: {ext}")
+    limit = upload_size_limit(file.filename)
+    fd, path = tempfile.mkstemp(prefix="dataswift_upload_", suffix=f".{ext}" if ext in SUPPORTED_EXTENSIONS else "")
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if limit is not None and size > limit:
+                    raise UploadTooLarge(f"File size exceeds {limit // (1024 * 1024)}MB limit")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, size, digest.hexdigest()
+
+
+def _head(source: Source) -> bytes:
+    if isinstance(source, bytes):
+        return source[:SNIFF_BYTES]
+    with open(source, 'rb') as f:
+        return f.read(SNIFF_BYTES)
+
+
+def _json_lines(text: bytes) -> bool:
+    """Whether text holds at least two lines that are each a JSON object (JSON lines, not one document)"""
+    lines = [line for line in text.split(b'\n')[:-1] if line.strip()][:2]
+    if len(lines) < 2:
+        return False
+    try:
+        return all(isinstance(json.loads(line), dict) for line in lines)
+    except ValueError:
+        return False
+
+
+def sniff_format(source: Source, filename: str) -> str:
+    """
+    The format of a file (path) or bytes, one of FILE_FORMATS: binary formats by their
+    magic bytes, JSON by its first character (JSON lines when the extension says so or the
+    first lines are objects each), anything else is read as CSV.
+    """
+    head = _head(source)
+    for magic, fmt in _MAGIC:
+        if head.startswith(magic):
+            return fmt
+    text = head.lstrip(b'\xef\xbb\xbf \t\r\n')
+    if text.startswith(b'['):
+        return 'json'
+    if text.startswith(b'{'):
+        if file_extension(filename) in JSON_LINES_EXTENSIONS or _json_lines(text):
+            return 'jsonl'
+        return 'json'
+    return 'csv'
+
+
+def _pyarrow_module(fmt: str):
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+        return pyarrow
+    except ImportError:
+        raise ValueError(f"{fmt} files require pyarrow")
+
+
+def _frame(batch) -> pd.DataFrame:
+    df = batch.to_pandas()
+    # An index stored with the data (pandas metadata) stays as columns: rows are renumbered when chunks are combined
+    return df if isinstance(df.index, pd.RangeIndex) else df.reset_index()
+
+
+def _record_batches(source: Source, fmt: str, chunk_rows: int):
+    pa = _pyarrow_module(fmt)
+    stream = pa.BufferReader(source) if isinstance(source, bytes) else pa.memory_map(source)
+    if fmt == 'parquet':
+        yield from pa.parquet.ParquetFile(stream).iter_batches(batch_size=chunk_rows)
+    elif fmt == 'arrow':
+        reader = pa.ipc.open_file(stream)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+    else:
+        yield from pa.ipc.open_stream(stream)
+
+
+def iter_dataframe_chunks(source: Source, filename: str, chunk_rows: int = PARSE_CHUNK_ROWS,
+                          schema: Optional[Dict[str, str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Parse a file (path) or bytes into DataFrame chunks in a single pass, incrementally
+    where the format allows (CSV, JSON lines, Parquet row groups, Arrow record batches)
+    """
+    fmt = sniff_format(source, filename)
+    if schema and fmt != 'csv':
+        raise ValueError("Schema hints apply to CSV files only")
+    data = io.BytesIO(source) if isinstance(source, bytes) else source
+    if fmt == 'csv':
+        with pd.read_csv(data, chunksize=chunk_rows, **pandas_csv_options(schema)) as reader:
+            for chunk in reader:
+                yield chunk
+    elif fmt == 'jsonl':
+        with pd.read_json(data, lines=True, chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                yield chunk
+    elif fmt in ('xlsx', 'xls'):
+        yield pd.read_excel(data)
+    elif fmt == 'json':
+        yield pd.read_json(data)
+    else:
+        for batch in _record_batches(source, fmt, chunk_rows):
+            yield _frame(batch)
+
+
+def _multithreaded_csv(source: Source, filename: str) -> bool:
+    return sniff_format(source, filename) == 'csv' and csv_engine(source) != 'pandas'
+
+
+def parse_chunks(source: Source, filename: str, chunk_rows: int = PARSE_CHUNK_ROWS,
+                 on_chunk: Optional[Callable[[pd.DataFrame], None]] = None,
+                 schema: Optional[Dict[str, str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    The DataFrame chunks read_dataframe combines, for consumers that store them as they come
+    (see dataset_store.write_columnar_chunks). Large CSV files go through the multi-threaded
+    parser engine: parsed whole, then handed out in slices of `chunk_rows`.
+    """
+    if _multithreaded_csv(source, filename):
+        df = read_csv(source, schema=schema)
+        # At least one (empty) slice, so a header-only file keeps its columns
+        chunks = (df.iloc[start:start + chunk_rows] for start in range(0, max(len(df), 1), chunk_rows))
+    else:
+        chunks = iter_dataframe_chunks(source, filename, chunk_rows, schema)
+    for chunk in chunks:
+        if on_chunk is not None:
+            on_chunk(chunk)
+        yield chunk
+
+
+def read_dataframe(source: Source, filename: str, chunk_rows: int = PARSE_CHUNK_ROWS,
+                   on_chunk: Optional[Callable[[pd.DataFrame], None]] = None,
+                   schema: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    Parse a file (a spooled upload's path, or bytes) of any of FILE_FORMATS into a single
+    DataFrame in one pass, without holding a path's raw bytes in memory. `on_chunk` sees
+    every parsed chunk, e.g. to build sketches during ingest. Large CSV files go through
+    the multi-threaded parser engine, `on_chunk` then sees slices of the result.
+    `schema`: column type hints for CSV (see parser_engine).
+    Chunked formats briefly hold the chunks next to the combined frame (about twice its
+    size); uploads stored as datasets use parse_chunks instead.
+    """
+    if _multithreaded_csv(source, filename):
+        df = read_csv(source, schema=schema)
+        if on_chunk is not None:
+            for start in range(0, len(df), chunk_rows):
+                on_chunk(df.iloc[start:start + chunk_rows])
+        return df
+    chunks = parse_chunks(source, filename, chunk_rows, on_chunk, schema)
+    first = next(chunks, None)
+    if first is None:
+        return pd.DataFrame()
+    rest = list(chunks)
+    if not rest:
+        return first
+    return pd.concat([first] + rest, ignore_index=True, copy=False)
@@ -0,0 +1,163 @@
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Memory budget for loaded models, approximated by artifact size (0 = unlimited)
+MODEL_CACHE_BUDGET = int(os.getenv("DATASWIFT_MODEL_CACHE_MB", "512")) * 1024 * 1024
+# How long an experiment without a servable artifact is remembered before it is looked up again
+MISSING_TTL = float(os.getenv("DATASWIFT_MODEL_MISSING_TTL", "30"))
+
+
+def experiment_keys(experiment: Dict[str, Any]):
+    """Ids an experiment can be addressed by: its experiment_id and its database _id"""
+    keys = []
+    for field in ("experiment_id", "_id"):
+        if experiment.get(field) is not None and str(experiment[field]) not in keys:
+            keys.append(str(experiment[field]))
+    return keys
+
+
+class ModelRegistry:
+    """
+    In-process cache of deserialized model artifacts for deployed experiments.
+    Models are loaded once, served from memory, and evicted least recently used
+    first once their combined footprint exceeds `budget` bytes. Experiments found
+    to have no servable artifact are remembered for `missing_ttl` seconds.
+    """
+
+    def __init__(self, budget: int = MODEL_CACHE_BUDGET, missing_ttl: float = MISSING_TTL):
+        self.budget = budget
+        self.missing_ttl = missing_ttl
+        self._models: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._aliases: Dict[str, str] = {}
+        self._missing: Dict[str, Any] = {}
+        self._generation = 0  # bumped by evict(), so a lookup that raced one is not remembered as missing
+        self._lock = threading.RLock()
+        self.resident_bytes = 0
+        self.counters = {"hits": 0, "misses": 0, "loads": 0, "evictions": 0, "load_errors": 0, "missing_hits": 0}
+
+    def get(self, experiment_id: str) -> Optional[Any]:
+        with self._lock:
+            key = self._aliases.get(str(experiment_id))
+            entry = self._models.get(key) if key else None
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self._models.move_to_end(key)
+            self.counters["hits"] += 1
+            return entry["model"]
+
+    def resolve(self, experiment_id: str, lookup: Callable[[str], Optional[Dict[str, Any]]]) -> Optional[Any]:
+        """
+        Cached model for an experiment, loading it on a miss from the record `lookup` returns.
+        Returns None, without calling `lookup` again until the entry expires, when there is no model to serve.
+        """
+        model = self.get(experiment_id)
+        if model is not None:
+            return model
+        with self._lock:
+            missing = self._missing.get(str(experiment_id))
+            if missing is not None:
+                if missing[0] > time.monotonic():
+                    self.counters["missing_hits"] += 1
+                    return None
+                self._forget_missing(str(experiment_id))
+            generation = self._generation
+        experiment = lookup(experiment_id)
+        model = self.load(experiment) if experiment else None
+        if model is None:
+            self._mark_missing([str(experiment_id)] + (experiment_keys(experiment) if experiment else []), generation)
+        return model
+
+    def _mark_missing(self, keys, generation: int) -> None:
+        with self._lock:
+            if not self.missing_ttl or generation != self._generation:
+                return
+            entry = (time.monotonic() + self.missing_ttl, tuple(dict.fromkeys(keys)))
+            for key in entry[1]:
+                self._missing[key] = entry
+
+    def _forget_missing(self, key: str) -> None:
+        entry = self._missing.pop(key, None)
+        for alias in entry[1] if entry else ():
+            self._missing.pop(alias, None)
+
+    def load(self, experiment: Dict[str, Any]) -> Optional[Any]:
+        """
+        Load (or reuse) the artifact of an experiment record.
+        Returns None when the experiment has no servable artifact.
+        """
+        path = experiment.get("artifact_path")
+        keys = experiment_keys(experiment)
+        if not path or not keys or not os.path.exists(path):
+            return None
+        stamp = os.stat(path).st_mtime_ns
+        with self._lock:
+            entry = self._models.get(keys[0])
+            if entry is not None and entry["path"] == path and entry["stamp"] == stamp:
+                self._models.move_to_end(keys[0])
+                return entry["model"]
+        try:
+            with open(path, "rb") as f:
+                model = pickle.load(f)
+        except Exception:
+            logger.exception("Failed to load model artifact %s", path)
+            with self._lock:
+                self.counters["load_errors"] += 1
+            return None
+        if not hasattr(model, "predict"):
+            # e.g. placeholder artifacts written by the demo training job
+            return None
+        with self._lock:
+            self.evict(keys[0])
+            nbytes = os.path.getsize(path)
+            self._models[keys[0]] = {"model": model, "path": path, "stamp": stamp, "nbytes": nbytes}
+            for key in keys:
+                self._aliases[key] = keys[0]
+                self._forget_missing(key)
+            self.resident_bytes += nbytes
+            self.counters["loads"] += 1
+            self._enforce_budget(keep=keys[0])
+        return model
+
+    def evict(self, experiment_id: str) -> None:
+        """Drop the cached model (or remembered absence) of an experiment so the next use reloads it"""
+        with self._lock:
+            self._forget_missing(str(experiment_id))
+            self._generation += 1
+            key = self._aliases.get(str(experiment_id), str(experiment_id))
+            entry = self._models.pop(key, None)
+            if entry is not None:
+                self.resident_bytes -= entry["nbytes"]
+            for alias in [a for a, k in self._aliases.items() if k == key]:
+                del self._aliases[alias]
+
+    def _enforce_budget(self, keep: str) -> None:
+        if not self.budget:
+            return
+        while self.resident_bytes > self.budget and len(self._models) > 1:
+            key = next(k for k in self._models if k != keep)
+            self.evict(key)
+            self.counters["evictions"] += 1
+
+    def preload(self, experiments) -> int:
+        """Warm the cache with every given experiment that has an artifact; returns how many loaded"""
+        return sum(1 for experiment in experiments if self.load(experiment) is not None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.counters,
+                "models": list(self._models),
+                "resident_bytes": self.resident_bytes,
+                "budget_bytes": self.budget,
+            }
+
+
+MODEL_REGISTRY = ModelRegistry()
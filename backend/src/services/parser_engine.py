@@ -0,0 +1,207 @@
+import io
+import mmap
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+# CSV parser: auto (pyarrow's multi-threaded reader when installed, else byte ranges parsed
+# in parallel, for files of at least PARALLEL_PARSE_MIN_BYTES), pyarrow, parallel or pandas
+CSV_ENGINES = ('auto', 'pyarrow', 'parallel', 'pandas')
+CSV_ENGINE = os.getenv("DATASWIFT_CSV_ENGINE", "auto")
+# Threads for the pyarrow reader and for parallel byte ranges
+PARSE_THREADS = int(os.getenv("DATASWIFT_PARSE_THREADS", str(os.cpu_count() or 1)))
+# Smaller files are parsed by pandas directly: threads do not pay off there
+PARALLEL_PARSE_MIN_BYTES = int(os.getenv("DATASWIFT_PARALLEL_PARSE_MIN_MB", "16")) * 1024 * 1024
+# Schema hint types (column -> type) accepted by check_schema
+SCHEMA_TYPES = ('integer', 'float', 'boolean', 'string', 'category', 'datetime')
+
+# Hint type -> pandas read_csv dtype (datetime columns go to parse_dates instead)
+_PANDAS_TYPES = {'integer': 'int64', 'float': 'float64', 'boolean': 'bool', 'string': 'object', 'category': 'category'}
+
+Source = Union[str, bytes]
+
+
+def check_schema(schema: Any) -> Optional[Dict[str, str]]:
+    """Validate schema hints: {"column": "integer|float|boolean|string|category|datetime"}"""
+    if schema is None:
+        return None
+    if not isinstance(schema, dict):
+        raise ValueError("schema must map column names to types")
+    for column, kind in schema.items():
+        if kind not in SCHEMA_TYPES:
+            raise ValueError(f"Unsupported type for column {column}: {kind}. Use one of {', '.join(SCHEMA_TYPES)}")
+    return {str(column): kind for column, kind in schema.items()}
+
+
+def pandas_csv_options(schema: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    """read_csv keyword arguments that apply schema hints (hinted columns skip type inference)"""
+    if not schema:
+        return {}
+    options: Dict[str, Any] = {"dtype": {col: _PANDAS_TYPES[kind] for col, kind in schema.items() if kind != 'datetime'}}
+    dates = [col for col, kind in schema.items() if kind == 'datetime']
+    if dates:
+        options["parse_dates"] = dates
+    return options
+
+
+def pyarrow_available() -> bool:
+    try:
+        import pyarrow.csv  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _size(source: Source) -> int:
+    return len(source) if isinstance(source, bytes) else os.path.getsize(source)
+
+
+def _buffer(source: Source):
+    """The source's bytes: the bytes themselves, or a read-only mapping of the file"""
+    if isinstance(source, bytes):
+        return source
+    with open(source, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _pandas(source: Source, schema: Optional[Dict[str, str]]) -> pd.DataFrame:
+    return pd.read_csv(io.BytesIO(source) if isinstance(source, bytes) else source, **pandas_csv_options(schema))
+
+
+def _pyarrow(source: Source, schema: Optional[Dict[str, str]]) -> Optional[pd.DataFrame]:
+    """Parse with pyarrow.csv; None when the result would differ from pandas' (caller falls back)"""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    schema = schema or {}
+    buffer = _buffer(source)
+    # Quoted fields may hold newlines, which need the slower row splitting
+    quoted = buffer.find(b'"') != -1
+    types = {'integer': pa.int64(), 'float': pa.float64(), 'boolean': pa.bool_(), 'string': pa.string(),
+             'category': pa.string(), 'datetime': pa.timestamp('ns')}
+    column_types = {col: types[kind] for col, kind in schema.items()}
+
+    def parse():
+        return pa_csv.read_csv(
+            pa.BufferReader(buffer) if isinstance(buffer, bytes) else pa.py_buffer(buffer),
+            read_options=pa_csv.ReadOptions(use_threads=PARSE_THREADS > 1),
+            parse_options=pa_csv.ParseOptions(newlines_in_values=quoted),
+            # Same null markers as pandas, in text columns too
+            convert_options=pa_csv.ConvertOptions(column_types=column_types, strings_can_be_null=True),
+        )
+
+    try:
+        table = parse()
+        names = table.column_names
+        if len(set(names)) != len(names):
+            # pandas renames duplicate headers (a, a.1); leave those files to it
+            return None
+        # pyarrow reads ISO dates and times as temporal types where pandas keeps the text
+        temporal = [field.name for field in table.schema if field.name not in schema and (
+            pa.types.is_date(field.type) or pa.types.is_time(field.type) or pa.types.is_timestamp(field.type))]
+        if temporal:
+            column_types.update({name: pa.string() for name in temporal})
+            table = parse()
+    except pa.ArrowInvalid:
+        # Ragged rows, a column whose later values do not fit the inferred type, ...
+        return None
+    for col, kind in schema.items():
+        if kind == 'integer' and col in names and table.column(col).null_count:
+            raise ValueError(f"Integer column {col} has missing values")
+    df = table.to_pandas(coerce_temporal_nanoseconds=True)
+    # pandas' name for headerless columns
+    df.columns = [name if name != '' else f"Unnamed: {i}" for i, name in enumerate(names)]
+    for i, column in enumerate(table.columns):
+        if column.null_count and df.dtypes.iloc[i] == object:
+            # Missing text is NaN in pandas, None from pyarrow
+            df.isetitem(i, df.iloc[:, i].fillna(np.nan))
+    for col, kind in schema.items():
+        if kind == 'category' and col in names:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def _ranges(buffer, parts: int) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """The header line and `parts` byte ranges of whole lines after it"""
+    header_end = buffer.find(b'\n') + 1 or len(buffer)
+    bounds = [header_end]
+    step = (len(buffer) - header_end) // parts
+    for i in range(1, parts):
+        cut = buffer.find(b'\n', header_end + i * step)
+        if cut == -1 or cut + 1 <= bounds[-1]:
+            continue
+        bounds.append(cut + 1)
+    bounds.append(len(buffer))
+    return buffer[:header_end], [(start, stop) for start, stop in zip(bounds, bounds[1:]) if stop > start]
+
+
+def _parallel(source: Source, schema: Optional[Dict[str, str]]) -> Optional[pd.DataFrame]:
+    """
+    Parse newline-aligned byte ranges with pandas on threads (its tokenizer releases the GIL).
+    None when the file has quoted fields (a newline may sit inside one) or the ranges
+    inferred incompatible types (caller falls back to one pandas pass).
+    """
+    buffer = _buffer(source)
+    if not len(buffer) or buffer.find(b'"') != -1:
+        return None
+    header, ranges = _ranges(buffer, max(1, PARSE_THREADS))
+    columns = list(pd.read_csv(io.BytesIO(header), nrows=0).columns)
+    options = pandas_csv_options(schema)
+
+    def parse(bounds: Tuple[int, int]) -> pd.DataFrame:
+        start, stop = bounds
+        return pd.read_csv(io.BytesIO(buffer[start:stop]), header=None, names=columns, **options)
+
+    with ThreadPoolExecutor(max_workers=len(ranges) or 1, thread_name_prefix="dataswift-parse") as pool:
+        parts = list(pool.map(parse, ranges))
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    for part in parts:
+        # More fields than header names make pandas use the extras as the index
+        if list(part.columns) != columns or not isinstance(part.index, pd.RangeIndex):
+            return None
+    for i in range(len(columns)):
+        dtypes = {part.dtypes.iloc[i] for part in parts}
+        if len(dtypes) == 1:
+            continue
+        # Integers in some ranges and floats (or nulls) in others promote like one pass would;
+        # any other mix (e.g. numbers here, text there) needs the whole column's inference
+        if not all(isinstance(dtype, np.dtype) and dtype.kind in 'if' for dtype in dtypes):
+            return None
+    with warnings.catch_warnings():
+        # Concatenating all-null ranges
+        warnings.simplefilter('ignore', FutureWarning)
+        return pd.concat(parts, ignore_index=True, copy=False)
+
+
+def csv_engine(source: Source, engine: str = CSV_ENGINE) -> str:
+    """The engine read_csv uses for `source`"""
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"Unsupported CSV engine: {engine}. Use one of {', '.join(CSV_ENGINES)}")
+    if engine != 'auto':
+        return engine
+    if _size(source) < PARALLEL_PARSE_MIN_BYTES:
+        return 'pandas'
+    return 'pyarrow' if pyarrow_available() else 'parallel'
+
+
+def read_csv(source: Source, schema: Optional[Dict[str, str]] = None, engine: str = CSV_ENGINE) -> pd.DataFrame:
+    """
+    Parse a CSV file path or bytes into a DataFrame with the same columns and values as
+    pd.read_csv, using a multi-threaded engine where possible. `schema` hints (see
+    check_schema) fix the types of those columns instead of inferring them.
+    """
+    engine = csv_engine(source, engine)
+    if engine == 'pyarrow' and not pyarrow_available():
+        raise ValueError("The pyarrow CSV engine requires pyarrow")
+    df = None
+    if engine == 'pyarrow':
+        df = _pyarrow(source, schema)
+    elif engine == 'parallel':
+        df = _parallel(source, schema)
+    return df if df is not None else _pandas(source, schema)
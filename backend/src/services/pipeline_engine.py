@@ -0,0 +1,509 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import warnings
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from .query_engine import filter_mask, filter_value, split_filter
+
+# Saved pipelines, one JSON file per name
+PIPELINE_DIR = os.getenv("DATASWIFT_PIPELINE_DIR", os.path.join(tempfile.gettempdir(), "dataswift", "pipelines"))
+PIPELINE_OPS = ('impute', 'cast', 'dedupe', 'filter', 'encode', 'scale')
+IMPUTE_STRATEGIES = ('auto', 'mean', 'median', 'mode', 'constant')
+CAST_TYPES = ('number', 'integer', 'float', 'boolean', 'datetime', 'string', 'category')
+ENCODE_METHODS = ('onehot', 'ordinal')
+SCALE_METHODS = ('standard', 'minmax')
+# One-hot encoding refuses columns with more distinct values (per step: max_categories)
+MAX_ONEHOT_CATEGORIES = 100
+
+_STEP_KEYS = {
+    'impute': {'columns', 'strategy', 'value'},
+    'cast': {'columns', 'to'},
+    'dedupe': {'subset', 'keep'},
+    'filter': {'where'},
+    'encode': {'columns', 'method', 'drop_first', 'max_categories'},
+    'scale': {'columns', 'method'},
+}
+_CAST_KINDS = {'number': 'numeric', 'integer': 'numeric', 'float': 'numeric', 'boolean': 'boolean',
+               'datetime': 'datetime', 'string': 'text', 'category': 'category'}
+_BOOLEAN_WORDS = {'true': True, 't': True, 'yes': True, 'y': True, '1': True,
+                  'false': False, 'f': False, 'no': False, 'n': False, '0': False}
+_PIPELINE_NAME = re.compile(r'^[A-Za-z0-9_.-]{1,64}$')
+
+
+# --- Spec validation ---
+
+def _names(step: Dict[str, Any], key: str, label: str, required: bool = False) -> Optional[List[str]]:
+    value = step.get(key)
+    if value is None:
+        if required:
+            raise ValueError(f"{label}: '{key}' is required")
+        return None
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or not value or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"{label}: '{key}' must be a column name or a non-empty list of them")
+    return value
+
+
+def _choice(step: Dict[str, Any], key: str, label: str, choices, default=None) -> Any:
+    value = step.get(key, default)
+    if value not in choices:
+        raise ValueError(f"{label}: unsupported {key} {value!r}. Use one of {', '.join(choices)}")
+    return value
+
+
+def check_pipeline(spec: Any) -> List[Dict[str, Any]]:
+    """
+    Validate a pipeline spec ({"steps": [{"op": ..., ...}, ...]}) without a dataset and
+    return its normalized steps (defaults filled in). Column names are checked when the
+    pipeline is planned against a dataset.
+    """
+    steps = spec.get("steps") if isinstance(spec, dict) else None
+    if not isinstance(steps, list) or not steps:
+        raise ValueError("A pipeline needs a non-empty 'steps' list")
+    normalized = []
+    for index, step in enumerate(steps):
+        if not isinstance(step, dict) or step.get("op") not in PIPELINE_OPS:
+            raise ValueError(f"Step {index}: 'op' must be one of {', '.join(PIPELINE_OPS)}")
+        op = step["op"]
+        label = f"Step {index} ({op})"
+        unknown = set(step) - _STEP_KEYS[op] - {'op'}
+        if unknown:
+            raise ValueError(f"{label}: unknown option(s) {', '.join(sorted(unknown))}")
+        if op == 'impute':
+            entry = {"columns": _names(step, 'columns', label),
+                     "strategy": _choice(step, 'strategy', label, IMPUTE_STRATEGIES, 'auto')}
+            if entry["strategy"] == 'constant':
+                if step.get('value') is None:
+                    raise ValueError(f"{label}: the constant strategy needs a 'value'")
+                entry["value"] = step['value']
+        elif op == 'cast':
+            entry = {"columns": _names(step, 'columns', label, required=True),
+                     "to": _choice(step, 'to', label, CAST_TYPES)}
+        elif op == 'dedupe':
+            entry = {"subset": _names(step, 'subset', label),
+                     "keep": _choice(step, 'keep', label, ('first', 'last'), 'first')}
+        elif op == 'filter':
+            where = _names(step, 'where', label, required=True)
+            for condition in where:
+                try:
+                    split_filter(condition)
+                except ValueError as e:
+                    raise ValueError(f"{label}: {e}")
+            entry = {"where": where}
+        elif op == 'encode':
+            entry = {"columns": _names(step, 'columns', label),
+                     "method": _choice(step, 'method', label, ENCODE_METHODS, 'onehot'),
+                     "drop_first": bool(step.get('drop_first', False)),
+                     "max_categories": step.get('max_categories', MAX_ONEHOT_CATEGORIES)}
+            if not isinstance(entry["max_categories"], int) or entry["max_categories"] < 1:
+                raise ValueError(f"{label}: max_categories must be a positive integer")
+        else:
+            entry = {"columns": _names(step, 'columns', label),
+                     "method": _choice(step, 'method', label, SCALE_METHODS, 'standard')}
+        normalized.append({"op": op, **entry})
+    return normalized
+
+
+# --- Planning ---
+
+def _kind(dtype) -> str:
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'boolean'
+    if isinstance(dtype, pd.CategoricalDtype):
+        return 'category'
+    if pd.api.types.is_numeric_dtype(dtype):
+        return 'numeric'
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'datetime'
+    return 'text'
+
+
+class _Node:
+    """
+    A lazily evaluated column: column `source` of the input frame, or step `index` applied
+    element-wise to `parent`. `rows` is the number of row operations (filters, dedupes) that
+    preceded the step in the spec: its statistics are fitted on exactly those rows, so
+    evaluating it on fewer rows later gives the same values as the eager pipeline.
+    """
+
+    __slots__ = ('column', 'kind', 'source', 'parent', 'index', 'step', 'rows')
+
+    def __init__(self, column: str, kind: str, source: Optional[int] = None, parent: Optional["_Node"] = None,
+                 index: Optional[int] = None, step: Optional[Dict[str, Any]] = None, rows: int = 0):
+        self.column, self.kind, self.source, self.parent = column, kind, source, parent
+        self.index, self.step, self.rows = index, step, rows
+
+    def chain(self) -> List["_Node"]:
+        """The step nodes from the source column up to this node"""
+        nodes, node = [], self
+        while node.parent is not None:
+            nodes.append(node)
+            node = node.parent
+        return nodes[::-1]
+
+
+def _describe(node: _Node) -> str:
+    step = node.step
+    detail = {'impute': 'strategy', 'cast': 'to', 'encode': 'method', 'scale': 'method'}[step["op"]]
+    return f"#{node.index} {step['op']}({step[detail]})"
+
+
+def _lookup(columns: Dict[str, _Node], name: str, label: str) -> _Node:
+    node = columns.get(name)
+    if node is None:
+        raise ValueError(f"{label}: column not found: {name}")
+    if node.kind == 'onehot':
+        raise ValueError(f"{label}: column {name} was one-hot encoded by an earlier step")
+    return node
+
+
+def _targets(columns: Dict[str, _Node], step: Dict[str, Any], label: str, kinds) -> List[str]:
+    """The columns a column step applies to: the listed ones, or every column of a suitable kind"""
+    if step["columns"] is None:
+        return [name for name, node in columns.items() if node.kind in kinds]
+    for name in step["columns"]:
+        node = _lookup(columns, name, label)
+        if node.kind not in kinds:
+            raise ValueError(f"{label}: cannot apply to {node.kind} column {name}")
+    return list(dict.fromkeys(step["columns"]))
+
+
+def compile_pipeline(df: pd.DataFrame, steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Plan normalized steps against a frame's schema without touching its values. Column steps
+    become per-column expression chains (consecutive steps on a column fuse into one pass);
+    filters and dedupes become row operations evaluated only on the columns they reference,
+    so the remaining steps, encodings included, run once on the surviving rows.
+    """
+    if not df.columns.is_unique:
+        raise ValueError("Pipelines need unique column names")
+    columns = {str(name): _Node(str(name), _kind(dtype), source=i) for i, (name, dtype) in enumerate(df.dtypes.items())}
+    row_ops = []
+    every_kind = ('numeric', 'boolean', 'datetime', 'text', 'category')
+    for index, step in enumerate(steps):
+        op = step["op"]
+        label = f"Step {index} ({op})"
+        if op == 'filter':
+            where = []
+            for condition in step["where"]:
+                name, fop, raw = split_filter(condition)
+                where.append({"column": name, "node": _lookup(columns, name, label), "op": fop, "raw": raw})
+            row_ops.append({"op": op, "index": index, "where": where})
+            continue
+        if op == 'dedupe':
+            names = step["subset"] or list(columns)
+            subset = [(name, columns[name] if step["subset"] is None else _lookup(columns, name, label)) for name in names]
+            row_ops.append({"op": op, "index": index, "subset": subset, "keep": step["keep"]})
+            continue
+        if op == 'impute':
+            numeric = step["strategy"] in ('mean', 'median')
+            names, kind = _targets(columns, step, label, ('numeric',) if numeric else every_kind), None
+        elif op == 'cast':
+            names, kind = _targets(columns, step, label, every_kind), _CAST_KINDS[step["to"]]
+        elif op == 'encode':
+            kinds = every_kind if step["columns"] is not None else ('text', 'category')
+            names = _targets(columns, step, label, kinds)
+            kind = 'onehot' if step["method"] == 'onehot' else 'numeric'
+        else:
+            names, kind = _targets(columns, step, label, ('numeric',)), 'numeric'
+        for name in names:
+            parent = columns[name]
+            columns[name] = _Node(name, kind or parent.kind, parent=parent, index=index, step=step, rows=len(row_ops))
+    return {"columns": columns, "row_ops": row_ops, "steps": steps}
+
+
+def explain_plan(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """The physical plan: fused row stages, then one projection of every output column"""
+    stages = []
+    for op in plan["row_ops"]:
+        if op["op"] == 'filter':
+            nodes = [cond["node"] for cond in op["where"]]
+            detail = {"where": [f"{c['column']}:{c['op']}" + (f":{c['raw']}" if c['raw'] is not None else '')
+                                for c in op["where"]]}
+        else:
+            nodes = [node for _, node in op["subset"]]
+            detail = {"subset": [name for name, _ in op["subset"]], "keep": op["keep"]}
+        needed = {n.index for node in nodes for n in node.chain()}
+        # Column steps written before this row operation that it does not need run after it
+        deferred = sorted({n.index for node in plan["columns"].values() for n in node.chain()
+                           if n.index < op["index"] and n.index not in needed})
+        if op["op"] == 'filter' and stages and stages[-1]["stage"] == 'filter':
+            stage = stages[-1]
+            stage["steps"].append(op["index"])
+            stage["where"] += detail["where"]
+            stage["pushed_before"] = sorted(set(stage["pushed_before"]) | set(deferred))
+            continue
+        stages.append({"stage": op["op"], "steps": [op["index"]], **detail, "pushed_before": deferred})
+    projection = []
+    for name, node in plan["columns"].items():
+        chain = node.chain()
+        projection.append({"column": name + ('_*' if node.kind == 'onehot' else ''),
+                           "steps": [_describe(n) for n in chain]})
+    stages.append({"stage": "project", "columns": projection,
+                   "fused_steps": sum(len(col["steps"]) for col in projection)})
+    return {"steps": len(plan["steps"]), "passes": len(stages), "stages": stages}
+
+
+# --- Execution ---
+
+def _categories(series: pd.Series) -> List[Any]:
+    categories = list(series.dropna().unique())
+    try:
+        return sorted(categories)
+    except TypeError:
+        return categories
+
+
+def _fit(node: _Node, values: pd.Series) -> Any:
+    step = node.step
+    op = step["op"]
+    if op == 'impute':
+        strategy = step["strategy"]
+        if not values.hasnans:
+            # Nothing to fill here, nor in any subset of these rows evaluated later
+            return None
+        if strategy == 'constant':
+            return step["value"]
+        if strategy == 'auto':
+            strategy = 'median' if node.parent.kind == 'numeric' else 'mode'
+        if strategy == 'mode':
+            mode = values.mode()
+            return None if mode.empty else mode.iloc[0]
+        fill = values.mean() if strategy == 'mean' else values.median()
+        return None if pd.isna(fill) else fill
+    if op == 'encode':
+        categories = _categories(values)
+        if step["method"] == 'onehot' and len(categories) > step["max_categories"]:
+            raise ValueError(f"{len(categories)} categories exceed max_categories ({step['max_categories']})")
+        return categories
+    numbers = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    finite = numbers[np.isfinite(numbers)]
+    if not len(finite):
+        return 0.0, 1.0
+    if step["method"] == 'standard':
+        center, spread = float(finite.mean()), float(finite.std())
+    else:
+        center, spread = float(finite.min()), float(finite.max() - finite.min())
+    return center, spread or 1.0
+
+
+def _cast(series: pd.Series, to: str) -> pd.Series:
+    if to in ('number', 'integer', 'float'):
+        if pd.api.types.is_bool_dtype(series.dtype):
+            numbers = series.astype(np.float64) if series.isna().any() else series.astype(np.int64)
+        elif pd.api.types.is_datetime64_any_dtype(series.dtype):
+            raise ValueError("datetime columns cannot be cast to numbers")
+        else:
+            numbers = pd.to_numeric(series.astype(object) if isinstance(series.dtype, pd.CategoricalDtype) else series,
+                                    errors='coerce')
+        if to == 'float':
+            return numbers.astype(np.float64)
+        if to == 'integer':
+            floats = numbers.to_numpy(dtype=np.float64, na_value=np.nan)
+            present = ~np.isnan(floats)
+            if not np.isfinite(floats[present]).all() or (floats[present] != np.round(floats[present])).any():
+                raise ValueError("column has non-integer values")
+            return numbers.astype(np.int64) if present.all() else numbers.astype('Int64')
+        return numbers
+    if to == 'boolean':
+        if pd.api.types.is_bool_dtype(series.dtype):
+            return series
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            flags = series.ne(0).where(series.notna())
+        else:
+            flags = series.astype(object).map(lambda v: _BOOLEAN_WORDS.get(str(v).strip().lower()), na_action='ignore')
+        flags = flags.astype('boolean')
+        return flags.astype(bool) if not flags.isna().any() else flags
+    if to == 'datetime':
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            return series
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            return pd.to_datetime(series, errors='coerce')
+    if to == 'string':
+        return series.astype(object).map(str, na_action='ignore')
+    return series.astype('category')
+
+
+def _apply(node: _Node, values: pd.Series, fitted: Any) -> pd.Series:
+    step = node.step
+    op = step["op"]
+    if op == 'impute':
+        if fitted is None or not values.hasnans:
+            return values
+        if isinstance(values.dtype, pd.CategoricalDtype) and fitted not in values.cat.categories:
+            values = values.cat.add_categories([fitted])
+        return values.fillna(fitted)
+    if op == 'cast':
+        return _cast(values, step["to"])
+    if op == 'encode':
+        codes = pd.Categorical(values, categories=fitted).codes.astype(np.int64)
+        if (codes < 0).any():
+            return pd.Series(np.where(codes < 0, np.nan, codes))
+        return pd.Series(codes)
+    center, spread = fitted
+    return pd.Series((values.to_numpy(dtype=np.float64, na_value=np.nan) - center) / spread)
+
+
+def _renumber(series: pd.Series) -> pd.Series:
+    # Positional 0..n-1 index without copying the values
+    return series.set_axis(pd.RangeIndex(len(series)), copy=False)
+
+
+def _step_error(node: _Node, error: Exception) -> ValueError:
+    return ValueError(f"Step {node.index} ({node.step['op']}) failed on column {node.column}: {error}")
+
+
+class _Execution:
+    """Evaluates a plan: row operations narrow `rows`, column chains are computed on demand"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        # Input row positions still selected (None = all) and the selection after each row operation
+        self.rows: Optional[np.ndarray] = None
+        self.snapshots: List[Optional[np.ndarray]] = [None]
+        # Node values at the current rows, and fitted step parameters
+        self.cache: Dict[int, pd.Series] = {}
+        self.fits: Dict[int, Any] = {}
+
+    def values(self, node: _Node, snapshot: Optional[int] = None) -> pd.Series:
+        """`node` evaluated on the current rows, or on the rows selected at `snapshot`"""
+        rows = self.rows if snapshot is None else self.snapshots[snapshot]
+        current = rows is self.rows
+        if current and id(node) in self.cache:
+            return self.cache[id(node)]
+        if node.parent is None:
+            series = self.df.iloc[:, node.source]
+            series = _renumber(series if rows is None else series.iloc[rows])
+        else:
+            parent, fitted = self.values(node.parent, snapshot), self.fit(node)
+            try:
+                series = _apply(node, parent, fitted)
+            except Exception as e:
+                raise _step_error(node, e)
+        if current:
+            self.cache[id(node)] = series
+        return series
+
+    def fit(self, node: _Node) -> Any:
+        if node.step["op"] == 'cast':
+            return None
+        if id(node) not in self.fits:
+            values = self.values(node.parent, node.rows)
+            try:
+                self.fits[id(node)] = _fit(node, values)
+            except Exception as e:
+                raise _step_error(node, e)
+        return self.fits[id(node)]
+
+    def _narrow(self, keep: np.ndarray, size: int) -> None:
+        if len(keep) == size:
+            return
+        self.rows = keep if self.rows is None else self.rows[keep]
+        self.cache = {key: _renumber(series.iloc[keep]) for key, series in self.cache.items()}
+
+    def _size(self) -> int:
+        return len(self.df) if self.rows is None else len(self.rows)
+
+    def filter(self, op: Dict[str, Any]) -> None:
+        for condition in op["where"]:
+            # Conditions narrow the rows one after another, so later ones see only survivors
+            series = self.values(condition["node"])
+            value = filter_value(series, condition["op"], condition["raw"])
+            self._narrow(np.flatnonzero(filter_mask(series, condition["op"], value)), len(series))
+        self.snapshots.append(self.rows)
+
+    def dedupe(self, op: Dict[str, Any]) -> None:
+        frame = {}
+        for name, node in op["subset"]:
+            frame.update(self.onehot(name, node) if node.kind == 'onehot' else {name: self.values(node)})
+        if frame:
+            duplicated = pd.DataFrame(frame, copy=False).duplicated(keep=op["keep"]).to_numpy()
+            self._narrow(np.flatnonzero(~duplicated), self._size())
+        self.snapshots.append(self.rows)
+
+    def onehot(self, name: str, node: _Node) -> Dict[str, pd.Series]:
+        categories = self.fit(node)
+        codes = pd.Categorical(self.values(node.parent), categories=categories).codes
+        start = 1 if node.step["drop_first"] else 0
+        return {f"{name}_{category}": pd.Series(codes == i) for i, category in enumerate(categories) if i >= start}
+
+    def project(self, columns: Dict[str, _Node]) -> pd.DataFrame:
+        output = {}
+        for name, node in columns.items():
+            group = self.onehot(name, node) if node.kind == 'onehot' else {name: self.values(node)}
+            for key, series in group.items():
+                if key in output or (key != name and key in columns):
+                    raise ValueError(f"Encoded column {key} collides with an existing column")
+                output[key] = series
+        if not output:
+            return pd.DataFrame(index=pd.RangeIndex(self._size()))
+        return pd.DataFrame(output, copy=False)
+
+
+def execute_pipeline(df: pd.DataFrame, steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Plan and run normalized steps on `df`: {"frame": result, "plan": explain_plan(...)}"""
+    plan = compile_pipeline(df, steps)
+    execution = _Execution(df)
+    for op in plan["row_ops"]:
+        getattr(execution, op["op"])(op)
+    return {"frame": execution.project(plan["columns"]), "plan": explain_plan(plan)}
+
+
+# --- Saved pipelines ---
+
+class PipelineStore:
+    """Named pipeline specs saved as JSON files, replayable on any dataset"""
+
+    def __init__(self, directory: str = PIPELINE_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        if not isinstance(name, str) or not _PIPELINE_NAME.match(name):
+            raise ValueError("Pipeline names are 1-64 letters, digits, '_', '-' or '.'")
+        return os.path.join(self.directory, f"{name}.json")
+
+    def save(self, name: str, spec: Any) -> Dict[str, Any]:
+        path = self._path(name)
+        record = {"name": name, "steps": check_pipeline(spec), "saved_at": datetime.utcnow().isoformat()}
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path + ".tmp", "w") as f:
+                json.dump(record, f)
+            os.replace(path + ".tmp", path)
+        return record
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(name)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def delete(self, name: str) -> bool:
+        try:
+            os.remove(self._path(name))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def entries(self) -> List[Dict[str, Any]]:
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for filename in sorted(os.listdir(self.directory)):
+            if filename.endswith(".json"):
+                record = self.get(filename[:-len(".json")])
+                if record is not None:
+                    entries.append({"name": record["name"], "steps": len(record["steps"]), "saved_at": record["saved_at"]})
+        return entries
+
+
+PIPELINES = PipelineStore()
@@ -0,0 +1,324 @@
+import base64
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Rows evaluated per step when a dataset has no zone maps
+SCAN_BLOCK_ROWS = 65536
+MAX_PAGE_ROWS = 10_000
+FILTER_OPS = ('eq', 'ne', 'lt', 'le', 'gt', 'ge', 'in', 'contains', 'isnull', 'notnull')
+# Operators that never match a null value, and so can skip all-null blocks
+_VALUE_OPS = ('eq', 'ne', 'lt', 'le', 'gt', 'ge', 'in')
+
+
+# --- Query parsing ---
+
+def _column_position(df: pd.DataFrame, name: str) -> int:
+    matches = np.flatnonzero(df.columns.astype(str) == name)
+    if not len(matches):
+        raise ValueError(f"Column not found: {name}")
+    return int(matches[0])
+
+
+def _typed_value(series: pd.Series, raw: str) -> Any:
+    """Interpret a filter value from the query string in the column's type"""
+    dtype = series.dtype
+    try:
+        if pd.api.types.is_bool_dtype(dtype):
+            if raw.lower() not in ('true', 'false', '1', '0'):
+                raise ValueError(raw)
+            return raw.lower() in ('true', '1')
+        if pd.api.types.is_numeric_dtype(dtype):
+            return float(raw)
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            value = pd.Timestamp(raw)
+            tz = getattr(dtype, 'tz', None)
+            if tz is not None:
+                value = value.tz_localize(tz) if value.tzinfo is None else value.tz_convert(tz)
+            return value
+    except ValueError:
+        raise ValueError(f"Invalid value for column {series.name}: {raw}")
+    return raw
+
+
+def split_filter(spec: str) -> Tuple[str, str, Optional[str]]:
+    """`column:op:value` -> (column, op, raw value or None), checking the operator"""
+    parts = spec.split(':', 2) if isinstance(spec, str) else []
+    if len(parts) < 2 or parts[1] not in FILTER_OPS:
+        raise ValueError(f"Invalid filter: {spec}. Use column:op:value with op in {', '.join(FILTER_OPS)}")
+    raw = parts[2] if len(parts) == 3 else None
+    if raw is None and parts[1] not in ('isnull', 'notnull'):
+        raise ValueError(f"Filter {spec} needs a value")
+    return parts[0], parts[1], raw
+
+
+def filter_value(series: pd.Series, op: str, raw: Optional[str]) -> Any:
+    """A filter's raw value typed for the column it applies to"""
+    if op in ('isnull', 'notnull'):
+        return None
+    if op == 'in':
+        return [_typed_value(series, v) for v in raw.split('|')]
+    if op == 'contains':
+        return raw
+    return _typed_value(series, raw)
+
+
+def parse_filters(df: pd.DataFrame, specs: List[str]) -> List[Dict[str, Any]]:
+    """
+    Parse `column:op:value` filters (ANDed together). `in` takes `|`-separated values,
+    `isnull`/`notnull` take none. Comparisons never match null values.
+    """
+    filters = []
+    for spec in specs:
+        name, op, raw = split_filter(spec)
+        position = _column_position(df, name)
+        value = filter_value(df.iloc[:, position], op, raw)
+        filters.append({"column": name, "position": position, "op": op, "value": value})
+    return filters
+
+
+def parse_sort(df: pd.DataFrame, spec: Optional[str]) -> List[Tuple[int, bool]]:
+    """`a,-b` -> [(position of a, ascending), (position of b, descending)]"""
+    keys = []
+    for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+        descending = item.startswith('-')
+        keys.append((_column_position(df, item.lstrip('+-')), not descending))
+    return keys
+
+
+def parse_columns(df: pd.DataFrame, spec: Optional[str]) -> List[int]:
+    if not spec:
+        return list(range(df.shape[1]))
+    return [_column_position(df, name.strip()) for name in spec.split(',') if name.strip()]
+
+
+# --- Cursors ---
+
+def _query_fingerprint(filters: List[str], sort: Optional[str]) -> str:
+    return hashlib.sha1(json.dumps([sorted(filters), sort or '']).encode()).hexdigest()[:12]
+
+
+def encode_cursor(version: Optional[int], fingerprint: str, **state) -> str:
+    payload = json.dumps({"v": version, "q": fingerprint, **state}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, version: Optional[int], fingerprint: str) -> Dict[str, Any]:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if state.get("q") != fingerprint:
+        raise ValueError("Cursor belongs to a different filter/sort")
+    if state.get("v") != version:
+        raise ValueError("Cursor is stale: the dataset changed since it was issued")
+    return state
+
+
+# --- Zone map pruning ---
+
+def _zone_key(series: pd.Series, value: Any) -> Any:
+    # Filter values in the representation zone maps are stored in
+    if isinstance(value, pd.Timestamp):
+        unit = np.datetime_data(series.to_numpy().dtype)[0] if series.dtype.kind == 'M' else 'ns'
+        if value.tzinfo is not None:
+            value = value.tz_convert('UTC').tz_localize(None)
+        return int(np.datetime64(value.to_datetime64(), unit).astype(np.int64))
+    if isinstance(value, (bool, np.bool_)):
+        return int(value)
+    return value
+
+
+def _block_may_match(zone: Dict[str, list], block: int, block_len: int, op: str, key: Any) -> bool:
+    low, high, nulls = zone["min"][block], zone["max"][block], zone["nulls"][block]
+    if op == 'isnull':
+        return nulls > 0
+    if op == 'notnull':
+        return nulls < block_len
+    if low is None:
+        # Every value in the block is null
+        return op not in _VALUE_OPS
+    if op == 'eq':
+        return low <= key <= high
+    if op == 'ne':
+        return not (low == high == key)
+    if op == 'lt':
+        return low < key
+    if op == 'le':
+        return low <= key
+    if op == 'gt':
+        return high > key
+    if op == 'ge':
+        return high >= key
+    if op == 'in':
+        return any(low <= k <= high for k in key)
+    return True
+
+
+def candidate_blocks(df: pd.DataFrame, filters: List[Dict[str, Any]],
+                     zones: Optional[Dict[str, Any]]) -> Tuple[List[Tuple[int, int]], int]:
+    """
+    Row ranges that may hold matches, and how many blocks zone maps ruled out.
+    Without zone maps (or matching filters) every block is a candidate.
+    """
+    n = len(df)
+    usable = zones is not None and zones.get("rows") == n
+    block_rows = zones["block_rows"] if usable else SCAN_BLOCK_ROWS
+    ranges, skipped = [], 0
+    for block, start in enumerate(range(0, n, block_rows)):
+        stop = min(start + block_rows, n)
+        keep = True
+        if usable:
+            for f in filters:
+                zone = zones["columns"].get(str(f["position"]))
+                if zone is None or f["op"] == 'contains':
+                    continue
+                series = df.iloc[:, f["position"]]
+                if f["op"] == 'in':
+                    key = [_zone_key(series, v) for v in f["value"]]
+                else:
+                    key = _zone_key(series, f["value"])
+                if not _block_may_match(zone, block, stop - start, f["op"], key):
+                    keep = False
+                    break
+        if keep:
+            ranges.append((start, stop))
+        else:
+            skipped += 1
+    return ranges, skipped
+
+
+# --- Evaluation ---
+
+def filter_mask(series: pd.Series, op: str, value: Any) -> np.ndarray:
+    if op == 'isnull':
+        return series.isna().to_numpy()
+    if op == 'notnull':
+        return series.notna().to_numpy()
+    present = series.notna().to_numpy()
+    if op == 'contains':
+        return series.astype(str).str.contains(value, case=False, regex=False).to_numpy() & present
+    if op == 'in':
+        return series.isin(value).to_numpy() & present
+    compare = {'eq': series.__eq__, 'ne': series.__ne__, 'lt': series.__lt__,
+               'le': series.__le__, 'gt': series.__gt__, 'ge': series.__ge__}[op]
+    try:
+        return np.asarray(compare(value), dtype=bool) & present
+    except TypeError:
+        # Mixed-type object columns: compare as text
+        return np.asarray(getattr(series.astype(str), f"__{op}__")(str(value)), dtype=bool) & present
+
+
+def _block_matches(df: pd.DataFrame, start: int, stop: int, filters: List[Dict[str, Any]]) -> np.ndarray:
+    """Row positions in [start, stop) that satisfy every filter"""
+    mask = np.ones(stop - start, dtype=bool)
+    for f in filters:
+        candidates = np.flatnonzero(mask)
+        if not len(candidates):
+            break
+        # Later filters only look at rows that survived the earlier ones
+        block = df.iloc[start + candidates, f["position"]] if len(candidates) < len(mask) else df.iloc[start:stop, f["position"]]
+        mask[candidates] = filter_mask(block, f["op"], f["value"])
+    return np.flatnonzero(mask) + start
+
+
+def _sorted_positions(df: pd.DataFrame, positions: np.ndarray, sort: List[Tuple[int, bool]], k: int) -> np.ndarray:
+    """The first `k` of `positions` in sort order (stable: ties keep row order, nulls last)"""
+    if len(sort) == 1 and k < len(positions):
+        position, ascending = sort[0]
+        series = df.iloc[positions, position]
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            # Single numeric key: partial top-k selection instead of a full sort
+            keys = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            keys = keys if ascending else -keys
+            keys = np.where(np.isnan(keys), np.inf, keys)
+            top = np.argpartition(keys, k - 1)[:k]
+            top = top[np.lexsort((positions[top], keys[top]))]
+            return positions[top]
+    keys = pd.DataFrame({i: df.iloc[positions, p].to_numpy() for i, (p, _) in enumerate(sort)}, index=positions)
+    ordered = keys.sort_values(by=list(range(len(sort))), ascending=[asc for _, asc in sort],
+                               kind='mergesort', na_position='last')
+    return ordered.index.to_numpy()[:k]
+
+
+def _records(page: pd.DataFrame) -> List[Dict[str, Any]]:
+    return page.replace({np.nan: None, np.inf: None, -np.inf: None}).to_dict(orient='records')
+
+
+def query_rows(df: pd.DataFrame, zones: Optional[Dict[str, Any]] = None, version: Optional[int] = None,
+               filters: Optional[List[str]] = None, sort: Optional[str] = None, columns: Optional[str] = None,
+               offset: int = 0, limit: int = 100, cursor: Optional[str] = None,
+               count: bool = False) -> Dict[str, Any]:
+    """
+    One page of rows matching `filters`, optionally sorted, projected to `columns`.
+    Unsorted scans stop as soon as the page is full; their cursor records the next row
+    position so later pages resume there instead of rescanning. Blocks that zone maps
+    prove cannot match are never read.
+    """
+    if not 1 <= limit <= MAX_PAGE_ROWS:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_ROWS}")
+    if offset < 0:
+        raise ValueError("offset must be >= 0")
+    filters = filters or []
+    parsed = parse_filters(df, filters)
+    sort_keys = parse_sort(df, sort)
+    projection = parse_columns(df, columns)
+    fingerprint = _query_fingerprint(filters, sort)
+    resume_at = 0
+    if cursor:
+        state = decode_cursor(cursor, version, fingerprint)
+        offset, resume_at = state.get("o", 0), state.get("p", 0)
+
+    ranges, skipped = candidate_blocks(df, parsed, zones)
+    total = None
+    if sort_keys:
+        matched = [_block_matches(df, start, stop, parsed) for start, stop in ranges]
+        positions = np.concatenate(matched) if matched else np.empty(0, dtype=np.int64)
+        total = len(positions)
+        page_positions = _sorted_positions(df, positions, sort_keys, offset + limit)[offset:]
+        has_more = offset + limit < total
+        next_state = {"o": offset + limit}
+    else:
+        page_positions, to_skip, has_more = [], offset, False
+        matches_seen = 0
+        for start, stop in ranges:
+            if stop <= resume_at:
+                continue
+            found = _block_matches(df, max(start, resume_at), stop, parsed)
+            matches_seen += len(found)
+            if to_skip:
+                dropped = min(to_skip, len(found))
+                found, to_skip = found[dropped:], to_skip - dropped
+            room = limit - len(page_positions)
+            page_positions.extend(found[:room].tolist())
+            if len(found) > room:
+                has_more = True
+                if not count:
+                    break
+        page_positions = np.asarray(page_positions, dtype=np.int64)
+        if count:
+            total = matches_seen
+        next_state = {"o": 0, "p": int(page_positions[-1]) + 1 if len(page_positions) else resume_at}
+
+    page = df.iloc[page_positions, projection]
+    return {
+        "frame": page,
+        "columns": [str(c) for c in page.columns],
+        "offset": offset,
+        "limit": limit,
+        "returned": len(page),
+        "has_more": bool(has_more),
+        "next_cursor": encode_cursor(version, fingerprint, **next_state) if has_more else None,
+        "total": total,
+        "blocks_scanned": len(ranges),
+        "blocks_skipped": skipped,
+    }
+
+
+def page_response(result: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON body of a query_rows result"""
+    body = {k: v for k, v in result.items() if k != "frame"}
+    body["rows"] = _records(result["frame"])
+    return body
@@ -0,0 +1,318 @@
+import base64
+import glob
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import pandas as pd
+from .chart_service import render_chart
+from .compute_executor import COMPUTE
+from .eda_service import DATASETS, EDAService
+from .stats_engine import describe_frame
+
+# Finished reports, one file per dataset version and format
+REPORT_DIR = os.getenv("DATASWIFT_REPORT_DIR", os.path.join(tempfile.gettempdir(), "dataswift", "reports"))
+# Reports generated at once (each fans its charts and tables out to the compute process pool)
+REPORT_WORKERS = int(os.getenv("DATASWIFT_REPORT_WORKERS", "2"))
+# Columns per shard: tables and charts are produced (and progress reported) shard by shard
+REPORT_SHARD_COLUMNS = int(os.getenv("DATASWIFT_REPORT_SHARD_COLUMNS", "32"))
+REPORT_FORMATS = {'html': 'text/html', 'pdf': 'application/pdf'}
+ACTIVE_STATUSES = ('queued', 'running')
+FINISHED_JOBS_KEPT = 200
+
+
+def check_report(fmt: str) -> None:
+    if fmt not in REPORT_FORMATS:
+        raise ValueError('Unsupported format')
+    if fmt == 'pdf':
+        try:
+            import pdfkit  # noqa: F401
+        except ImportError:
+            raise ValueError('PDF export requires pdfkit and wkhtmltopdf.')
+
+
+def report_path(dataset_id: str, version: int, fmt: str) -> str:
+    if not dataset_id or os.sep in dataset_id or dataset_id.startswith("."):
+        raise ValueError("Invalid dataset id")
+    return os.path.join(REPORT_DIR, f"{dataset_id}-v{version}.{fmt}")
+
+
+def drop_reports(dataset_id: str, older_than: Optional[int] = None) -> None:
+    """Remove a dataset's finished reports (only those of versions before `older_than` if given), e.g. on delete"""
+    prefix = f"{dataset_id}-v"
+    for path in glob.glob(os.path.join(REPORT_DIR, f"{glob.escape(prefix)}*.*")):
+        version, _, rest = os.path.basename(path)[len(prefix):].partition(".")
+        # .part files belong to running jobs
+        if not version.isdigit() or ".part" in rest or (older_than is not None and int(version) >= older_than):
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# --- Report fragments ---
+#
+# A report is a list of fragments written to the file in order. Each one is
+# ("html", text), ("table", DataFrame) or ("charts", [chart data]); tables and
+# charts are turned into HTML by render_fragment on the compute process pool.
+
+def _chart_html(data: Dict[str, Any]) -> str:
+    column = data["column"]
+    if data["kind"] == "error":
+        return f'<div><b>{column}</b>: Error generating chart ({data["error"]})</div>'
+    try:
+        img_base64 = base64.b64encode(render_chart(data)).decode('utf-8')
+        return f'<div><b>{column}</b><br><img src="data:image/png;base64,{img_base64}" style="max-width:400px;"></div>'
+    except Exception as e:
+        return f'<div><b>{column}</b>: Error generating chart ({e})</div>'
+
+
+def render_fragment(fragment: Tuple[str, Any]) -> str:
+    kind, payload = fragment
+    if kind == "table":
+        return payload.to_html()
+    if kind == "charts":
+        return "".join(_chart_html(data) for data in payload)
+    return payload
+
+
+def _shards(columns: List[Any]) -> List[List[Any]]:
+    size = max(1, REPORT_SHARD_COLUMNS)
+    return [columns[i:i + size] for i in range(0, len(columns), size)]
+
+
+def _chart_fragments(dataset_id: str, columns: List[Any]) -> List[Tuple[str, Any]]:
+    fragments = []
+    for shard in _shards(columns):
+        data = []
+        for col in shard:
+            try:
+                data.append(EDAService.chart_data(dataset_id, str(col)))
+            except Exception as e:
+                data.append({"column": str(col), "kind": "error", "error": str(e)})
+        fragments.append(("charts", data))
+    return fragments
+
+
+def report_fragments(dataset_id: str) -> List[Tuple[str, Any]]:
+    """Every section of the EDA report, with per-column sections split into column shards"""
+    df = DATASETS.get(dataset_id)
+    if df is None:
+        raise ValueError("Dataset not found")
+    profile = EDAService.dataset_profile(dataset_id)
+    fragments = [("html", "<html><head><title>EDA Report</title></head><body><h1>EDA Report</h1>"
+                          f"<h2>Shape</h2><p>{df.shape[0]} rows × {df.shape[1]} columns</p><h2>Columns</h2>")]
+    for shard in _shards(list(df.columns)):
+        fragments.append(("html", "<ul>" + "".join(f"<li>{col} ({df[col].dtype})</li>" for col in shard) + "</ul>"))
+    fragments.append(("html", "<h2>Summary Statistics</h2>"))
+    fragments += [("table", describe_frame(df[shard], profile)) for shard in _shards(list(df.columns))]
+    fragments.append(("html", "<h2>Missing Values</h2>"))
+    missing = profile['missing'].to_frame('Missing Count')
+    fragments += [("table", missing.iloc[i:i + REPORT_SHARD_COLUMNS]) for i in range(0, len(missing), max(1, REPORT_SHARD_COLUMNS))]
+    fragments += [("html", "<h2>Correlation Matrix</h2>"), ("table", profile['corr'])]
+    section = "<h2>Outlier Summary</h2>"
+    outliers = EDAService.detect_outliers(dataset_id)
+    if outliers:
+        section += "<table border='1'><tr><th>Column</th><th>Outlier Count</th><th>Sample Outlier Values</th></tr>"
+        for col, info in outliers.items():
+            sample_vals = ', '.join(str(v) for v in (info['values'][:5] if info['values'] else []))
+            section += f"<tr><td>{col}</td><td>{info['count']}</td><td>{sample_vals}</td></tr>"
+        section += "</table>"
+    else:
+        section += "<p>No outliers detected.</p>"
+    section += "<h2>AI Insights</h2>"
+    insights = EDAService.generate_insights(dataset_id)
+    if insights:
+        section += "<ul>" + "".join(f"<li><b>{ins['type'].capitalize()}:</b> {ins['message']}</li>" for ins in insights) + "</ul>"
+    else:
+        section += "<p>No insights generated.</p>"
+    fragments.append(("html", section))
+    fragments.append(("html", "<h2>Numeric Distributions</h2>"))
+    fragments += _chart_fragments(dataset_id, list(df.select_dtypes(include='number').columns))
+    fragments.append(("html", "<h2>Categorical Distributions</h2>"))
+    fragments += _chart_fragments(dataset_id, list(df.select_dtypes(include=['object', 'category']).columns))
+    fragments.append(("html", "</body></html>"))
+    return fragments
+
+
+def _profile_report_html(df: pd.DataFrame) -> Optional[str]:
+    # ydata-profiling (pandas-profiling) builds the whole report itself when installed
+    try:
+        from ydata_profiling import ProfileReport
+    except ImportError:
+        return None
+    return ProfileReport(df, title="EDA Report", minimal=True).to_html()
+
+
+class ReportJobs:
+    """
+    Background EDA report generation.
+    Each job writes its report to a `.part` file fragment by fragment, rendering
+    tables and charts on the compute process pool, and renames it into REPORT_DIR
+    when done. Finished reports are reused until the dataset version changes, and
+    jobs for the same dataset version and format are shared. Progress is exposed
+    through `get`; `revision` increases with every change.
+    """
+
+    def __init__(self, max_workers: int = REPORT_WORKERS):
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "cache_hits": 0}
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dataswift-report")
+        return self._executor
+
+    def submit(self, dataset_id: str, fmt: str = 'html') -> Dict[str, Any]:
+        check_report(fmt)
+        version = DATASETS.version(dataset_id)
+        if version is None:
+            raise ValueError("Dataset not found")
+        path = report_path(dataset_id, version, fmt)
+        with self._lock:
+            for job in self._jobs.values():
+                if job["_path"] == path and job["status"] in ACTIVE_STATUSES:
+                    return self._snapshot(job)
+            cached = os.path.exists(path)
+            now = time.time()
+            job = {
+                "job_id": uuid.uuid4().hex,
+                "dataset_id": dataset_id,
+                "version": version,
+                "format": fmt,
+                "status": "completed" if cached else "queued",
+                "cached": cached,
+                "progress": {"done": 1, "total": 1, "stage": "cached"} if cached else {"done": 0, "total": 0, "stage": "queued"},
+                "revision": 0,
+                "submitted_at": now,
+                "started_at": None,
+                "finished_at": now if cached else None,
+                "error": None,
+                "_path": path,
+            }
+            self._jobs[job["job_id"]] = job
+            self._trim()
+            if cached:
+                self.counters["cache_hits"] += 1
+            else:
+                self.counters["submitted"] += 1
+                job["_future"] = self._pool().submit(self._run, job)
+            return self._snapshot(job)
+
+    def _update(self, job: Dict[str, Any], **changes) -> None:
+        with self._lock:
+            for key, value in changes.items():
+                job[key] = value
+            job["revision"] += 1
+
+    def _progress(self, job: Dict[str, Any], done: int, total: int, stage: str) -> None:
+        self._update(job, progress={"done": done, "total": total, "stage": stage})
+
+    def _run(self, job: Dict[str, Any]) -> None:
+        self._update(job, status="running", started_at=time.time())
+        os.makedirs(REPORT_DIR, exist_ok=True)
+        staging = f"{job['_path']}.{job['job_id']}.part"
+        html_staging = f"{staging}.html" if job["format"] == 'pdf' else staging
+        try:
+            self._write_html(job, html_staging)
+            if job["format"] == 'pdf':
+                self._progress(job, job["progress"]["total"], job["progress"]["total"], "pdf")
+                import pdfkit
+                pdfkit.from_file(html_staging, staging)
+            self._check_version(job)
+            os.replace(staging, job["_path"])
+            # Reports of older versions of the dataset are never served again
+            drop_reports(job["dataset_id"], older_than=job["version"])
+            with self._lock:
+                self.counters["completed"] += 1
+            self._update(job, status="completed", finished_at=time.time())
+        except Exception as e:
+            with self._lock:
+                self.counters["failed"] += 1
+            self._update(job, status="failed", error=str(e), finished_at=time.time())
+        finally:
+            for path in {staging, html_staging}:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @staticmethod
+    def _check_version(job: Dict[str, Any]) -> None:
+        # The report is named after the version seen at submit. Versions only grow, so if it
+        # is still current when the report is done, every read in between saw that version
+        if DATASETS.version(job["dataset_id"]) != job["version"]:
+            raise ValueError("Dataset changed while the report was generated, generate it again")
+
+    def _write_html(self, job: Dict[str, Any], path: str) -> None:
+        self._progress(job, 0, 0, "profiling")
+        self._check_version(job)
+        df = DATASETS.get(job["dataset_id"])
+        if df is None:
+            raise ValueError("Dataset not found")
+        html = _profile_report_html(df)
+        with open(path, "w", encoding="utf-8") as f:
+            if html is not None:
+                f.write(html)
+                return
+            fragments = report_fragments(job["dataset_id"])
+            self._progress(job, 0, len(fragments), "sections")
+            # Fragments come back in order as soon as each is rendered, so the file grows incrementally
+            for done, text in enumerate(COMPUTE.imap(render_fragment, fragments), 1):
+                f.write(text)
+                self._progress(job, done, len(fragments), "sections")
+
+    def _trim(self) -> None:
+        # Called with the lock held
+        finished = [j for j, job in self._jobs.items() if job["status"] not in ACTIVE_STATUSES]
+        for job_id in finished[:max(0, len(finished) - FINISHED_JOBS_KEPT)]:
+            del self._jobs[job_id]
+
+    def _snapshot(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        snapshot = {k: v for k, v in job.items() if not k.startswith("_")}
+        snapshot["progress"] = dict(job["progress"])
+        return snapshot
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job is not None else None
+
+    def path(self, job_id: str) -> str:
+        """File of a completed job"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise KeyError(job_id)
+            if job["status"] != "completed":
+                raise ValueError(f"Report is {job['status']}")
+            return job["_path"]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job["status"] == "running")
+            queued = sum(1 for job in self._jobs.values() if job["status"] == "queued")
+            return {**self.counters, "workers": self.max_workers, "running": running, "queued": queued}
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        executor.shutdown(wait=False, cancel_futures=True)
+        # Queued jobs whose futures were cancelled never run: end them so pollers stop waiting
+        with self._lock:
+            cancelled = [job for job in self._jobs.values() if job.get("_future") and job["_future"].cancelled()]
+        for job in cancelled:
+            with self._lock:
+                self.counters["cancelled"] += 1
+            self._update(job, status="cancelled", error="Report generation was cancelled", finished_at=time.time())
+
+
+REPORT_JOBS = ReportJobs()
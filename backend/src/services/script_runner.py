@@ -0,0 +1,242 @@
+import math
+import multiprocessing
+import os
+import queue
+import shutil
+import signal
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import pandas as pd
+from .dataset_store import read_columnar, write_columnar
+from .dtype_optimizer import decode_categoricals, encode_categoricals
+
+try:
+    import resource
+except ImportError:  # not available on Windows: only the wall-time limit applies there
+    resource = None
+
+# Warm worker processes that run user preprocessing/cleaning scripts
+SCRIPT_WORKERS = int(os.getenv("DATASWIFT_SCRIPT_WORKERS", "2"))
+# Per-job limits: CPU seconds, wall-clock seconds, and memory a script may allocate
+# on top of the worker's baseline and the mapped dataset
+SCRIPT_CPU_SECONDS = int(os.getenv("DATASWIFT_SCRIPT_CPU_SECONDS", "60"))
+SCRIPT_WALL_SECONDS = int(os.getenv("DATASWIFT_SCRIPT_WALL_SECONDS", "120"))
+SCRIPT_MEMORY_BYTES = int(os.getenv("DATASWIFT_SCRIPT_MEMORY_MB", "2048")) * 1024 * 1024
+
+
+class ScriptLimitExceeded(ValueError):
+    """A script was stopped for exceeding its CPU, wall-time or memory limit"""
+
+
+# --- Worker side ---
+
+def _address_space() -> int:
+    # Current virtual size; RLIMIT_AS counts every mapping, so the budget is relative to it
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _directory_bytes(directory: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+
+def _apply_limits(cpu_seconds: int, memory_bytes: int, source: str):
+    """Lower the soft CPU/address-space limits for one job; returns a function restoring them"""
+    if resource is None:
+        return lambda: None
+    saved = {}
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = usage.ru_utime + usage.ru_stime
+    limits = [(resource.RLIMIT_CPU, math.ceil(used + cpu_seconds))]
+    try:
+        limits.append((resource.RLIMIT_AS, _address_space() + _directory_bytes(source) + memory_bytes))
+    except OSError:
+        pass
+    for name, soft in limits:
+        current, hard = resource.getrlimit(name)
+        saved[name] = (current, hard)
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(name, (soft, hard))
+
+    def restore():
+        for name, value in saved.items():
+            resource.setrlimit(name, value)
+    return restore
+
+
+def _run_job(job: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+    restore = _apply_limits(job["cpu_seconds"], job["memory_bytes"], job["source"])
+    try:
+        # Columns are copy-on-write mappings of the dataset files: no pickling, no up-front copy
+        df = read_columnar(job["source"])
+        # Scripts see text as parsed (object), the store keeps it categorical
+        df, decoded = decode_categoricals(df)
+        local_vars = {"df": df, "pd": pd}
+        exec(job["script"], {}, local_vars)
+        new_df = local_vars.get("df")
+        if not isinstance(new_df, pd.DataFrame):
+            return "error", "Script must assign the processed DataFrame back to variable 'df'."
+        write_columnar(encode_categoricals(new_df, decoded), job["output"])
+        return "ok", None
+    except MemoryError:
+        return "memory", None
+    except BaseException as e:  # including SystemExit from the script
+        return "error", str(e)
+    finally:
+        restore()
+
+
+def _worker_main(conn) -> None:
+    # The parent handles Ctrl+C; a worker only stops when told to or killed
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        conn.send(_run_job(job))
+
+
+# --- Parent side ---
+
+class ScriptPool:
+    """
+    Pre-started worker processes that run user scripts against columnar dataset files.
+    Each job runs under soft CPU-time and address-space limits set inside the worker
+    and a wall-time limit enforced here; a worker that hits a limit (or crashes) is
+    killed and replaced, so the API process is never blocked or bloated by a script.
+    The script's result is written back as a columnar directory for the caller to map.
+    """
+
+    def __init__(self, workers: int = SCRIPT_WORKERS, cpu_seconds: int = SCRIPT_CPU_SECONDS,
+                 wall_seconds: int = SCRIPT_WALL_SECONDS, memory_bytes: int = SCRIPT_MEMORY_BYTES):
+        self.workers = max(1, workers)
+        self.cpu_seconds = cpu_seconds
+        self.wall_seconds = wall_seconds
+        self.memory_bytes = memory_bytes
+        self._idle: "queue.Queue" = queue.Queue()
+        self._all: List[Any] = []
+        self._started = False
+        self._lock = threading.Lock()
+        self.counters = {"completed": 0, "script_errors": 0, "cpu_limit": 0, "wall_limit": 0,
+                         "memory_limit": 0, "crashed": 0, "restarts": 0}
+
+    def _spawn(self):
+        # spawn: forking a process that runs an event loop and thread pools is unsafe
+        context = multiprocessing.get_context("spawn")
+        parent, child = context.Pipe()
+        process = context.Process(target=_worker_main, args=(child,), daemon=True, name="dataswift-script")
+        process.start()
+        child.close()
+        worker = (process, parent)
+        with self._lock:
+            self._all.append(worker)
+        return worker
+
+    def start(self) -> None:
+        """Start the workers (spawning is asynchronous, so this returns immediately)"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        for _ in range(self.workers):
+            self._idle.put(self._spawn())
+
+    def _kill(self, worker) -> None:
+        process, conn = worker
+        if process.is_alive():
+            process.kill()
+        process.join(5)
+        conn.close()
+        with self._lock:
+            if worker in self._all:
+                self._all.remove(worker)
+
+    def _failure(self, process) -> ScriptLimitExceeded:
+        process.join(5)
+        if process.exitcode == -getattr(signal, "SIGXCPU", -1):
+            self.counters["cpu_limit"] += 1
+            return ScriptLimitExceeded(f"Script exceeded its CPU time limit ({self.cpu_seconds}s)")
+        if process.exitcode == -signal.SIGKILL:
+            # Most likely the kernel's OOM killer
+            self.counters["memory_limit"] += 1
+            return ScriptLimitExceeded("Script worker was killed (out of memory)")
+        self.counters["crashed"] += 1
+        return ScriptLimitExceeded(f"Script worker crashed (exit code {process.exitcode})")
+
+    def run(self, source: str, script: str, output: str) -> None:
+        """
+        Run `script` on the columnar dataset at `source`, writing the resulting frame to
+        the new directory `output`. Blocks until a worker is free and the job finishes.
+        Raises ValueError with the script's error, or ScriptLimitExceeded.
+        """
+        self.start()
+        worker = self._idle.get()
+        process, conn = worker
+        healthy = True
+        try:
+            try:
+                conn.send({"source": source, "script": script, "output": output,
+                           "cpu_seconds": self.cpu_seconds, "memory_bytes": self.memory_bytes})
+            except OSError:
+                # The idle worker died in the meantime
+                healthy = False
+                raise self._failure(process)
+            if not conn.poll(self.wall_seconds):
+                healthy = False
+                self.counters["wall_limit"] += 1
+                raise ScriptLimitExceeded(f"Script exceeded its wall time limit ({self.wall_seconds}s)")
+            try:
+                status, detail = conn.recv()
+            except EOFError:
+                healthy = False
+                raise self._failure(process)
+            if status == "memory":
+                # Allocation failures can leave the interpreter in a bad state
+                healthy = False
+                self.counters["memory_limit"] += 1
+                raise ScriptLimitExceeded(f"Script exceeded its memory limit ({self.memory_bytes // (1024 * 1024)} MB)")
+            if status == "error":
+                self.counters["script_errors"] += 1
+                raise ValueError(detail)
+            self.counters["completed"] += 1
+        finally:
+            if not healthy:
+                self._kill(worker)
+                shutil.rmtree(output, ignore_errors=True)
+                self.counters["restarts"] += 1
+                worker = self._spawn()
+            self._idle.put(worker)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "idle": self._idle.qsize() if self._started else self.workers,
+            "limits": {"cpu_seconds": self.cpu_seconds, "wall_seconds": self.wall_seconds,
+                       "memory_mb": self.memory_bytes // (1024 * 1024)},
+            **self.counters,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            workers, self._all = list(self._all), []
+            self._started = False
+        for process, conn in workers:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+        deadline = time.time() + 2
+        for process, conn in workers:
+            process.join(max(0.0, deadline - time.time()))
+            if process.is_alive():
+                process.kill()
+            conn.close()
+        self._idle = queue.Queue()
+
+
+SCRIPT_POOL = ScriptPool()
@@ -0,0 +1,113 @@
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+SPLIT_METHODS = ('random', 'stratified', 'group', 'time', 'kfold')
+SPLIT_PARTS = ('train', 'val', 'test')
+# Methods that take a `column`: the label to stratify on, the group id, or the timestamp
+COLUMN_METHODS = ('stratified', 'group', 'time')
+DEFAULT_SEED = 42
+MAX_FOLDS = 100
+
+
+def check_ratios(ratios: Dict[str, float]) -> Dict[str, float]:
+    """{"train": 0.7, "val": 0.15, "test": 0.15}: known parts, between 0 and 1 (0: an empty part), summing to 1"""
+    if not isinstance(ratios, dict) or not ratios:
+        raise ValueError("ratios must map split parts to fractions, e.g. {\"train\": 0.8, \"test\": 0.2}")
+    unknown = set(ratios) - set(SPLIT_PARTS)
+    if unknown:
+        raise ValueError(f"Unknown split part(s): {', '.join(sorted(unknown))}. Use {', '.join(SPLIT_PARTS)}")
+    checked = {}
+    for part in SPLIT_PARTS:
+        if part in ratios:
+            value = ratios[part]
+            if not isinstance(value, (int, float)) or not 0 <= value < 1 + 1e-9:
+                raise ValueError(f"Ratio of {part} must be between 0 and 1")
+            checked[part] = float(value)
+    if abs(sum(checked.values()) - 1) > 1e-6:
+        raise ValueError("Split ratios must sum to 1")
+    return checked
+
+
+def _column(df: pd.DataFrame, name: Optional[str], method: str) -> pd.Series:
+    if not name:
+        raise ValueError(f"The {method} split needs a column")
+    matches = np.flatnonzero(df.columns.astype(str) == name)
+    if not len(matches):
+        raise ValueError(f"Column not found: {name}")
+    return df.iloc[:, int(matches[0])]
+
+
+def _cut(positions: np.ndarray, fractions: List[float], rounding=np.floor) -> List[np.ndarray]:
+    """Consecutive pieces of `positions` with the given fractions of its length"""
+    bounds = rounding(np.cumsum(fractions)[:-1] * len(positions)).astype(np.int64)
+    return np.split(positions, bounds)
+
+
+def _shuffled_by_stratum(codes: np.ndarray, order: np.ndarray) -> np.ndarray:
+    # Positions grouped by stratum, in random order (`order`) within each stratum
+    return order[np.argsort(codes[order], kind='stable')]
+
+
+def split_positions(df: pd.DataFrame, method: str = 'random', ratios: Optional[Dict[str, float]] = None,
+                    column: Optional[str] = None, folds: int = 5, seed: int = DEFAULT_SEED) -> Dict[str, np.ndarray]:
+    """
+    Row positions of each part of a split, computed from at most one column.
+    - random: shuffled, then cut by `ratios` (the row membership of the old train/test split)
+    - stratified: each value of `column` is cut by `ratios` separately, so every part has its share
+    - group: rows sharing a `column` value stay in one part; parts get about their ratio of rows
+    - time: ordered by `column`, earliest rows first (train, then val, then test), no shuffling
+    - kfold: `folds` folds (stratified on `column` when given) -> fold{i}_train / fold{i}_test
+    Positions are sorted (except for time splits, which keep time order).
+    """
+    if method not in SPLIT_METHODS:
+        raise ValueError(f"Unsupported split method: {method}. Use one of {', '.join(SPLIT_METHODS)}")
+    n = len(df)
+    if n < 2:
+        raise ValueError("A dataset needs at least 2 rows to be split")
+    # RandomState(seed).permutation matches df.sample(frac=1, random_state=seed)
+    order = np.random.RandomState(seed).permutation(n)
+    if method == 'kfold':
+        if not isinstance(folds, int) or not 2 <= folds <= min(MAX_FOLDS, n):
+            raise ValueError(f"folds must be between 2 and {min(MAX_FOLDS, n)}")
+        if column:
+            codes, _ = pd.factorize(_column(df, column, method), use_na_sentinel=False)
+            order = _shuffled_by_stratum(codes, order)
+        # Dealing rows round-robin spreads every stratum evenly over the folds
+        fold_of = np.empty(n, dtype=np.int64)
+        fold_of[order] = np.arange(n) % folds
+        parts = {}
+        for fold in range(folds):
+            parts[f"fold{fold}_train"] = np.flatnonzero(fold_of != fold)
+            parts[f"fold{fold}_test"] = np.flatnonzero(fold_of == fold)
+        return parts
+    ratios = check_ratios(ratios or {"train": 0.8, "test": 0.2})
+    names, fractions = list(ratios), list(ratios.values())
+    if method == 'random':
+        pieces = [np.sort(piece) for piece in _cut(order, fractions)]
+    elif method == 'stratified':
+        codes, _ = pd.factorize(_column(df, column, method), use_na_sentinel=False)
+        grouped = _shuffled_by_stratum(codes, order)
+        starts = np.flatnonzero(np.diff(codes[grouped], prepend=-2))
+        collected: List[List[np.ndarray]] = [[] for _ in names]
+        for stratum in np.split(grouped, starts[1:]):
+            for i, piece in enumerate(_cut(stratum, fractions, np.round)):
+                collected[i].append(piece)
+        pieces = [np.sort(np.concatenate(chunks)) for chunks in collected]
+    elif method == 'group':
+        codes, uniques = pd.factorize(_column(df, column, method), use_na_sentinel=False)
+        if len(uniques) < len(names):
+            raise ValueError(f"Column {column} has fewer groups than split parts")
+        group_order = np.random.RandomState(seed).permutation(len(uniques))
+        sizes = np.bincount(codes, minlength=len(uniques))[group_order]
+        # Each group goes to the part its first row would fall in
+        starts = np.cumsum(sizes) - sizes
+        part_of = np.empty(len(uniques), dtype=np.int64)
+        part_of[group_order] = np.searchsorted(np.cumsum(fractions)[:-1] * n, starts, side='right')
+        row_part = part_of[codes]
+        pieces = [np.flatnonzero(row_part == i) for i in range(len(names))]
+    else:
+        series = _column(df, column, method).reset_index(drop=True)
+        ordered = series.sort_values(kind='stable', na_position='last').index.to_numpy()
+        pieces = _cut(ordered, fractions)
+    return dict(zip(names, pieces))
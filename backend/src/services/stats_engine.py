@@ -0,0 +1,199 @@
+import warnings
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+# Quantiles computed for every numeric column
+QUANTILES = [0.25, 0.5, 0.75]
+# Row labels of DataFrame.describe() for numeric columns
+NUMERIC_SUMMARY_ROWS = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+IQR_FACTOR = 1.5
+
+
+def column_positions(df: pd.DataFrame, include) -> List[int]:
+    """Positions of the columns df.select_dtypes(include=include) picks (labels may repeat)"""
+    return list(df.set_axis(range(df.shape[1]), axis=1, copy=False).select_dtypes(include=include).columns)
+
+
+def numeric_matrix(df: pd.DataFrame, positions: List[int]) -> np.ndarray:
+    """Stack the columns at `positions` into one contiguous float64 matrix (missing values as NaN)"""
+    if len(positions) == 0:
+        return np.empty((len(df), 0), dtype=np.float64)
+    return df.iloc[:, positions].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def compute_profile(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Compute every statistic the EDA endpoints need in one batched pass over a
+    2-D float matrix of the numeric columns: counts, missing counts, moments,
+    quartiles, IQR bounds with outlier counts, and the correlation matrix.
+    """
+    # Columns are addressed by position: labels may repeat
+    numeric_positions = column_positions(df, 'number')
+    # df.corr(numeric_only=True) also takes bool columns
+    corr_positions = column_positions(df, ['number', 'bool'])
+    numeric_cols = [df.columns[i] for i in numeric_positions]
+    corr_cols = [df.columns[i] for i in corr_positions]
+    X = numeric_matrix(df, corr_positions)
+    N = X[:, [corr_positions.index(i) for i in numeric_positions]]
+
+    present = ~np.isnan(N)
+    count = present.sum(axis=0)
+    has_missing = bool(np.isnan(X).any())
+    with warnings.catch_warnings(), np.errstate(all='ignore'):
+        # All-NaN columns legitimately produce NaN statistics
+        warnings.simplefilter('ignore', RuntimeWarning)
+        mean = np.nanmean(N, axis=0)
+        std = np.nanstd(N, axis=0, ddof=1)
+        minimum = np.nanmin(N, axis=0) if len(N) else np.full(N.shape[1], np.nan)
+        maximum = np.nanmax(N, axis=0) if len(N) else np.full(N.shape[1], np.nan)
+        if not len(N):
+            quartiles = np.full((len(QUANTILES), N.shape[1]), np.nan)
+        elif has_missing:
+            quartiles = np.nanquantile(N, QUANTILES, axis=0)
+        else:
+            quartiles = np.quantile(N, QUANTILES, axis=0)
+        q1, median, q3 = quartiles
+        iqr = q3 - q1
+        lower = q1 - IQR_FACTOR * iqr
+        upper = q3 + IQR_FACTOR * iqr
+        outlier_count = ((N < lower) | (N > upper)).sum(axis=0)
+
+        if X.shape[1] and np.isfinite(X).all():
+            corr_values = np.corrcoef(X, rowvar=False).reshape(X.shape[1], X.shape[1])
+        else:
+            # Pairwise over finite values, as pandas computes it, when values are missing or infinite
+            corr_values = pd.DataFrame(X).corr().to_numpy()
+    corr = pd.DataFrame(corr_values, index=corr_cols, columns=corr_cols)
+
+    stats = pd.DataFrame({
+        'count': count.astype(np.float64),
+        'mean': mean,
+        'std': std,
+        'min': minimum,
+        '25%': q1,
+        '50%': median,
+        '75%': q3,
+        'max': maximum,
+        'iqr': iqr,
+        'lower': lower,
+        'upper': upper,
+        'outlier_count': outlier_count,
+    }, index=numeric_cols)
+
+    return {
+        'rows': len(df),
+        'columns': list(df.columns),
+        'numeric_columns': numeric_cols,
+        'missing': df.isnull().sum(),
+        'stats': stats,
+        'corr': corr,
+    }
+
+
+def _summary_row_order(descriptions: List[List[str]]) -> List[str]:
+    # Same row ordering pandas uses when describe() mixes column kinds
+    names = []
+    seen = set()
+    for rows in sorted(descriptions, key=len):
+        for name in rows:
+            if name not in seen:
+                seen.add(name)
+                names.append(name)
+    return names
+
+
+def describe_frame(df: pd.DataFrame, profile: Dict[str, Any]) -> pd.DataFrame:
+    """Equivalent of df.describe(include='all') with numeric columns taken from the profile"""
+    stats = profile['stats']
+    numeric = set(profile['numeric_columns'])
+    # Sketch-based profiles carry their own non-numeric summaries
+    precomputed = profile.get('described', {})
+    # Repeated labels: `df` is the profiled frame, whose numeric columns the stats rows follow in order.
+    # Otherwise columns are looked up by name (`df` may be a subset, e.g. a report shard)
+    numeric_rows = dict(zip(column_positions(df, 'number'), range(len(stats)))) if df.columns.has_duplicates else {}
+    described = []
+    for position, col in enumerate(df.columns):
+        if position in numeric_rows:
+            described.append(stats.iloc[numeric_rows[position]][NUMERIC_SUMMARY_ROWS])
+        elif col in numeric and not df.columns.has_duplicates:
+            described.append(stats.loc[col, NUMERIC_SUMMARY_ROWS])
+        elif col in precomputed:
+            described.append(precomputed[col])
+        else:
+            described.append(df.iloc[:, position].describe())
+    if not described:
+        return df.describe(include='all')
+    rows = _summary_row_order([list(d.index) for d in described])
+    table = pd.DataFrame({i: d.reindex(rows) for i, d in enumerate(described)}, index=rows)
+    table.columns = df.columns
+    return table
+
+
+def diff_columns(old: pd.DataFrame, new: pd.DataFrame) -> Optional[Dict[str, List[Any]]]:
+    """
+    Which columns a transform added, removed or changed (by dtype or values), and which
+    it left untouched. None when the rows changed (length or duplicate names), since
+    then every column statistic is affected.
+    """
+    if len(old) != len(new) or old.columns.has_duplicates or new.columns.has_duplicates:
+        return None
+    diff = {"added": [], "removed": [c for c in old.columns if c not in new.columns], "changed": [], "unchanged": []}
+    for col in new.columns:
+        if col not in old.columns:
+            diff["added"].append(col)
+            continue
+        before, after = old[col], new[col]
+        if before.dtype != after.dtype or not np.array_equal(before.isna().to_numpy(), after.isna().to_numpy()):
+            diff["changed"].append(col)
+        elif before.reset_index(drop=True).equals(after.reset_index(drop=True)):
+            diff["unchanged"].append(col)
+        else:
+            diff["changed"].append(col)
+    return diff
+
+
+def update_profile(profile: Dict[str, Any], df: pd.DataFrame, unchanged: List[Any]) -> Dict[str, Any]:
+    """
+    Profile of `df` from the profile of an earlier version with the same rows: statistics,
+    missing counts and correlations of `unchanged` columns are reused, and only the other
+    columns (and their correlation rows/columns) are computed.
+    """
+    keep = set(unchanged)
+    affected = [col for col in df.columns if col not in keep]
+    partial = compute_profile(df[affected]) if affected else None
+    numeric_cols = list(df.select_dtypes(include='number').columns)
+    corr_cols = list(df.select_dtypes(include=['number', 'bool']).columns)
+
+    stats = pd.DataFrame(
+        [profile['stats'].loc[col] if col in keep else partial['stats'].loc[col] for col in numeric_cols],
+        index=numeric_cols, columns=profile['stats'].columns,
+    ).astype(profile['stats'].dtypes.to_dict())
+    missing = pd.Series(
+        [profile['missing'][col] if col in keep else partial['missing'][col] for col in df.columns],
+        index=df.columns, dtype=profile['missing'].dtype,
+    )
+
+    old_corr = profile['corr']
+    kept = [col for col in corr_cols if col in keep]
+    corr = pd.DataFrame(np.nan, index=corr_cols, columns=corr_cols)
+    corr.loc[kept, kept] = old_corr.loc[kept, kept].to_numpy()
+    # Pairwise-complete correlations of each affected column with every other one;
+    # infinite values are left out, as df.corr() does
+    numeric = df[corr_cols].astype(np.float64)
+    numeric = numeric.where(np.isfinite(numeric))
+    for col in corr_cols:
+        if col not in keep:
+            with np.errstate(all='ignore'):
+                row = numeric.corrwith(numeric[col])
+            corr.loc[col, :] = row.to_numpy()
+            corr.loc[:, col] = row.to_numpy()
+
+    return {
+        'rows': len(df),
+        'columns': list(df.columns),
+        'numeric_columns': numeric_cols,
+        'missing': missing,
+        'stats': stats,
+        'corr': corr,
+    }
@@ -0,0 +1,397 @@
+import importlib
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Union
+import numpy as np
+import pandas as pd
+from .dataset_store import read_columnar
+
+# Fits running at the same time, one worker process each
+TRAINING_WORKERS = int(os.getenv("DATASWIFT_TRAINING_WORKERS", "2"))
+# Jobs allowed to wait for a free worker before /model/train starts rejecting
+TRAINING_QUEUE_LIMIT = int(os.getenv("DATASWIFT_TRAINING_QUEUE", "16"))
+ARTIFACT_DIR = os.getenv("DATASWIFT_ARTIFACT_DIR", "/tmp")
+# Finished jobs kept around for status/stats lookups
+FINISHED_JOBS_KEPT = 200
+
+ACTIVE_STATUSES = ("queued", "training")
+
+logger = logging.getLogger(__name__)
+
+# algorithm -> (task, module, estimator class)
+ESTIMATORS = {
+    "random_forest": ("classification", "sklearn.ensemble", "RandomForestClassifier"),
+    "xgboost": ("classification", "xgboost", "XGBClassifier"),
+    "logistic_regression": ("classification", "sklearn.linear_model", "LogisticRegression"),
+    "random_forest_regressor": ("regression", "sklearn.ensemble", "RandomForestRegressor"),
+    "xgboost_regressor": ("regression", "xgboost", "XGBRegressor"),
+    "linear_regression": ("regression", "sklearn.linear_model", "LinearRegression"),
+    "kmeans": ("clustering", "sklearn.cluster", "KMeans"),
+    "dbscan": ("clustering", "sklearn.cluster", "DBSCAN"),
+}
+DEFAULT_ALGORITHMS = {
+    "classification": "random_forest",
+    "regression": "random_forest_regressor",
+    "clustering": "kmeans",
+}
+# Scale-sensitive estimators get standardized inputs
+SCALED_ALGORITHMS = {"logistic_regression", "kmeans", "dbscan"}
+
+
+class TrainingQueueFull(ValueError):
+    pass
+
+
+def artifact_path_for(experiment_id: str) -> str:
+    return os.path.join(ARTIFACT_DIR, f"model_{experiment_id}.pkl")
+
+
+def _coerce_param(value: Any) -> Any:
+    # Form inputs arrive as strings
+    if not isinstance(value, str):
+        return value
+    if value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def build_estimator(algorithm: str, hyperparams: Optional[Dict[str, Any]] = None):
+    """Instantiate the estimator for `algorithm`, ignoring hyperparameters it does not accept"""
+    if algorithm not in ESTIMATORS:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+    _, module_name, class_name = ESTIMATORS[algorithm]
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError:
+        raise ValueError(f"{class_name} requires the {module_name.split('.')[0]} package, which is not installed")
+    estimator = getattr(module, class_name)()
+    accepted = estimator.get_params()
+    params = {k: _coerce_param(v) for k, v in (hyperparams or {}).items() if k in accepted and v not in (None, "")}
+    return estimator.set_params(**params)
+
+
+def _training_frame(df: pd.DataFrame, config: Dict[str, Any], task: str):
+    target = config.get("target")
+    if task != "clustering":
+        if not target or target not in df.columns:
+            raise ValueError(f"Target column '{target}' not found")
+        df = df[df[target].notna()]
+    requested = [c for c in (config.get("features") or df.columns) if c in df.columns and c != target]
+    numeric = set(df.select_dtypes(include=["number", "bool"]).columns)
+    features = [c for c in requested if c in numeric]
+    if not features:
+        raise ValueError("No numeric feature columns to train on")
+    X = df[features].astype(np.float64)
+    y = df[target] if task != "clustering" else None
+    return X, y, features
+
+
+def _classification_metrics(model, X_test, y_test) -> Dict[str, float]:
+    from sklearn import metrics
+    predicted = model.predict(X_test)
+    result = {
+        "accuracy": metrics.accuracy_score(y_test, predicted),
+        "f1_score": metrics.f1_score(y_test, predicted, average="weighted", zero_division=0),
+        "precision": metrics.precision_score(y_test, predicted, average="weighted", zero_division=0),
+        "recall": metrics.recall_score(y_test, predicted, average="weighted", zero_division=0),
+    }
+    if hasattr(model, "predict_proba") and len(model.classes_) == 2 and y_test.nunique() == 2:
+        proba = model.predict_proba(X_test)[:, 1]
+        result["roc_auc"] = metrics.roc_auc_score(y_test == model.classes_[1], proba)
+    return result
+
+
+def _regression_metrics(model, X_test, y_test) -> Dict[str, float]:
+    from sklearn import metrics
+    predicted = model.predict(X_test)
+    return {
+        "rmse": float(np.sqrt(metrics.mean_squared_error(y_test, predicted))),
+        "mae": metrics.mean_absolute_error(y_test, predicted),
+        "r2": metrics.r2_score(y_test, predicted),
+    }
+
+
+def _clustering_metrics(model, X) -> Dict[str, float]:
+    from sklearn import metrics
+    labels = model[-1].labels_
+    clustered = labels != -1
+    if len(set(labels[clustered])) < 2:
+        return {"n_clusters": int(len(set(labels[clustered])))}
+    Xt = model[:-1].transform(X)[clustered]
+    labels = labels[clustered]
+    return {
+        "n_clusters": int(len(set(labels))),
+        "silhouette_score": metrics.silhouette_score(Xt, labels, sample_size=min(len(labels), 5000), random_state=0),
+        "davies_bouldin": metrics.davies_bouldin_score(Xt, labels),
+    }
+
+
+def fit_experiment(source: Union[str, pd.DataFrame], config: Dict[str, Any], artifact_path: str,
+                   test_size: float = 0.2, random_state: int = 42) -> Dict[str, Any]:
+    """
+    Fit the estimator described by an experiment config and pickle it to `artifact_path`.
+    Runs inside a training worker process; `source` is either a columnar dataset
+    directory (read memory-mapped, nothing is copied over the pipe) or a DataFrame.
+    """
+    from sklearn.impute import SimpleImputer
+    from sklearn.model_selection import train_test_split
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    started = time.perf_counter()
+    df = read_columnar(source) if isinstance(source, str) else source
+    task = config.get("task") or "classification"
+    algorithm = config.get("algorithm") or DEFAULT_ALGORITHMS.get(task)
+    if algorithm in ESTIMATORS and ESTIMATORS[algorithm][0] != task:
+        raise ValueError(f"{algorithm} is not a {task} algorithm")
+    X, y, features = _training_frame(df, config, task)
+    estimator = build_estimator(algorithm, config.get("hyperparams"))
+
+    steps = [SimpleImputer(strategy="median")]
+    if algorithm in SCALED_ALGORITHMS:
+        steps.append(StandardScaler())
+    model = make_pipeline(*steps, estimator)
+
+    if task == "clustering":
+        model.fit(X)
+        metrics = _clustering_metrics(model, X)
+        train_rows, test_rows = len(X), 0
+    else:
+        if algorithm == "xgboost":
+            # XGBoost wants labels 0..k-1
+            y = pd.Series(pd.factorize(y, sort=True)[0], index=y.index)
+        stratify = None
+        if task == "classification" and y.value_counts().min() >= 2:
+            stratify = y
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=test_size, random_state=random_state, stratify=stratify)
+        model.fit(X_train, y_train)
+        if task == "classification":
+            metrics = _classification_metrics(model, X_test, y_test)
+        else:
+            metrics = _regression_metrics(model, X_test, y_test)
+        train_rows, test_rows = len(X_train), len(X_test)
+
+    os.makedirs(os.path.dirname(artifact_path) or ".", exist_ok=True)
+    with open(artifact_path, "wb") as f:
+        pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return {
+        "metrics": {k: round(float(v), 4) if isinstance(v, float) else v for k, v in metrics.items()},
+        "artifact_path": artifact_path,
+        "features": features,
+        "train_rows": train_rows,
+        "test_rows": test_rows,
+        "training_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+class TrainingScheduler:
+    """
+    Bounded training queue in front of a process pool.
+    At most `max_workers` fits run at once; up to `max_queue` more wait in a local
+    queue and are only handed to the pool when a worker frees up, so a queued job
+    can always be cancelled. A running job that is cancelled keeps its worker busy
+    until the fit returns, but its result is discarded.
+    `on_update(job)` is called on every status change (queued, training, complete,
+    failed, cancelled), in order, on the scheduler's update thread and without its lock
+    held, so callbacks may block (e.g. on database writes) without stalling the queue.
+    """
+
+    def __init__(self, max_workers: int = TRAINING_WORKERS, max_queue: int = TRAINING_QUEUE_LIMIT):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # One thread delivers every status update, which keeps them in the order they were emitted
+        self._updates = ThreadPoolExecutor(max_workers=1, thread_name_prefix="training-updates")
+        self._pending: "deque[str]" = deque()
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._callbacks: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        self._running = 0
+        self._lock = threading.RLock()
+        self.counters = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "rejected": 0}
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and thread pools is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def submit(self, experiment_id: str, source: Union[str, pd.DataFrame], config: Dict[str, Any],
+               on_update: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        with self._lock:
+            active = self.job_for(experiment_id)
+            if active is not None and active["status"] in ACTIVE_STATUSES:
+                raise ValueError(f"Experiment {experiment_id} is already {active['status']}")
+            if self.max_queue and len(self._pending) >= self.max_queue:
+                self.counters["rejected"] += 1
+                raise TrainingQueueFull(f"Training queue is full ({self.max_queue} jobs waiting)")
+            job_id = uuid.uuid4().hex
+            job = {
+                "job_id": job_id,
+                "experiment_id": experiment_id,
+                "status": "queued",
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "error": None,
+                "result": None,
+                "_args": (source, config, f"{artifact_path_for(experiment_id)}.{job_id}.part"),
+            }
+            self._jobs[job["job_id"]] = job
+            if on_update is not None:
+                self._callbacks[job["job_id"]] = on_update
+            self._pending.append(job["job_id"])
+            self.counters["submitted"] += 1
+            self._emit(job)
+            self._dispatch()
+            return self._snapshot(job)
+
+    def _dispatch(self) -> None:
+        # Called with the lock held
+        while self._pending and self._running < self.max_workers:
+            job = self._jobs[self._pending.popleft()]
+            try:
+                future = self._pool().submit(fit_experiment, *job["_args"])
+            except BrokenProcessPool as e:
+                self._executor = None
+                self._finish(job, "failed", error=f"Training worker crashed: {e}")
+                continue
+            job["status"] = "training"
+            job["started_at"] = time.time()
+            self._running += 1
+            self._emit(job)
+            future.add_done_callback(lambda f, job_id=job["job_id"]: self._completed(job_id, f))
+
+    def _completed(self, job_id: str, future) -> None:
+        with self._lock:
+            self._running -= 1
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] == "cancelled":
+                self._remove_staged(future)
+            else:
+                error = future.exception()
+                if error is None:
+                    result = future.result()
+                    final = artifact_path_for(job["experiment_id"])
+                    try:
+                        os.replace(result["artifact_path"], final)
+                        self._finish(job, "complete", result={**result, "artifact_path": final})
+                    except OSError as e:
+                        self._finish(job, "failed", error=f"Could not store model artifact: {e}")
+                else:
+                    if isinstance(error, BrokenProcessPool):
+                        self._executor = None
+                    self._finish(job, "failed", error=str(error) or type(error).__name__)
+            self._dispatch()
+
+    def _finish(self, job: Dict[str, Any], status: str, result=None, error=None) -> None:
+        job.update(status=status, result=result, error=error, finished_at=time.time())
+        job.pop("_args", None)
+        self.counters[{"complete": "completed"}.get(status, status)] += 1
+        self._emit(job)
+        self._trim()
+
+    @staticmethod
+    def _remove_staged(future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            try:
+                os.remove(future.result()["artifact_path"])
+            except OSError:
+                pass
+
+    def _trim(self) -> None:
+        finished = [j for j, job in self._jobs.items() if job["status"] not in ACTIVE_STATUSES]
+        for job_id in finished[:max(0, len(finished) - FINISHED_JOBS_KEPT)]:
+            del self._jobs[job_id]
+
+    def cancel(self, experiment_or_job_id: str) -> Dict[str, Any]:
+        with self._lock:
+            job = self._jobs.get(experiment_or_job_id) or self.job_for(experiment_or_job_id)
+            if job is None:
+                raise KeyError(experiment_or_job_id)
+            if job["status"] not in ACTIVE_STATUSES:
+                raise ValueError(f"Job already {job['status']}")
+            if job["status"] == "queued":
+                self._pending.remove(job["job_id"])
+            self._finish(job, "cancelled")
+            return self._snapshot(job)
+
+    def job_for(self, experiment_id: str) -> Optional[Dict[str, Any]]:
+        """Latest job of an experiment"""
+        with self._lock:
+            for job in reversed(self._jobs.values()):
+                if job["experiment_id"] == experiment_id:
+                    return job
+        return None
+
+    def get(self, experiment_or_job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(experiment_or_job_id) or self.job_for(experiment_or_job_id)
+            return self._snapshot(job) if job is not None else None
+
+    def _snapshot(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        snapshot = {k: v for k, v in job.items() if not k.startswith("_")}
+        if job["status"] == "queued":
+            snapshot["queue_position"] = self._pending.index(job["job_id"]) + 1
+        return snapshot
+
+    def _emit(self, job: Dict[str, Any]) -> None:
+        # Called with the lock held so status changes are queued for delivery in order
+        if job["status"] in ACTIVE_STATUSES:
+            callback = self._callbacks.get(job["job_id"])
+        else:
+            callback = self._callbacks.pop(job["job_id"], None)
+        if callback is not None:
+            self._updates.submit(self._deliver, callback, self._snapshot(job))
+
+    @staticmethod
+    def _deliver(callback: Callable[[Dict[str, Any]], None], job: Dict[str, Any]) -> None:
+        try:
+            callback(job)
+        except Exception:
+            logger.exception("Training status callback failed for job %s", job["job_id"])
+
+    def flush(self) -> None:
+        """Wait until every status update emitted so far has been delivered"""
+        self._updates.submit(lambda: None).result()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.time()
+            waiting = [self._jobs[j]["submitted_at"] for j in self._pending]
+            return {
+                **self.counters,
+                "workers": self.max_workers,
+                "running": self._running,
+                "queue_depth": len(self._pending),
+                "queue_limit": self.max_queue,
+                "oldest_wait_seconds": round(now - min(waiting), 3) if waiting else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for job_id in list(self._pending):
+                self._finish(self._jobs[job_id], "cancelled")
+            self._pending.clear()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        # Deliver the final statuses (e.g. cancellations) before the process exits
+        self.flush()
+
+
+TRAINING_SCHEDULER = TrainingScheduler()
@@ -0,0 +1,26 @@
+import os
+import sys
+import tempfile
+
+# Stores, spill files, pipelines, reports and artifacts of the test session live in one
+# temporary directory; set before src.services is imported (module-level configuration)
+_ROOT = tempfile.mkdtemp(prefix="dataswift-tests-")
+for name, path in [("DATASWIFT_DATA_DIR", "datasets"), ("DATASWIFT_SPILL_DIR", "spill"),
+                   ("DATASWIFT_PIPELINE_DIR", "pipelines"), ("DATASWIFT_REPORT_DIR", "reports"),
+                   ("DATASWIFT_ARTIFACT_DIR", "artifacts")]:
+    os.environ.setdefault(name, os.path.join(_ROOT, path))
+os.makedirs(os.environ["DATASWIFT_ARTIFACT_DIR"], exist_ok=True)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+from src.services.dataset_store import ColumnarDatasetStore, MemoryDatasetStore  # noqa: E402
+
+
+@pytest.fixture(params=["columnar", "memory"])
+def store(request, tmp_path):
+    """A fresh dataset store of each backend"""
+    if request.param == "columnar":
+        return ColumnarDatasetStore(str(tmp_path / "datasets"))
+    return MemoryDatasetStore(spill_dir=str(tmp_path / "spill"))
@@ -0,0 +1,88 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services.chart_service import CHART_CACHE, ChartCache, bar_data, check_chart, render_chart
+from src.services.eda_service import DATASETS, EDAService
+
+
+def _frame(rows=2000):
+    rng = np.random.RandomState(0)
+    return pd.DataFrame({"x": rng.normal(size=rows), "city": rng.choice(["Paris", "Rome", "Oslo", None], rows)})
+
+
+@pytest.fixture
+def dataset():
+    DATASETS["charts"] = _frame()
+    yield "charts"
+    del DATASETS["charts"]
+    CHART_CACHE.drop_dataset("charts")
+
+
+def test_bar_data_matches_value_counts():
+    series = _frame()["city"]
+    data = bar_data(series, limit=2)
+    counts = series.value_counts()
+    assert data["labels"] == [str(label) for label in counts.index[:2]]
+    assert data["counts"] == counts.tolist()[:2]
+    assert (data["categories"], data["nulls"]) == (3, int(series.isna().sum()))
+    assert bar_data(series.astype("category").iloc[:0])["labels"] == []
+
+
+def test_rendering_is_safe_from_many_threads():
+    data = {"column": "x", "kind": "histogram", "edges": [0, 1, 2], "counts": [3, 4]}
+    images, errors = [], []
+
+    def render(fmt):
+        try:
+            images.append((fmt, render_chart(data, fmt)))
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=render, args=(fmt,)) for fmt in ["png", "svg"] * 6]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors and len(images) == 12
+    for fmt, image in images:
+        assert image.startswith(b"\x89PNG") if fmt == "png" else b"<svg" in image
+    assert render_chart(bar_data(_frame()["city"])).startswith(b"\x89PNG")
+
+
+def test_chart_cache_budget_and_rekeying():
+    cache = ChartCache(budget=10)
+    cache.put(("d", 1, "a", "png"), b"aaaa")
+    cache.put(("d", 1, "b", "png"), b"bbbb")
+    cache.get(("d", 1, "a", "png"))
+    cache.put(("e", 1, "a", "png"), b"cccc")
+    assert cache.get(("d", 1, "b", "png")) is None and cache.stats()["evictions"] == 1
+    cache.put(("big",), b"x" * 11)
+    assert cache.get(("big",)) is None
+    cache.carry_forward("d", 1, 2, ["a"])
+    assert cache.get(("d", 2, "a", "png")) == b"aaaa" and cache.get(("d", 1, "a", "png")) is None
+    cache.drop_dataset("d")
+    assert cache.stats()["entries"] == 1 and cache.resident_bytes == 4
+
+
+def test_render_charts_are_cached_per_version(dataset):
+    first = EDAService.render_charts(dataset, ["x", "city"], "svg")
+    hits = CHART_CACHE.stats()["hits"]
+    again = EDAService.render_charts(dataset, ["x", "city"], "svg")
+    assert again == first and CHART_CACHE.stats()["hits"] == hits + 2
+    assert EDAService.visualize_dataset(dataset).startswith(b"\x89PNG")
+    DATASETS[dataset] = _frame(rows=10)
+    misses = CHART_CACHE.stats()["misses"]
+    EDAService.render_charts(dataset, ["x"], "svg")
+    assert CHART_CACHE.stats()["misses"] == misses + 1
+
+
+def test_chart_validation(dataset):
+    with pytest.raises(ValueError, match="Unsupported chart format"):
+        check_chart("gif")
+    with pytest.raises(ValueError, match="bins must be"):
+        check_chart("png", 0)
+    with pytest.raises(ValueError, match="Column not found"):
+        EDAService.chart_data(dataset, "nope")
@@ -0,0 +1,154 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services import clean_engine
+from src.services.clean_engine import AUTO_CLEAN_STEPS, auto_clean
+from src.services.dtype_optimizer import decode_categoricals, optimize_dtypes
+
+
+def baseline_auto_clean(df):
+    """The auto branch of /clean before clean_engine"""
+    thresh_col = int(0.5 * len(df))
+    df = df.dropna(axis=1, thresh=thresh_col)
+    thresh_row = int(0.5 * len(df.columns))
+    df = df.dropna(axis=0, thresh=thresh_row)
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].fillna(df[col].median())
+        else:
+            mode = df[col].mode()
+            if not mode.empty:
+                df[col] = df[col].fillna(mode[0])
+            else:
+                df[col] = df[col].fillna('')
+    for col in df.columns:
+        try:
+            df[col] = pd.to_numeric(df[col])
+        except Exception:
+            try:
+                df[col] = pd.to_datetime(df[col])
+            except Exception:
+                pass
+    df = df.drop_duplicates()
+    for col in df.select_dtypes(include=[np.number]).columns:
+        Q1 = df[col].quantile(0.25)
+        Q3 = df[col].quantile(0.75)
+        IQR = Q3 - Q1
+        mask = (df[col] >= Q1 - 1.5 * IQR) & (df[col] <= Q3 + 1.5 * IQR)
+        df = df[mask]
+    for col in df.select_dtypes(include=[object]).columns:
+        df[col] = df[col].astype(str).str.strip().str.lower()
+    df.columns = [re.sub(r'[^a-zA-Z0-9_]', '', c.replace(' ', '_')).lower() for c in df.columns]
+    cat_cols = df.select_dtypes(include=[object]).columns
+    if len(cat_cols) > 0:
+        df = pd.get_dummies(df, columns=cat_cols, drop_first=True)
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            df = df[~df[col].isna()]
+    return df.reset_index(drop=True)
+
+
+def _messy(rows=2000, seed=0):
+    rng = np.random.RandomState(seed)
+    amount = rng.gamma(2.0, 10.0, rows)
+    amount[rng.rand(rows) < 0.05] = np.nan
+    amount[[3, 17]] = [900.0, -400.0]
+    city = rng.choice([" Paris", "paris ", "ROME", "Oslo", None], rows)
+    day = pd.Series(pd.date_range("2024-01-01", periods=rows, freq="h").strftime("%Y-%m-%d %H:%M:%S"))
+    df = pd.DataFrame({"Amount ($)": amount, "City Name": city, "day": day,
+                       "sparse": np.where(rng.rand(rows) < 0.9, None, "x")})
+    df.loc[5:9, ["Amount ($)", "City Name", "day"]] = None
+    # Duplicate rows
+    return pd.concat([df, df.iloc[100:140]], ignore_index=True)
+
+
+def test_matches_baseline_with_one_numeric_column():
+    df = _messy()
+    cleaned, report = auto_clean(df)
+    expected = baseline_auto_clean(df.copy())
+    pd.testing.assert_frame_equal(cleaned, expected)
+    assert (report["rows_after"], report["columns_after"]) == expected.shape
+
+
+def test_matches_baseline_for_categorical_storage():
+    # /clean decodes the categoricals ingest stored text as before cleaning
+    df = _messy()
+    stored, _ = optimize_dtypes(df)
+    cleaned, _ = auto_clean(decode_categoricals(stored)[0])
+    pd.testing.assert_frame_equal(cleaned, baseline_auto_clean(df.copy()), check_dtype=False)
+
+
+def test_outlier_quartiles_use_the_same_rows_for_every_column():
+    rng = np.random.RandomState(1)
+    df = pd.DataFrame({"a": rng.randn(1000), "b": rng.randn(1000) * 5, "c": rng.gamma(1.0, size=1000)})
+    df.loc[[1, 2, 3], "a"] = [30.0, -25.0, 40.0]
+    cleaned, report = auto_clean(df)
+    q1, q3 = df.quantile(0.25), df.quantile(0.75)
+    keep = ((df >= q1 - 1.5 * (q3 - q1)) & (df <= q3 + 1.5 * (q3 - q1))).all(axis=1)
+    pd.testing.assert_frame_equal(cleaned, df[keep].reset_index(drop=True))
+    # Independent of column order
+    reordered, _ = auto_clean(df[["c", "a", "b"]])
+    pd.testing.assert_frame_equal(reordered, cleaned[["c", "a", "b"]])
+    outliers = next(step for step in report["steps"] if step["step"] == "remove_outliers")
+    assert outliers["rows_affected"] == int((~keep).sum()) and outliers["columns"] == ["a", "b", "c"]
+
+
+def test_type_inference_checks_the_whole_column():
+    numbers = pd.Series([str(i) for i in range(5000)], dtype=object)
+    # Position 1 is outside the evenly spaced sample: the full conversion fails and the column stays text
+    mixed = numbers.copy()
+    mixed[1] = "n/a"
+    df = pd.DataFrame({"numbers": numbers, "mixed": mixed, "when": pd.date_range("2024-01-01", periods=5000),
+                       "dates": pd.date_range("2024-01-01", periods=5000).astype(str)})
+    converted, rows, columns = clean_engine._infer_types(df)
+    pd.testing.assert_series_equal(converted["numbers"], pd.to_numeric(numbers), check_names=False)
+    assert converted["mixed"].dtype == object and converted["mixed"][1] == "n/a"
+    # Datetime columns are left alone (pd.to_numeric no longer turns them into integers)
+    assert converted["when"].dtype == df["when"].dtype
+    pd.testing.assert_series_equal(converted["dates"], pd.to_datetime(df["dates"]), check_names=False)
+    assert columns == ["numbers", "dates"] and rows == 5000
+
+
+def test_threads_do_not_change_the_result(monkeypatch):
+    df = _messy(seed=3)
+    parallel, _ = auto_clean(df)
+    monkeypatch.setattr(clean_engine, "CLEAN_THREADS", 1)
+    serial, _ = auto_clean(df)
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+def test_report_lists_every_step():
+    df = _messy()
+    cleaned, report = auto_clean(df)
+    steps = report["steps"]
+    assert [step["step"] for step in steps] == [name for name, _ in AUTO_CLEAN_STEPS]
+    assert (report["rows_before"], report["columns_before"]) == df.shape
+    rows = report["rows_before"]
+    for step in steps:
+        if step["step"] in ("drop_sparse", "drop_duplicates", "remove_outliers", "drop_invalid_datetimes"):
+            assert step["rows_after"] == rows - step["rows_affected"]
+        else:
+            assert step["rows_after"] == rows
+        rows = step["rows_after"]
+        assert step["seconds"] >= 0
+    by_name = {step["step"]: step for step in steps}
+    assert by_name["drop_sparse"]["columns"] == ["sparse"]
+    assert by_name["drop_duplicates"]["rows_affected"] == 40
+    assert by_name["infer_types"]["columns"] == ["day"]
+    assert by_name["standardize_names"]["columns"] == ["Amount ($)", "City Name"]
+    assert report["rows_after"] == len(cleaned) and report["total_seconds"] >= 0
+
+
+@pytest.mark.parametrize("df", [pd.DataFrame({"a": [np.nan, np.nan]}), pd.DataFrame({"t": ["A ", "b", "a"]}),
+                                pd.DataFrame({"n": [1, 1, 2], "t": ["x", "x", None]})])
+def test_edge_cases_match_baseline(df):
+    cleaned, _ = auto_clean(df)
+    pd.testing.assert_frame_equal(cleaned, baseline_auto_clean(df.copy()))
+
+
+def test_empty_frame():
+    cleaned, report = auto_clean(pd.DataFrame())
+    assert cleaned.shape == (0, 0) and report["rows_after"] == 0
@@ -0,0 +1,108 @@
+import asyncio
+import math
+import threading
+import time
+
+import pytest
+
+from src.services.compute_executor import ComputeExecutor, _parse_limits
+
+
+@pytest.fixture
+def executor():
+    executor = ComputeExecutor(threads=8, processes=0, limits={"slow": 2}, default_limit=3)
+    yield executor
+    executor.shutdown()
+
+
+def test_runs_off_the_event_loop_and_keeps_it_responsive(executor):
+    async def main():
+        ticks = []
+
+        async def heartbeat():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        beat = asyncio.create_task(heartbeat())
+        thread = await executor.run("any", lambda: time.sleep(0.3) or threading.current_thread())
+        beat.cancel()
+        return thread, ticks
+
+    thread, ticks = asyncio.run(main())
+    assert thread is not threading.main_thread()
+    # The loop kept ticking while the blocking call ran
+    assert len(ticks) >= 10
+
+
+def test_endpoint_limits_bound_concurrency(executor):
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def work():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    async def main(endpoint):
+        await asyncio.gather(*(executor.run(endpoint, work) for _ in range(10)))
+
+    for endpoint, limit in (("slow", 2), ("other", 3)):
+        peak[0] = 0
+        asyncio.run(main(endpoint))
+        assert peak[0] == limit
+    stats = executor.stats()["endpoints"]["slow"]
+    assert (stats["completed"], stats["active"], stats["waiting"]) == (10, 0, 0)
+    assert stats["max_wait_seconds"] > 0
+
+
+def test_failures_propagate_and_are_counted(executor):
+    def fail():
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError, match="bad input"):
+        asyncio.run(executor.run("any", fail))
+    assert executor.stats()["endpoints"]["any"]["failed"] == 1
+    assert asyncio.run(executor.run("any", sorted, [1, 3, 2], reverse=True)) == [3, 2, 1]
+
+
+def test_stream_drains_on_workers_and_closes_early(executor):
+    closed = []
+
+    def chunks():
+        try:
+            for i in range(100):
+                yield threading.current_thread(), i
+        finally:
+            closed.append(True)
+
+    async def main(stop):
+        seen = []
+        async for thread, i in executor.stream("export", chunks()):
+            seen.append((thread, i))
+            if i == stop:
+                break
+        return seen
+
+    seen = asyncio.run(main(stop=1000))
+    assert [i for _, i in seen] == list(range(100))
+    assert all(thread is not threading.main_thread() for thread, _ in seen)
+    assert asyncio.run(main(stop=4))[-1][1] == 4
+    assert closed == [True, True]
+
+
+def test_map_runs_inline_or_on_processes():
+    inline = ComputeExecutor(processes=0)
+    assert inline.map(math.sqrt, [1, 4, 9]) == [1.0, 2.0, 3.0]
+    pooled = ComputeExecutor(processes=1)
+    try:
+        assert list(pooled.imap(math.sqrt, [16, 25])) == [4.0, 5.0]
+    finally:
+        pooled.shutdown()
+
+
+def test_parse_limits():
+    assert _parse_limits("export=2, visualize=4,,") == {"export": 2, "visualize": 4}
+    assert _parse_limits("") == {}
@@ -0,0 +1,265 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services.dataset_store import (VIEWS_DIR, ColumnarDatasetStore, DatasetStore, FrameCache, MemoryDatasetStore,
+                                        frame_nbytes, read_columnar, write_columnar)
+from src.services.eda_service import DATASETS, EDAService
+
+
+def _frame(rows=1000, shift=0):
+    rng = np.random.RandomState(shift)
+    return pd.DataFrame({
+        "i": np.arange(rows) + shift,
+        "f": rng.rand(rows),
+        "b": rng.rand(rows) > 0.5,
+        "s": pd.Series(rng.choice(["a", "b", ""], rows)).replace("", np.nan),
+        "c": pd.Categorical(rng.choice(["x", "y"], rows)),
+        "d": pd.date_range("2024-01-01", periods=rows, freq="h"),
+        "n": pd.array(rng.choice([1, 2, None], rows), dtype="Int64"),
+    })
+
+
+def test_columnar_round_trip(tmp_path):
+    df = _frame()
+    df.columns = ["i", "f", "b", "s", "c", "d", "i"]
+    write_columnar(df, str(tmp_path / "data"))
+    pd.testing.assert_frame_equal(read_columnar(str(tmp_path / "data")), df)
+
+
+def test_backends_must_implement_versions_writes_and_views():
+    class Partial(DatasetStore):
+        __getitem__ = __delitem__ = __iter__ = __len__ = None
+
+    with pytest.raises(TypeError, match="add_view, version, write"):
+        Partial()
+
+
+def test_write_read_and_delete(store):
+    df = _frame()
+    assert store.write("a", df) == 1
+    pd.testing.assert_frame_equal(store["a"], df)
+    assert "a" in store and list(store) == ["a"] and store.version("a") == 1
+    assert store.schema("a")[0] == ("i", "int64")
+    del store["a"]
+    assert "a" not in store and store.version("a") is None
+    with pytest.raises(KeyError):
+        store["a"]
+
+
+def test_versions_are_never_reused(store):
+    store["a"] = _frame()
+    store["a"] = _frame(shift=1)
+    assert store.version("a") == 2
+    del store["a"]
+    # A recreated dataset must not collide with results memoized for its earlier versions
+    assert store.write("a", _frame()) == 3
+
+
+def test_concurrent_writes_get_distinct_versions(store):
+    store["a"] = _frame()
+    versions, errors = [], []
+
+    def write(shift):
+        try:
+            versions.append(store.write("a", _frame(shift=shift)))
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(shift,)) for shift in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert sorted(versions) == list(range(2, 10))
+    assert store.version("a") == 9
+
+
+def test_adopt_and_clone_return_versions(store):
+    store["a"] = _frame()
+    staging = store.staging_dir()
+    write_columnar(_frame(shift=5), staging)
+    assert store.adopt("a", staging) == 2
+    assert not os.path.exists(staging)
+    assert store.clone("b", "a") == 1
+    pd.testing.assert_frame_equal(store["b"], _frame(shift=5))
+    store["a"] = _frame()
+    # The clone keeps the data it was taken from
+    pd.testing.assert_frame_equal(store["b"], _frame(shift=5))
+
+
+def test_views_read_rows_and_detach_on_parent_write(store):
+    df = _frame()
+    store["parent"] = df
+    rows = np.array([5, 1, 7])
+    store.add_view("view", "parent", rows)
+    store.add_view("nested", "view", np.array([0, 2]))
+    expected = df.iloc[rows].reset_index(drop=True)
+    pd.testing.assert_frame_equal(store["view"], expected)
+    assert store.view_of("nested")["parent"] == "parent"
+    store["parent"] = _frame(shift=3)
+    # The views were materialized from the version they were taken from
+    assert store.view_of("view") is None
+    pd.testing.assert_frame_equal(store["view"], expected, check_dtype=False)
+    pd.testing.assert_frame_equal(store["nested"], expected.iloc[[0, 2]].reset_index(drop=True), check_dtype=False)
+
+
+def test_deleting_parent_materializes_views(store):
+    store["parent"] = _frame()
+    store.add_view("view", "parent", np.arange(10))
+    del store["parent"]
+    assert store.view_of("view") is None
+    assert len(store["view"]) == 10
+
+
+def test_view_index_is_per_parent(tmp_path, monkeypatch):
+    store = ColumnarDatasetStore(str(tmp_path / "datasets"))
+    for parent in ("p1", "p2"):
+        store[parent] = _frame()
+        store.add_view(f"{parent}-v", parent, np.arange(5))
+    store.add_view("p1-w", "p1", np.arange(3))
+    # Writes only look at their own views, not at every dataset's meta.json
+    opened = []
+    real_view_of = store.view_of
+    monkeypatch.setattr(store, "view_of", lambda dataset_id: opened.append(dataset_id) or real_view_of(dataset_id))
+    store["p2"] = _frame(shift=1)
+    assert opened == ["p2-v"]
+    assert sorted(store._views_of("p1")) == ["p1-v", "p1-w"]
+    # Stale entries (a view rewritten as plain data, or deleted) drop out of the index
+    store["p1-v"] = _frame()
+    del store["p1-w"]
+    assert store._views_of("p1") == []
+    assert os.listdir(tmp_path / "datasets" / VIEWS_DIR / "p1") == []
+
+
+def test_concurrent_replace_does_not_serve_stale_results():
+    dataset_id = EDAService.upload_dataset(_frame().to_csv(index=False).encode(), "data.csv")
+    try:
+        EDAService.analyze_dataset(dataset_id)
+        frames = [_frame(shift=shift)[["i", "f"]] for shift in range(1, 7)]
+        threads = [threading.Thread(target=EDAService.replace_dataset, args=(dataset_id, frame)) for frame in frames]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Whichever write landed last, the memoized statistics describe exactly that data
+        stored = DATASETS[dataset_id]
+        summary = EDAService.analyze_dataset(dataset_id)["summary"]
+        assert summary["i"]["mean"] == pytest.approx(stored["i"].mean())
+        assert summary["f"]["mean"] == pytest.approx(stored["f"].mean())
+    finally:
+        del DATASETS[dataset_id]
+
+
+def test_frame_cache_evicts_least_recently_used():
+    size = frame_nbytes(_frame())
+    evicted = []
+    cache = FrameCache(budget=int(2.5 * size), on_evict=lambda dataset_id, entry: evicted.append(dataset_id))
+    for name in ("a", "b"):
+        cache.put(name, _frame())
+    cache.get("a")
+    cache.put("c", _frame())
+    assert evicted == ["b"] and cache.keys() == ["a", "c"]
+    assert cache.resident_bytes == 2 * size <= cache.budget
+    cache.put("b", _frame())
+    stats = cache.stats()
+    assert (stats["evictions"], stats["reloads"], stats["resident_datasets"]) == (2, 1, 2)
+    # An entry larger than the budget on its own still stays resident
+    cache.put("huge", _frame(rows=10000))
+    assert cache.keys() == ["huge"]
+
+
+def test_memory_store_spills_and_reloads(tmp_path):
+    size = frame_nbytes(_frame())
+    store = MemoryDatasetStore(memory_budget=int(1.5 * size), spill_dir=str(tmp_path / "spill"))
+    evicted = []
+    store.add_eviction_listener(evicted.append)
+    frames = {name: _frame(shift=i) for i, name in enumerate(("a", "b", "c"))}
+    for name, df in frames.items():
+        store[name] = df
+    assert evicted == ["a", "b"] and store.cache.keys() == ["c"]
+    assert sorted(os.listdir(tmp_path / "spill")) == ["a", "b"]
+    assert sorted(store) == ["a", "b", "c"]
+    assert len(store) == 3
+    for name, df in frames.items():
+        # Reloaded data (and dtypes) are exactly what was written
+        pd.testing.assert_frame_equal(store[name], df)
+    assert store.cache.stats()["reloads"] >= 2
+    # Rewriting or deleting a spilled dataset drops its stale spill files
+    store.cache.get("c")
+    store["a"] = _frame(shift=9)
+    del store["b"]
+    assert "b" not in os.listdir(tmp_path / "spill")
+    pd.testing.assert_frame_equal(store["a"], _frame(shift=9))
+
+
+def test_spilled_datasets_keep_their_versions(tmp_path):
+    store = MemoryDatasetStore(memory_budget=1, spill_dir=str(tmp_path / "spill"))
+    store["a"] = _frame()
+    store["b"] = _frame()
+    assert "a" not in store.cache and store.version("a") == 1
+    pd.testing.assert_frame_equal(store["a"], _frame())
+    assert store.version("a") == 1
+
+
+def test_content_index_follows_the_dataset_version(store):
+    store["a"] = _frame()
+    store.remember_content("csv-abc", "a")
+    assert store.find_content("csv-abc") == "a"
+    assert store.find_content("csv-other") is None
+    # Once the data behind a key changes, the key no longer finds it
+    store["a"] = _frame(shift=1)
+    assert store.find_content("csv-abc") is None
+    store.remember_content("csv-def", "a")
+    del store["a"]
+    assert store.find_content("csv-def") is None
+
+
+def test_clone_is_copy_on_write(store):
+    store["a"] = _frame()
+    assert store.clone("b", "a") == 1
+    pd.testing.assert_frame_equal(store["b"], store["a"])
+    store["a"] = _frame(shift=2)
+    pd.testing.assert_frame_equal(store["b"], _frame())
+    store["b"] = _frame(shift=3)
+    pd.testing.assert_frame_equal(store["a"], _frame(shift=2))
+    with pytest.raises(KeyError):
+        store.clone("c", "missing")
+
+
+def test_memory_clone_shares_column_buffers(tmp_path):
+    store = MemoryDatasetStore(spill_dir=str(tmp_path / "spill"))
+    store["a"] = _frame()
+    store.clone("b", "a")
+    assert np.shares_memory(store["a"]["f"].to_numpy(), store["b"]["f"].to_numpy())
+
+
+def test_columnar_clone_links_files_and_derived_results(tmp_path):
+    store = ColumnarDatasetStore(str(tmp_path / "datasets"))
+    store["a"] = _frame()
+    store["a"] = _frame()
+    store.write_derived("a", "index.bin", 2, b"derived")
+    assert store.clone("b", "a") == 1
+    source, clone = store.dataset_dir("a"), store.dataset_dir("b")
+    for name in ("c0.npy", "c1.npy"):
+        assert os.path.samefile(os.path.join(source, name), os.path.join(clone, name))
+    # Derived files are renamed to the clone's version
+    assert store.read_derived("b", "index.bin", 1) == b"derived"
+
+
+def test_unchanged_mapped_columns_are_linked(tmp_path):
+    write_columnar(_frame(), str(tmp_path / "first"))
+    df = read_columnar(str(tmp_path / "first"))
+    df["f"] = df["f"] * 2
+    values = df["i"].to_numpy()
+    values[0] = -1  # a private copy-on-write change to a mapped column
+    df["extra"] = 1
+    write_columnar(df, str(tmp_path / "second"))
+    same = [os.path.samefile(tmp_path / "first" / f"c{i}.npy", tmp_path / "second" / f"c{i}.npy") for i in range(3)]
+    assert same == [False, False, True]
+    pd.testing.assert_frame_equal(read_columnar(str(tmp_path / "second")), df)
+    pd.testing.assert_frame_equal(read_columnar(str(tmp_path / "first")), _frame())
@@ -0,0 +1,127 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.api.data_api import _clean_dataset
+from src.services import dtype_optimizer
+from src.services.clean_engine import auto_clean
+from src.services.dtype_optimizer import decode_categoricals, encode_categoricals, optimize_dtypes
+from src.services.eda_service import DATASETS, EDAService
+from src.services.pipeline_engine import check_pipeline, execute_pipeline
+
+
+def _frame(rows=400):
+    rng = np.random.RandomState(0)
+    return pd.DataFrame({
+        "num_str": [str(i % 7) for i in range(rows)],
+        "city": pd.Series(rng.choice(["Paris", " Rome", "london ", ""], rows)).replace("", np.nan),
+        "amount": rng.randint(0, 1000, rows),
+        "ratio": rng.choice([0.5, 0.25, np.nan], rows),
+        "target": rng.randint(0, 2, rows),
+    })
+
+
+def _csv(df):
+    return df.to_csv(index=False).encode()
+
+
+def test_optimize_shrinks_and_keeps_values():
+    df = _frame()
+    optimized, memory = optimize_dtypes(df)
+    assert memory["after_bytes"] < memory["before_bytes"]
+    assert isinstance(optimized["city"].dtype, pd.CategoricalDtype)
+    assert optimized["amount"].dtype == np.int32
+    assert optimized["ratio"].dtype == np.float32
+    pd.testing.assert_frame_equal(decode_categoricals(optimized)[0], df, check_dtype=False)
+
+
+def test_optimize_keep_and_disabled(monkeypatch):
+    df = _frame()
+    optimized, memory = optimize_dtypes(df, keep=["city"])
+    assert optimized["city"].dtype == object and "city" not in memory["converted"]
+    monkeypatch.setattr(dtype_optimizer, "OPTIMIZE_DTYPES", False)
+    same, memory = optimize_dtypes(df)
+    assert same is df and memory["converted"] == {}
+
+
+def test_decode_and_encode_round_trip():
+    optimized, _ = optimize_dtypes(_frame())
+    decoded, names = decode_categoricals(optimized)
+    assert set(names) == {"num_str", "city"}
+    assert (decoded.dtypes[names] == object).all()
+    encoded = encode_categoricals(decoded, names)
+    assert encoded["city"].dtype == optimized["city"].dtype
+    pd.testing.assert_frame_equal(encoded, optimized)
+
+
+@pytest.mark.parametrize("script", [
+    "df['city'] = df['city'].fillna('unknown')",
+    "df['tag'] = df['city'].fillna('') + '_x'",
+    "df.loc[0, 'city'] = 'Berlin'",
+    "df['num'] = df['num_str'].astype(int) * 2",
+    "df['city'] = df['city'].str.strip().str.lower()",
+])
+def test_baseline_script_idioms_on_optimized_upload(script):
+    df = _frame()
+    dataset_id = EDAService.upload_dataset(_csv(df), "data.csv")
+    try:
+        EDAService.run_script(dataset_id, script)
+        expected = pd.read_csv(io.BytesIO(_csv(df)))
+        local_vars = {"df": expected, "pd": pd}
+        exec(script, {}, local_vars)
+        result = decode_categoricals(DATASETS[dataset_id])[0]
+        pd.testing.assert_frame_equal(result, local_vars["df"], check_dtype=False)
+    finally:
+        del DATASETS[dataset_id]
+
+
+def test_script_keeps_untouched_text_categorical():
+    dataset_id = EDAService.upload_dataset(_csv(_frame()), "data.csv")
+    try:
+        columns = EDAService.run_script(dataset_id, "df['amount'] = df['amount'] + 1")
+        assert columns == {"added": [], "removed": [], "changed": ["amount"]}
+        assert isinstance(DATASETS[dataset_id]["city"].dtype, pd.CategoricalDtype)
+    finally:
+        del DATASETS[dataset_id]
+
+
+def _cleaned(data, optimize, monkeypatch):
+    monkeypatch.setattr(dtype_optimizer, "OPTIMIZE_DTYPES", optimize)
+    dataset_id = EDAService.upload_dataset(data, "data.parquet")
+    try:
+        _clean_dataset(dataset_id, "auto", None)
+        return DATASETS[dataset_id]
+    finally:
+        del DATASETS[dataset_id]
+
+
+def test_auto_clean_endpoint_matches_unoptimized_upload(monkeypatch):
+    # Parquet keeps "0".."6" as text, which auto-clean converts to numbers instead of one-hot encoding
+    buffer = io.BytesIO()
+    _frame().to_parquet(buffer)
+    optimized = _cleaned(buffer.getvalue(), True, monkeypatch)
+    plain = _cleaned(buffer.getvalue(), False, monkeypatch)
+    assert list(optimized.columns) == list(plain.columns)
+    assert optimized["num_str"].dtype == np.int64
+    pd.testing.assert_frame_equal(optimized, plain, check_dtype=False)
+
+
+def test_auto_clean_treats_categoricals_as_text():
+    df = pd.DataFrame({"num_str": [str(i % 7) for i in range(200)], "value": np.arange(200.0)})
+    optimized, _ = optimize_dtypes(df)
+    assert isinstance(optimized["num_str"].dtype, pd.CategoricalDtype)
+    cleaned, _ = auto_clean(optimized)
+    expected, _ = auto_clean(df)
+    assert list(cleaned.columns) == list(expected.columns) == ["num_str", "value"]
+    assert cleaned["num_str"].dtype == np.int64
+    pd.testing.assert_frame_equal(cleaned, expected, check_dtype=False)
+
+
+def test_pipeline_impute_constant_on_categorical():
+    optimized, _ = optimize_dtypes(_frame())
+    steps = check_pipeline({"steps": [{"op": "impute", "columns": ["city"], "strategy": "constant", "value": "unknown"}]})
+    result = execute_pipeline(optimized, steps)["frame"]
+    expected = _frame()["city"].fillna("unknown")
+    assert (result["city"].astype(object) == expected).all()
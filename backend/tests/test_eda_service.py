@@ -0,0 +1,243 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services import eda_service
+from src.services.eda_service import DATASETS, EDA_RESULTS, EDAService
+
+
+def _frame(rows=300, shift=0):
+    rng = np.random.RandomState(shift)
+    return pd.DataFrame({"x": rng.rand(rows), "y": rng.rand(rows) * 10, "s": rng.choice(["a", "b"], rows)})
+
+
+@pytest.fixture
+def dataset():
+    DATASETS["memo"] = _frame()
+    yield "memo"
+    if "memo" in DATASETS:
+        del DATASETS["memo"]
+
+
+@pytest.fixture
+def profile_calls(monkeypatch):
+    calls = []
+    compute = eda_service.compute_profile
+    monkeypatch.setattr(eda_service, "compute_profile", lambda df: calls.append(len(df)) or compute(df))
+    return calls
+
+
+def test_repeated_calls_are_served_from_the_memo(dataset, profile_calls):
+    first = EDAService.analyze_dataset(dataset)
+    assert EDAService.analyze_dataset(dataset) is first
+    assert EDAService.analyze_dataset(dataset, mode="exact") is first
+    EDAService.correlation_matrix(dataset)
+    EDAService.detect_outliers(dataset)
+    EDAService.generate_insights(dataset)
+    # Every endpoint shares one memoized profile of the version
+    assert profile_calls == [300]
+    assert EDA_RESULTS[dataset]["version"] == DATASETS.version(dataset)
+    # Arguments are part of the key
+    assert EDAService.analyze_dataset(dataset, "approx") is not first
+
+
+def test_writes_invalidate_results(dataset, profile_calls):
+    before = EDAService.analyze_dataset(dataset)
+    DATASETS[dataset] = _frame(rows=200, shift=1)
+    after = EDAService.analyze_dataset(dataset)
+    assert after is not before and profile_calls == [300, 200]
+    assert after["summary"]["x"]["count"] == 200
+    assert after["summary"]["y"]["mean"] == pytest.approx(_frame(rows=200, shift=1)["y"].mean())
+
+
+def test_memoized_results_match_the_baseline_computation(dataset):
+    df = DATASETS[dataset]
+    EDAService.analyze_dataset(dataset)
+    result = EDAService.analyze_dataset(dataset)
+    expected = df.describe(include="all").to_dict()
+    for col in ("x", "y"):
+        for stat in ("count", "mean", "std", "min", "25%", "50%", "75%", "max"):
+            assert result["summary"][col][stat] == pytest.approx(expected[col][stat])
+    assert result["summary"]["s"]["unique"] == 2 and result["summary"]["s"]["top"] == expected["s"]["top"]
+    assert result["missing"] == df.isnull().sum().to_dict()
+    assert result["dtypes"] == {"x": "number", "y": "number", "s": "string"}
+    assert result["preview"] == df.head(5).to_dict(orient="records")
+
+
+def test_recreated_dataset_does_not_see_old_results(dataset):
+    EDAService.analyze_dataset(dataset)
+    assert dataset in EDA_RESULTS
+    del DATASETS[dataset]
+    # A recreated dataset gets a new version, so nothing memoized for the old one is served
+    DATASETS[dataset] = _frame(rows=50)
+    assert EDAService.analyze_dataset(dataset)["summary"]["x"]["count"] == 50
+
+
+def test_unknown_datasets_are_not_memoized():
+    with pytest.raises(ValueError, match="Dataset not found"):
+        EDAService.analyze_dataset("missing")
+    assert "missing" not in EDA_RESULTS
+
+
+# --- Incremental recompute after a transform (replace_dataset) ---
+
+def _wide(rows=400, shift=0):
+    rng = np.random.RandomState(shift)
+    df = pd.DataFrame({f"n{i}": rng.randn(rows) * (i + 1) for i in range(4)})
+    df["n1"] = df["n0"] * 3 + rng.randn(rows) * 0.1
+    df.loc[[4, 50], "n2"] = [40.0, -35.0]
+    df.loc[::9, "n3"] = np.nan
+    df["s"] = rng.choice(["a", "b", "c"], rows)
+    return df
+
+
+def _warm(dataset_id):
+    EDAService.analyze_dataset(dataset_id)
+    EDAService.detect_outliers(dataset_id)
+    EDAService.generate_insights(dataset_id)
+    for column in DATASETS[dataset_id].columns:
+        EDAService.chart_data(dataset_id, column)
+
+
+def _results(dataset_id):
+    return {
+        "analysis": EDAService.analyze_dataset(dataset_id),
+        "correlation": EDAService.correlation_matrix(dataset_id),
+        "outliers": EDAService.detect_outliers(dataset_id),
+        "insights": EDAService.generate_insights(dataset_id),
+        "charts": {col: EDAService.chart_data(dataset_id, col) for col in DATASETS[dataset_id].columns},
+    }
+
+
+def _assert_same(actual, expected):
+    if isinstance(expected, dict):
+        assert list(actual) == list(expected)
+        for key in expected:
+            _assert_same(actual[key], expected[key])
+    elif isinstance(expected, list):
+        assert len(actual) == len(expected)
+        for a, e in zip(actual, expected):
+            _assert_same(a, e)
+    elif isinstance(expected, float):
+        assert actual == pytest.approx(expected, rel=1e-9, abs=1e-12, nan_ok=True)
+    else:
+        assert actual == expected
+
+
+@pytest.fixture
+def wide():
+    DATASETS["wide"] = _wide()
+    yield "wide"
+    if "wide" in DATASETS:
+        del DATASETS["wide"]
+
+
+@pytest.fixture
+def index_calls(monkeypatch):
+    calls = []
+    index = eda_service.column_index
+    monkeypatch.setattr(eda_service, "column_index", lambda series: calls.append(series.name) or index(series))
+    return calls
+
+
+def test_transform_recomputes_only_changed_columns(wide, profile_calls, index_calls):
+    _warm(wide)
+    assert profile_calls == [400]
+    changed = DATASETS[wide].copy()
+    changed["n2"] = changed["n2"] * 2 + 1
+    changed.loc[7, "n3"] = 99.0
+    changed["t"] = changed["n0"].abs()
+    before = EDAService.chart_data(wide, "n0")
+    diff = EDAService.replace_dataset(wide, changed)
+    assert diff == {"added": ["t"], "removed": [], "changed": ["n2", "n3"]}
+    carried = _results(wide)
+    # No full profile pass, and only the affected columns were indexed again
+    assert profile_calls == [400]
+    assert sorted(index_calls) == ["n2", "n3", "t"]
+    assert EDAService.chart_data(wide, "n0") is before
+    # Identical to computing the new version from scratch, and to plain pandas
+    EDA_RESULTS.pop(wide)
+    _assert_same(carried, _results(wide))
+    stored = DATASETS[wide]
+    expected_corr = stored.corr(numeric_only=True)
+    for a in expected_corr:
+        for b in expected_corr:
+            assert carried["correlation"][a][b] == pytest.approx(expected_corr.loc[a, b])
+    for col in ("n0", "n2", "n3", "t"):
+        series = stored[col]
+        q1, q3 = series.quantile(0.25), series.quantile(0.75)
+        mask = (series < q1 - 1.5 * (q3 - q1)) | (series > q3 + 1.5 * (q3 - q1))
+        assert carried["outliers"][col]["indices"] == series[mask].index.tolist()
+    assert {4, 50} <= set(carried["outliers"]["n2"]["indices"])
+
+
+def test_row_changes_fall_back_to_full_recompute(wide, profile_calls):
+    _warm(wide)
+    assert EDAService.replace_dataset(wide, DATASETS[wide].iloc[:-10]) is None
+    EDAService.analyze_dataset(wide)
+    assert profile_calls == [400, 390]
+
+
+def test_charts_of_unchanged_columns_stay_cached(wide):
+    EDAService.render_charts(wide, ["n0", "n2"])
+    hits = eda_service.CHART_CACHE.stats()["hits"]
+    changed = DATASETS[wide].assign(n2=lambda df: df["n2"] + 1)
+    EDAService.replace_dataset(wide, changed)
+    EDAService.render_charts(wide, ["n0", "n2"])
+    assert eda_service.CHART_CACHE.stats()["hits"] == hits + 1
+
+
+# --- Content-addressed uploads ---
+
+@pytest.fixture
+def upload(tmp_path):
+    ids = []
+    path = tmp_path / "sales.csv"
+    path.write_bytes(_wide().to_csv(index=False).encode())
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+
+    def put(schema=None, filename="sales.csv"):
+        dataset_id, ingest = EDAService.upload_dataset_file(str(path), filename, digest, schema)
+        ids.append(dataset_id)
+        return dataset_id, ingest
+    yield put
+    for dataset_id in ids:
+        if dataset_id in DATASETS:
+            del DATASETS[dataset_id]
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    calls = []
+    parse = eda_service.parse_chunks
+    monkeypatch.setattr(eda_service, "parse_chunks", lambda *args, **kwargs: calls.append(args[1]) or parse(*args, **kwargs))
+    return calls
+
+
+def test_repeat_upload_shares_the_parsed_dataset(upload, parses):
+    first, ingest = upload()
+    assert not ingest["deduplicated"]
+    summary = EDAService.analyze_dataset(first)
+    second, ingest = upload()
+    assert second != first and ingest["deduplicated"] and parses == ["sales.csv"]
+    pd.testing.assert_frame_equal(DATASETS[second], DATASETS[first])
+    # Results memoized for the source come with the data
+    assert EDAService.analyze_dataset(second) is summary
+    # Each copy changes independently of the other
+    EDAService.replace_dataset(second, DATASETS[second].assign(n0=0.0))
+    assert (DATASETS[first]["n0"] != 0).any()
+    assert EDAService.analyze_dataset(second)["summary"]["n0"]["mean"] == 0
+
+
+def test_changed_source_or_other_hints_parse_again(upload, parses):
+    first, _ = upload()
+    _, ingest = upload(schema={"n0": "string"})
+    assert not ingest["deduplicated"]
+    # The same bytes under another format are another content
+    _, ingest = upload(filename="sales.txt")
+    assert not ingest["deduplicated"]
+    DATASETS[first] = _wide(shift=1)
+    _, ingest = upload()
+    assert not ingest["deduplicated"] and len(parses) == 4
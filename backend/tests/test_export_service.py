@@ -0,0 +1,93 @@
+import gzip
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.services.export_service import (accepts_arrow, arrow_stream_bytes, check_export, export_filename,
+                                         export_media_type, iter_export)
+
+
+def _frame(rows=1000):
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame({
+        "i": np.arange(rows),
+        "f": rng.rand(rows),
+        "s": pd.Series(rng.choice(["a", "b,c", 'q"uote', ""], rows)).replace("", np.nan),
+        "b": rng.rand(rows) > 0.5,
+        "d": pd.date_range("2024-01-01", periods=rows, freq="h"),
+    })
+    df.loc[3, "f"] = np.nan
+    return df
+
+
+def _export(df, fmt, compression=None, chunk_rows=128):
+    chunks = list(iter_export(df, fmt, compression, chunk_rows=chunk_rows))
+    assert all(chunks)
+    return b"".join(chunks), chunks
+
+
+def test_csv_matches_the_baseline_export():
+    df = _frame()
+    data, chunks = _export(df, "csv")
+    # The baseline wrote the whole frame with to_csv in one go
+    assert data == df.to_csv(index=False).encode()
+    assert len(chunks) == 8
+    assert _export(df.head(0), "csv")[0] == df.head(0).to_csv(index=False).encode()
+
+
+def test_jsonl_round_trips():
+    df = _frame()
+    data, _ = _export(df, "jsonl")
+    result = pd.read_json(io.BytesIO(data), lines=True, convert_dates=["d"])
+    pd.testing.assert_frame_equal(result, df, check_dtype=False)
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_columnar_formats_round_trip(fmt):
+    df = _frame()
+    data, _ = _export(df, fmt)
+    if fmt == "parquet":
+        parquet = pq.ParquetFile(io.BytesIO(data))
+        assert parquet.num_row_groups == 8
+        result = parquet.read().to_pandas()
+    else:
+        result = pa.ipc.open_stream(data).read_all().to_pandas()
+    pd.testing.assert_frame_equal(result, df, check_dtype=False)
+
+
+def test_all_null_chunks_and_mixed_objects_keep_one_schema():
+    df = pd.DataFrame({"s": [None] * 200 + ["x"] * 56, "m": [1, "a"] * 128})
+    data, _ = _export(df, "arrow", chunk_rows=100)
+    table = pa.ipc.open_stream(data).read_all()
+    assert table.schema.field("s").type == pa.string() and table.schema.field("m").type == pa.string()
+    assert table.column("m").to_pylist()[:2] == ["1", "a"]
+    assert pa.ipc.open_stream(arrow_stream_bytes(df)).read_all().equals(table)
+
+
+def test_gzip_compression():
+    df = _frame()
+    data, _ = _export(df, "csv", "gzip")
+    assert gzip.decompress(data) == df.to_csv(index=False).encode()
+
+
+def test_zstd_compression():
+    zstandard = pytest.importorskip("zstandard")
+    data, _ = _export(_frame(), "jsonl", "zstd")
+    assert zstandard.ZstdDecompressor().decompressobj().decompress(data) == _export(_frame(), "jsonl")[0]
+
+
+def test_validation_and_headers():
+    with pytest.raises(ValueError, match="Unsupported export format"):
+        check_export("xml")
+    with pytest.raises(ValueError, match="Unsupported compression"):
+        iter_export(_frame(), "csv", "bz2")
+    assert export_media_type("parquet") == "application/vnd.apache.parquet"
+    assert export_media_type("csv", "gzip") == "application/gzip"
+    assert export_filename("sales", "arrow", "gzip") == "sales.arrows.gz"
+    assert accepts_arrow("text/html, application/vnd.apache.arrow.stream;q=0.9")
+    assert not accepts_arrow("application/vnd.apache.arrow.stream;q=0")
+    assert not accepts_arrow(None)
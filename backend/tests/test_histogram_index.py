@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services import eda_service
+from src.services.dataset_store import ColumnarDatasetStore
+from src.services.eda_service import HISTOGRAM_INDEX_FILE, EDAService
+from src.services.histogram_index import (ADAPTIVE_BINS, build_index, column_index, histogram_from_index,
+                                          index_from_bytes, index_to_bytes)
+
+
+def _values(rows=50_000, seed=0):
+    rng = np.random.RandomState(seed)
+    values = rng.gamma(2.0, size=rows)
+    values[rng.rand(rows) < 0.02] = np.nan
+    return pd.Series(values, name="v")
+
+
+@pytest.mark.parametrize("bins", [1, 7, 10, 20, 48])
+def test_fixed_bins_match_numpy_histogram(bins):
+    series = _values()
+    chart = histogram_from_index("v", column_index(series), bins)
+    # The baseline chart was series.hist(): np.histogram over the non-null values
+    counts, edges = np.histogram(series.dropna(), bins=bins)
+    np.testing.assert_allclose(chart["edges"], edges)
+    assert chart["exact"]
+    assert chart["counts"] == counts.tolist()
+    assert (chart["nulls"], chart["min"], chart["max"]) == (int(series.isna().sum()), series.min(), series.max())
+
+
+def test_non_dividing_bin_counts_are_close():
+    series = _values()
+    chart = histogram_from_index("v", column_index(series), 11)
+    counts, _ = np.histogram(series.dropna(), bins=11)
+    assert not chart["exact"] and sum(chart["counts"]) == counts.sum()
+    assert np.abs(np.array(chart["counts"]) - counts).max() <= 0.01 * counts.max()
+
+
+def test_adaptive_bins_are_equal_frequency():
+    series = _values()
+    chart = histogram_from_index("v", column_index(series), 8, "adaptive")
+    assert len(chart["counts"]) == 8 and sum(chart["counts"]) == series.notna().sum()
+    assert max(chart["counts"]) - min(chart["counts"]) <= 2 * series.notna().sum() / ADAPTIVE_BINS
+    with pytest.raises(ValueError, match="Unsupported binning"):
+        histogram_from_index("v", column_index(series), 8, "log")
+
+
+def test_degenerate_columns():
+    constant = histogram_from_index("c", column_index(pd.Series([3.0] * 10)), 10)
+    counts, edges = np.histogram([3.0] * 10, bins=10)
+    assert constant["counts"] == counts.tolist()
+    np.testing.assert_allclose(constant["edges"], edges)
+    empty = histogram_from_index("e", column_index(pd.Series([np.nan, np.inf])), 10)
+    assert empty["counts"] == [] and empty["nulls"] == 2
+
+
+def test_index_round_trips_through_bytes():
+    df = pd.DataFrame({"a": _values(), "b": np.arange(50_000), "flag": True, "s": "x"})
+    index = build_index(df)
+    assert list(index) == ["a", "b"]
+    restored = index_from_bytes(index_to_bytes(index))
+    for name in index:
+        for key, value in index[name].items():
+            if isinstance(value, np.ndarray):
+                np.testing.assert_array_equal(restored[name][key], value)
+            else:
+                assert restored[name][key] == value
+
+
+def test_index_is_saved_per_version(tmp_path, monkeypatch):
+    store = ColumnarDatasetStore(str(tmp_path / "datasets"))
+    monkeypatch.setattr(eda_service, "DATASETS", store)
+    monkeypatch.setattr(eda_service, "EDA_RESULTS", {})
+    builds = []
+    monkeypatch.setattr(eda_service, "build_index", lambda df: builds.append(len(df)) or build_index(df))
+    store["hist"] = pd.DataFrame({"v": _values()})
+    chart = EDAService.chart_data("hist", "v", 20)
+    assert chart["counts"] == np.histogram(_values().dropna(), bins=20)[0].tolist()
+    saved = index_from_bytes(store.read_derived("hist", HISTOGRAM_INDEX_FILE, 1))
+    assert saved["v"]["count"] == _values().notna().sum()
+    # A restarted process (empty memo) reads the saved index instead of scanning the data again
+    eda_service.EDA_RESULTS.clear()
+    assert EDAService.chart_data("hist", "v", 10)["counts"] == np.histogram(_values().dropna(), bins=10)[0].tolist()
+    assert len(builds) == 1
+    # A new version gets its own index
+    store["hist"] = pd.DataFrame({"v": _values(seed=1)})
+    chart = EDAService.chart_data("hist", "v", 20)
+    assert chart["counts"] == np.histogram(_values(seed=1).dropna(), bins=20)[0].tolist()
+    assert len(builds) == 2 and store.read_derived("hist", HISTOGRAM_INDEX_FILE, 2) is not None
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression, LogisticRegression
+
+from src.services.inference_service import (ConstantModel, DemoRuleModel, mock_actual_values, model_features, predict_frame,
+                                            prediction_records)
+
+
+def _frame(rows=257):
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame({"feature1": rng.rand(rows) * 4, "feature2": rng.rand(rows) * 5, "label": ["x"] * rows})
+    df["target"] = ((df["feature1"] + df["feature2"]) > 4.5).astype(int)
+    return df
+
+
+def _row_by_row(model, df, features):
+    # What the endpoints did before: one model call per row from iterrows
+    predictions, probabilities = [], []
+    for _, row in df.iterrows():
+        X = pd.DataFrame([row[features].astype(float)], columns=features)
+        predictions.append(model.predict(X)[0])
+        if hasattr(model, "predict_proba"):
+            probabilities.append(model.predict_proba(X)[0, 1])
+    return np.array(predictions), np.array(probabilities)
+
+
+@pytest.mark.parametrize("batch_size", [1, 50, 10_000])
+def test_batches_match_row_by_row_scoring(batch_size):
+    df = _frame()
+    model = LogisticRegression().fit(df[["feature1", "feature2"]], df["target"])
+    result = predict_frame(model, df, batch_size=batch_size)
+    predictions, probabilities = _row_by_row(model, df, ["feature1", "feature2"])
+    np.testing.assert_array_equal(result["prediction"], predictions)
+    np.testing.assert_allclose(result["probability"], probabilities)
+
+
+def test_regressors_and_feature_selection():
+    df = _frame()
+    model = LinearRegression().fit(df[["feature2"]].to_numpy(), df["feature1"])
+    # Fitted without names: every numeric column is fed to the model
+    assert model_features(model, df) == ["feature1", "feature2", "target"]
+    named = LinearRegression().fit(df[["feature2"]], df["feature1"])
+    assert model_features(named, df) == ["feature2"]
+    result = predict_frame(named, df, batch_size=100)
+    np.testing.assert_allclose(result["prediction"], named.predict(df[["feature2"]]))
+    assert result["probability"] is None
+
+
+def test_multiclass_probability_is_the_winning_class():
+    df = _frame()
+    y = pd.cut(df["feature1"], 3, labels=["low", "mid", "high"]).astype(str)
+    model = LogisticRegression().fit(df[["feature1", "feature2"]], y)
+    result = predict_frame(model, df)
+    proba = model.predict_proba(df[["feature1", "feature2"]])
+    np.testing.assert_array_equal(result["prediction"], model.predict(df[["feature1", "feature2"]]))
+    np.testing.assert_allclose(result["probability"], proba.max(axis=1))
+
+
+def test_records_and_placeholder_models():
+    df = _frame().head(3)
+    df.loc[1, "feature2"] = np.nan
+    result = predict_frame(ConstantModel(1), df)
+    records = prediction_records(df, result)
+    assert [r["prediction"] for r in records] == [1, 1, 1]
+    assert records[1]["input"]["feature2"] is None and "probability" not in records[0]
+    demo = predict_frame(DemoRuleModel(seed=0), _frame())
+    assert set(demo["prediction"].tolist()) <= {0, 1}
+    assert ((demo["probability"] >= 0) & (demo["probability"] <= 1)).all()
+    records = prediction_records(_frame(), demo, limit=5)
+    assert len(records) == 5 and records[0]["probability"] == round(float(demo["probability"][0]), 3)
+    assert predict_frame(ConstantModel(1), _frame().head(0))["prediction"].tolist() == []
+
+
+def test_mock_actual_values_for_string_labels():
+    df = _frame(1000)
+    labels = np.where(df["target"] == 1, "high", np.where(df["feature1"] > 2, "mid", "low"))
+    model = LogisticRegression().fit(df[["feature1", "feature2"]], labels)
+    prediction = predict_frame(model, df)["prediction"]
+    actual = mock_actual_values(model, prediction, seed=0)
+    assert actual.dtype == prediction.dtype and len(actual) == len(prediction)
+    assert set(actual) <= set(model.classes_)
+    assert 0.75 < (actual == prediction).mean() < 0.85
+
+
+def test_mock_actual_values_for_binary_and_regression():
+    prediction = predict_frame(DemoRuleModel(seed=1), _frame(1000))["prediction"]
+    actual = mock_actual_values(DemoRuleModel(), prediction, seed=0)
+    np.testing.assert_array_equal(actual[actual != prediction], 1 - prediction[actual != prediction])
+    # 0/1 predictions flip even without class labels on the model
+    assert set(mock_actual_values(ConstantModel(1), np.ones(100, dtype=int), seed=0)) == {0, 1}
+    df = _frame()
+    regressor = LinearRegression().fit(df[["feature1", "feature2"]], df["feature1"] * 2.5)
+    assert len(mock_actual_values(regressor, predict_frame(regressor, df)["prediction"])) == 0
@@ -0,0 +1,191 @@
+import asyncio
+import functools
+import hashlib
+import io
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc
+import pytest
+
+from src.services import dtype_optimizer, eda_service, ingest_service
+from src.services.eda_service import DATASETS, EDAService
+from src.services.ingest_service import UploadTooLarge, iter_dataframe_chunks, read_dataframe, sniff_format, spool_upload
+
+
+def _frame(rows=250):
+    rng = np.random.RandomState(0)
+    return pd.DataFrame({"i": np.arange(rows), "f": rng.rand(rows).round(6), "s": rng.choice(["a", "b", "c"], rows)})
+
+
+def _encode(df, fmt):
+    if fmt == "csv":
+        return df.to_csv(index=False).encode()
+    if fmt == "json":
+        return df.to_json(orient="records").encode()
+    if fmt == "jsonl":
+        return df.to_json(orient="records", lines=True).encode()
+    buffer = io.BytesIO()
+    if fmt == "parquet":
+        df.to_parquet(buffer)
+    elif fmt == "arrow":
+        df.to_feather(buffer)
+    else:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.ipc.new_stream(buffer, table.schema) as writer:
+            writer.write_table(table)
+    return buffer.getvalue()
+
+
+FORMATS = ["csv", "json", "jsonl", "parquet", "arrow", "arrows"]
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+@pytest.mark.parametrize("filename", ["upload.{fmt}", "upload.txt", "upload"])
+def test_format_is_sniffed_from_content(fmt, filename):
+    assert sniff_format(_encode(_frame(), fmt), filename.format(fmt=fmt)) == fmt
+
+
+def test_sniffing_edge_cases(tmp_path):
+    assert sniff_format(b'\xef\xbb\xbf  [{"a": 1}]', "x.csv") == "json"
+    assert sniff_format(b'{"a": 1}\n', "x.jsonl") == "jsonl"
+    assert sniff_format(b'{"a": [1, 2]}', "x.json") == "json"
+    assert sniff_format(b"a,b\n{x},2\n", "x.json") == "csv"
+    assert sniff_format(b"PK\x03\x04rest", "sheet.csv") == "xlsx"
+    path = tmp_path / "data.bin"
+    path.write_bytes(_encode(_frame(), "parquet"))
+    assert sniff_format(str(path), "data.bin") == "parquet"
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_read_dataframe_matches_pandas_readers(fmt, tmp_path):
+    df = _frame()
+    data = _encode(df, fmt)
+    path = tmp_path / "upload"
+    path.write_bytes(data)
+    if fmt == "csv":
+        expected = pd.read_csv(io.BytesIO(data))
+    elif fmt in ("json", "jsonl"):
+        expected = pd.read_json(io.BytesIO(data), lines=fmt == "jsonl")
+    else:
+        expected = df
+    seen = []
+    result = read_dataframe(str(path), "upload", chunk_rows=60, on_chunk=lambda chunk: seen.append(len(chunk)))
+    pd.testing.assert_frame_equal(result, expected)
+    pd.testing.assert_frame_equal(read_dataframe(data, "upload.bin"), expected)
+    assert sum(seen) == len(df)
+
+
+def test_chunks_are_incremental_for_streamable_formats():
+    df = _frame()
+    for fmt in ("csv", "jsonl", "parquet"):
+        chunks = list(iter_dataframe_chunks(_encode(df, fmt), f"x.{fmt}", chunk_rows=100))
+        assert [len(c) for c in chunks] == [100, 100, 50]
+
+
+def test_schema_hints_only_apply_to_csv():
+    data = _encode(_frame(), "csv")
+    assert read_dataframe(data, "x.csv", schema={"i": "string"})["i"].dtype == object
+    with pytest.raises(ValueError):
+        read_dataframe(_encode(_frame(), "json"), "x.json", schema={"i": "string"})
+
+
+def test_empty_csv_and_stored_index():
+    assert read_dataframe(b"a,b\n", "x.csv").columns.tolist() == ["a", "b"]
+    indexed = _frame().set_index("s")
+    # A stored index comes back as a column
+    assert read_dataframe(_encode(indexed, "parquet"), "x.parquet").columns.tolist() == ["s", "i", "f"]
+
+
+class FakeUpload:
+    """Minimal UploadFile: an async read(size) over bytes"""
+
+    def __init__(self, data, filename):
+        self.filename = filename
+        self._buffer = io.BytesIO(data)
+        self.reads = 0
+
+    async def read(self, size=-1):
+        self.reads += 1
+        return self._buffer.read(size)
+
+
+def test_spool_upload_streams_and_hashes():
+    data = _encode(_frame(5000), "csv")
+    upload = FakeUpload(data, "big.csv")
+    path, size, digest = asyncio.run(spool_upload(upload, chunk_size=4096))
+    try:
+        assert size == len(data) and digest == hashlib.sha256(data).hexdigest()
+        assert upload.reads == len(data) // 4096 + 2
+        with open(path, "rb") as f:
+            assert f.read() == data
+    finally:
+        os.remove(path)
+
+
+def test_spool_upload_limits(monkeypatch):
+    monkeypatch.setattr(ingest_service, "MAX_BUFFERED_UPLOAD_SIZE", 1000)
+    spooled = set(os.listdir(tempfile.gettempdir()))
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(spool_upload(FakeUpload(_encode(_frame(), "json"), "x.json"), chunk_size=100))
+    # Streamable formats are not capped by default; the partial file is removed on failure
+    path, _, _ = asyncio.run(spool_upload(FakeUpload(_encode(_frame(), "csv"), "x.csv"), chunk_size=100))
+    os.remove(path)
+    assert set(os.listdir(tempfile.gettempdir())) == spooled
+    with pytest.raises(ValueError, match="Unsupported file type"):
+        asyncio.run(spool_upload(FakeUpload(b"", "x.exe")))
+    path, _, _ = asyncio.run(spool_upload(FakeUpload(b"a\n1\n", "x.exe"), any_extension=True))
+    os.remove(path)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "json"])
+def test_streamed_upload_matches_whole_file_parse(fmt, tmp_path, monkeypatch):
+    # The baseline read the whole upload into memory and parsed it with pandas
+    monkeypatch.setattr(dtype_optimizer, "OPTIMIZE_DTYPES", False)
+    df = _frame(1000)
+    data = _encode(df, fmt)
+    path = tmp_path / f"upload.{fmt}"
+    path.write_bytes(data)
+    baseline = pd.read_csv(io.BytesIO(data)) if fmt == "csv" else pd.read_json(io.BytesIO(data))
+    dataset_id, info = EDAService.upload_dataset_file(str(path), path.name)
+    try:
+        assert info["deduplicated"] is False
+        pd.testing.assert_frame_equal(DATASETS[dataset_id], baseline)
+    finally:
+        del DATASETS[dataset_id]
+
+
+@pytest.mark.parametrize("fmt,engine", [("csv", "pandas"), ("csv", "pyarrow"), ("jsonl", None), ("parquet", None)])
+def test_chunks_stored_as_parsed_match_optimized_frame(fmt, engine, tmp_path, monkeypatch):
+    df = _frame(1000).assign(d=pd.date_range("2024-01-01", periods=1000).astype(str), n=np.arange(1000) * 0.5)
+    df.loc[::7, "s"] = None
+    data = _encode(df, fmt)
+    path = tmp_path / f"upload.{fmt}"
+    path.write_bytes(data)
+    if engine is not None:
+        monkeypatch.setattr(ingest_service, "csv_engine", lambda source: engine)
+    # Several chunks, each written to disk before the next is parsed
+    monkeypatch.setattr(eda_service, "parse_chunks", functools.partial(ingest_service.parse_chunks, chunk_rows=70))
+    expected, expected_memory = dtype_optimizer.optimize_dtypes(read_dataframe(str(path), path.name))
+    dataset_id, info = EDAService.upload_dataset_file(str(path), path.name)
+    try:
+        pd.testing.assert_frame_equal(DATASETS[dataset_id], expected)
+        assert info["memory"] == expected_memory and info["memory"]["converted"]
+    finally:
+        del DATASETS[dataset_id]
+
+
+def test_chunks_with_other_columns_are_combined_in_memory(tmp_path, monkeypatch):
+    # JSON lines whose later rows bring a new key
+    path = tmp_path / "upload.jsonl"
+    path.write_text("".join(f'{{"a": {i}}}\n' for i in range(100)) + '{"a": 100, "b": "x"}\n')
+    monkeypatch.setattr(eda_service, "parse_chunks", functools.partial(ingest_service.parse_chunks, chunk_rows=30))
+    dataset_id, _ = EDAService.upload_dataset_file(str(path), path.name)
+    try:
+        expected, _ = dtype_optimizer.optimize_dtypes(pd.read_json(str(path), lines=True))
+        pd.testing.assert_frame_equal(DATASETS[dataset_id], expected)
+    finally:
+        del DATASETS[dataset_id]
@@ -0,0 +1,145 @@
+import os
+import pickle
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from src.services.inference_service import ConstantModel
+from src.services.model_registry import ModelRegistry
+
+
+def _training_frame(rows=300):
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame({"feature1": rng.rand(rows) * 4, "feature2": rng.rand(rows) * 5, "label": ["x"] * rows})
+    df["target"] = ((df["feature1"] + df["feature2"]) > 4.5).astype(int)
+    return df
+
+
+def _artifact(tmp_path, name="model.pkl"):
+    df = _training_frame()
+    model = LogisticRegression().fit(df[["feature1", "feature2"]], df["target"])
+    path = str(tmp_path / name)
+    with open(path, "wb") as f:
+        pickle.dump(model, f)
+    return path, model
+
+
+class Lookups:
+    """Stand-in for the experiments collection that counts lookups"""
+
+    def __init__(self, *experiments):
+        self.experiments = {e["experiment_id"]: e for e in experiments}
+        self.calls = 0
+
+    def __call__(self, experiment_id):
+        self.calls += 1
+        return self.experiments.get(experiment_id)
+
+
+def test_loads_once_and_serves_every_alias(tmp_path):
+    path, _ = _artifact(tmp_path)
+    registry = ModelRegistry()
+    lookup = Lookups({"experiment_id": "exp", "_id": "db-id", "artifact_path": path})
+    model = registry.resolve("exp", lookup)
+    assert hasattr(model, "predict")
+    assert registry.resolve("exp", lookup) is model and registry.get("db-id") is model
+    assert lookup.calls == 1 and registry.stats()["loads"] == 1
+
+
+def test_missing_artifacts_are_remembered(tmp_path):
+    registry = ModelRegistry(missing_ttl=60)
+    lookup = Lookups({"experiment_id": "exp", "artifact_path": str(tmp_path / "absent.pkl")})
+    for _ in range(3):
+        assert registry.resolve("exp", lookup) is None
+        assert registry.resolve("unknown", lookup) is None
+    assert lookup.calls == 2
+    assert registry.stats()["missing_hits"] == 4
+    # Once the experiment has an artifact (retrained, evicted by the callback) it is looked up again
+    path, _ = _artifact(tmp_path, "absent.pkl")
+    registry.evict("exp")
+    assert registry.resolve("exp", lookup) is not None
+    assert lookup.calls == 3
+
+
+def test_missing_entries_expire(tmp_path, monkeypatch):
+    registry = ModelRegistry(missing_ttl=5)
+    lookup = Lookups({"experiment_id": "exp", "artifact_path": None})
+    clock = [100.0]
+    monkeypatch.setattr("src.services.model_registry.time.monotonic", lambda: clock[0])
+    registry.resolve("exp", lookup)
+    registry.resolve("exp", lookup)
+    assert lookup.calls == 1
+    clock[0] += 6
+    registry.resolve("exp", lookup)
+    assert lookup.calls == 2
+    assert ModelRegistry(missing_ttl=0).resolve("exp", lookup) is None and lookup.calls == 3
+
+
+def test_lookup_racing_an_eviction_is_not_remembered(tmp_path):
+    registry = ModelRegistry(missing_ttl=60)
+    record = {"experiment_id": "exp", "artifact_path": None}
+
+    def lookup(experiment_id):
+        stale = dict(record)
+        # Training finishes between the lookup and the registry noting the miss
+        record["artifact_path"], _ = _artifact(tmp_path)
+        registry.evict(experiment_id)
+        return stale
+
+    assert registry.resolve("exp", lookup) is None
+    assert registry.resolve("exp", lambda _: record) is not None
+
+
+def test_reloads_changed_artifact_and_enforces_budget(tmp_path):
+    paths = [_artifact(tmp_path, f"m{i}.pkl")[0] for i in range(3)]
+    size = os.path.getsize(paths[0])
+    registry = ModelRegistry(budget=2 * size)
+    for i, path in enumerate(paths):
+        assert registry.load({"experiment_id": f"e{i}", "artifact_path": path}) is not None
+    stats = registry.stats()
+    assert stats["models"] == ["e1", "e2"] and stats["evictions"] == 1
+    assert stats["resident_bytes"] <= registry.budget
+    with open(paths[2], "wb") as f:
+        pickle.dump(ConstantModel(7), f)
+    os.utime(paths[2], ns=(0, 1))
+    reloaded = registry.load({"experiment_id": "e2", "artifact_path": paths[2]})
+    assert isinstance(reloaded, ConstantModel) and registry.get("e2") is reloaded
+
+
+def test_concurrent_resolves_load_one_model(tmp_path):
+    path, _ = _artifact(tmp_path)
+    registry = ModelRegistry()
+    lookup = Lookups({"experiment_id": "exp", "artifact_path": path})
+    models = []
+    threads = [threading.Thread(target=lambda: models.append(registry.resolve("exp", lookup))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(model is not None for model in models)
+    assert registry.stats()["models"] == ["exp"]
+    assert registry.resident_bytes == os.path.getsize(path)
+
+
+def test_preload_and_evict(tmp_path):
+    path, _ = _artifact(tmp_path)
+    with open(tmp_path / "placeholder.pkl", "wb") as f:
+        pickle.dump({"not": "a model"}, f)
+    (tmp_path / "corrupt.pkl").write_bytes(b"not a pickle")
+    registry = ModelRegistry()
+    experiments = [
+        {"experiment_id": "e1", "_id": "id1", "artifact_path": path},
+        {"experiment_id": "e2", "artifact_path": str(tmp_path / "placeholder.pkl")},
+        {"experiment_id": "e3", "artifact_path": str(tmp_path / "corrupt.pkl")},
+        {"experiment_id": "e4"},
+    ]
+    assert registry.preload(experiments) == 1
+    stats = registry.stats()
+    assert stats["models"] == ["e1"] and stats["load_errors"] == 1
+    # Evicting by either id drops the model and all its aliases
+    registry.evict("id1")
+    assert registry.get("e1") is None and registry.get("id1") is None
+    assert registry.stats()["resident_bytes"] == 0
@@ -0,0 +1,124 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services import parser_engine
+from src.services.parser_engine import check_schema, csv_engine, read_csv
+
+ENGINES = ["pyarrow", "parallel", "pandas"]
+
+
+def _numbers(rows=2000):
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame({
+        "id": np.arange(rows),
+        "price": rng.rand(rows).round(4),
+        "qty": rng.randint(0, 50, rows),
+        "city": rng.choice(["Paris", "Rome", "Oslo"], rows),
+        "flag": rng.rand(rows) > 0.5,
+        "day": pd.date_range("2024-01-01", periods=rows, freq="h").strftime("%Y-%m-%d"),
+    })
+    df.loc[::17, "price"] = np.nan
+    df.loc[::23, "city"] = None
+    return df.to_csv(index=False).encode()
+
+
+def _late_nulls(rows=2000):
+    # Integers that only turn into floats (a missing value) near the end
+    values = [str(i) for i in range(rows)]
+    values[-3] = ""
+    return ("n,t\n" + "".join(f"{v},x{i}\n" for i, v in enumerate(values))).encode()
+
+
+def _late_text(rows=2000):
+    # Numbers everywhere except one row near the end: one pass infers text
+    values = [str(i) for i in range(rows)]
+    values[-5] = "oops"
+    return ("v\n" + "\n".join(values) + "\n").encode()
+
+
+CASES = {
+    "numbers": _numbers(),
+    "quoted": b'a,b\n1,"x, y"\n2,"multi\nline"\n3,"say ""hi"""\n',
+    "duplicate_headers": b"a,a,b\n1,2,3\n4,5,6\n",
+    "blank_header": b",a\n0,1\n1,2\n",
+    "late_nulls": _late_nulls(),
+    "late_text": _late_text(),
+    "header_only": b"a,b\n",
+    "timestamps": b"t,v\n2024-01-01 10:00:00,1\n2024-01-02 11:30:00,2\n",
+    "empty_text": b"a,b\n1,\n2,x\n,y\n",
+}
+
+
+@pytest.fixture(autouse=True)
+def threads(monkeypatch):
+    # Several byte ranges even for small test files
+    monkeypatch.setattr(parser_engine, "PARSE_THREADS", 4)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("case", CASES)
+def test_matches_pandas_read_csv(case, engine, tmp_path):
+    data = CASES[case]
+    expected = pd.read_csv(io.BytesIO(data))
+    pd.testing.assert_frame_equal(read_csv(data, engine=engine), expected)
+    path = tmp_path / "data.csv"
+    path.write_bytes(data)
+    pd.testing.assert_frame_equal(read_csv(str(path), engine=engine), expected)
+
+
+@pytest.mark.parametrize("engine,parse,own_cases", [
+    ("pyarrow", parser_engine._pyarrow, {"numbers", "quoted", "blank_header", "late_nulls", "late_text",
+                                         "header_only", "timestamps", "empty_text"}),
+    # empty_text: a range where a text column is all null parses as float, so types need one pass
+    ("parallel", parser_engine._parallel, {"numbers", "duplicate_headers", "blank_header", "late_nulls",
+                                           "header_only", "timestamps"}),
+])
+def test_fast_engines_fall_back_only_when_needed(engine, parse, own_cases):
+    # The rest are left to pandas (None): e.g. quoted newlines for byte ranges, repeated headers for pyarrow
+    assert {case for case, data in CASES.items() if parse(data, None) is not None} == own_cases
+
+
+SCHEMA = {"id": "integer", "qty": "float", "city": "category", "flag": "boolean", "day": "datetime", "price": "string"}
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_schema_hints_match_pandas_dtypes(engine):
+    data = _numbers()
+    expected = pd.read_csv(io.BytesIO(data), dtype={"id": "int64", "qty": "float64", "city": "category",
+                                                    "flag": "bool", "price": "object"}, parse_dates=["day"])
+    result = read_csv(data, schema=SCHEMA, engine=engine)
+    pd.testing.assert_frame_equal(result, expected, check_categorical=False)
+    assert list(result["city"].cat.categories) == sorted(expected["city"].dropna().unique())
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_integer_hint_with_missing_values_fails(engine):
+    with pytest.raises(ValueError):
+        read_csv(_late_nulls(), schema={"n": "integer"}, engine=engine)
+
+
+def test_engine_selection(monkeypatch):
+    data = _numbers()
+    assert csv_engine(data) == "pandas"
+    assert csv_engine(data, "parallel") == "parallel"
+    monkeypatch.setattr(parser_engine, "PARALLEL_PARSE_MIN_BYTES", 0)
+    assert csv_engine(data) == "pyarrow"
+    monkeypatch.setattr(parser_engine, "pyarrow_available", lambda: False)
+    assert csv_engine(data) == "parallel"
+    pd.testing.assert_frame_equal(read_csv(data), pd.read_csv(io.BytesIO(data)))
+    with pytest.raises(ValueError, match="requires pyarrow"):
+        read_csv(data, engine="pyarrow")
+    with pytest.raises(ValueError, match="Unsupported CSV engine"):
+        csv_engine(data, "polars")
+
+
+def test_check_schema():
+    assert check_schema(None) is None
+    assert check_schema({1: "float"}) == {"1": "float"}
+    with pytest.raises(ValueError, match="Unsupported type for column a"):
+        check_schema({"a": "str"})
+    with pytest.raises(ValueError, match="must map column names"):
+        check_schema(["a"])
@@ -0,0 +1,157 @@
+import asyncio
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.api import data_api
+from src.services.eda_service import DATASETS, EDAService
+from src.services.pipeline_engine import PipelineStore, check_pipeline, execute_pipeline
+
+
+def _frame(rows=300):
+    rng = np.random.RandomState(0)
+    x = rng.rand(rows) * 10
+    x[rng.rand(rows) < 0.1] = np.nan
+    y = rng.rand(rows)
+    y[rng.rand(rows) < 0.2] = np.nan
+    return pd.DataFrame({
+        "x": x,
+        "city": pd.Series(rng.choice(["Paris", "Rome", "Oslo", ""], rows)).replace("", np.nan),
+        "y": y,
+        "flag": rng.rand(rows) > 0.5,
+        "n": rng.randint(0, 4, rows),
+    })
+
+
+def _run(df, steps):
+    return execute_pipeline(df, check_pipeline({"steps": steps}))["frame"]
+
+
+def test_matches_eager_pandas():
+    df = _frame()
+    result = _run(df, [
+        {"op": "impute", "columns": ["x"], "strategy": "median"},
+        {"op": "filter", "where": ["y:notnull"]},
+        {"op": "scale", "columns": ["x"]},
+        {"op": "impute", "columns": ["city"], "strategy": "mode"},
+        {"op": "encode", "columns": ["city"]},
+        {"op": "cast", "columns": ["flag"], "to": "integer"},
+        {"op": "scale", "columns": ["n"], "method": "minmax"},
+    ])
+    # The same steps, one after another on the whole frame
+    e = df.copy()
+    e["x"] = e["x"].fillna(e["x"].median())
+    e = e[e["y"].notna()].reset_index(drop=True)
+    e["x"] = (e["x"] - e["x"].mean()) / e["x"].std(ddof=0)
+    e["city"] = e["city"].fillna(e["city"].mode().iloc[0])
+    dummies = pd.get_dummies(e["city"], prefix="city")
+    e = pd.concat([e[["x"]], dummies, e[["y", "flag", "n"]]], axis=1)
+    e["flag"] = e["flag"].astype(np.int64)
+    e["n"] = (e["n"] - e["n"].min()) / (e["n"].max() - e["n"].min())
+    pd.testing.assert_frame_equal(result, e)
+
+
+def test_row_operations_after_column_steps():
+    df = _frame()
+    result = _run(df, [
+        {"op": "encode", "columns": ["city"], "method": "ordinal"},
+        {"op": "impute", "strategy": "auto"},
+        {"op": "dedupe", "subset": ["city", "n"], "keep": "last"},
+        {"op": "filter", "where": ["n:in:1|3", "x:gt:2.5"]},
+    ])
+    e = df.copy()
+    categories = sorted(e["city"].dropna().unique())
+    e["city"] = e["city"].map({c: float(i) for i, c in enumerate(categories)})
+    for col in ("x", "city", "y"):
+        e[col] = e[col].fillna(e[col].median())
+    e = e[~e.duplicated(["city", "n"], keep="last")]
+    e = e[e["n"].isin([1, 3]) & (e["x"] > 2.5)].reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, e)
+
+
+def test_cast_and_constant_impute():
+    df = pd.DataFrame({"s": ["1", "2", None, "4"], "b": ["yes", "no", "maybe", None], "d": ["2024-01-02", "bad", None, "2024-03-01"]})
+    result = _run(df, [
+        {"op": "cast", "columns": ["s"], "to": "integer"},
+        {"op": "cast", "columns": ["b"], "to": "boolean"},
+        {"op": "cast", "columns": ["d"], "to": "datetime"},
+        {"op": "impute", "columns": ["s"], "strategy": "constant", "value": 0},
+    ])
+    assert result["s"].tolist() == [1, 2, 0, 4]
+    assert result["b"].tolist()[:2] == [True, False] and result["b"].isna().tolist() == [False, False, True, True]
+    pd.testing.assert_series_equal(result["d"], pd.to_datetime(df["d"], errors="coerce"))
+
+
+@pytest.mark.parametrize("spec, message", [
+    ({"steps": []}, "non-empty"),
+    ({"steps": [{"op": "explode"}]}, "'op' must be one of"),
+    ({"steps": [{"op": "impute", "strategy": "constant"}]}, "needs a 'value'"),
+    ({"steps": [{"op": "filter", "where": ["x:near:1"]}]}, "Invalid filter"),
+    ({"steps": [{"op": "scale", "colums": ["x"]}]}, "unknown option"),
+])
+def test_spec_validation(spec, message):
+    with pytest.raises(ValueError, match=message):
+        check_pipeline(spec)
+
+
+def test_plan_errors_name_the_step():
+    df = _frame()
+    with pytest.raises(ValueError, match=r"Step 0 \(scale\): cannot apply to text column city"):
+        _run(df, [{"op": "scale", "columns": ["city"]}])
+    with pytest.raises(ValueError, match="column not found: z"):
+        _run(df, [{"op": "filter", "where": ["z:gt:1"]}])
+    with pytest.raises(ValueError, match="one-hot encoded by an earlier step"):
+        _run(df, [{"op": "encode", "columns": ["city"]}, {"op": "impute", "columns": ["city"]}])
+    with pytest.raises(ValueError, match="unique column names"):
+        _run(pd.DataFrame([[1, 2]], columns=["a", "a"]), [{"op": "scale"}])
+
+
+def test_plan_and_run_on_a_stored_dataset():
+    DATASETS["pipe"] = _frame()
+    try:
+        steps = check_pipeline({"steps": [{"op": "impute", "columns": ["x"]}, {"op": "filter", "where": ["flag:eq:true"]},
+                                          {"op": "scale", "columns": ["x"]}]})
+        plan = EDAService.plan_pipeline("pipe", steps)
+        assert [stage["stage"] for stage in plan["stages"]] == ["filter", "project"]
+        assert DATASETS.version("pipe") == 1
+        result = EDAService.run_pipeline("pipe", steps)
+        assert result["plan"] == plan
+        assert result["rows_after"] == int(_frame()["flag"].sum()) == len(DATASETS["pipe"])
+        assert DATASETS.version("pipe") == 2
+    finally:
+        del DATASETS["pipe"]
+
+
+def test_plan_endpoint_runs_off_the_event_loop(monkeypatch):
+    DATASETS["pipe"] = _frame()
+    threads = []
+    plan = EDAService.plan_pipeline
+
+    def recording_plan(*args):
+        threads.append(threading.current_thread())
+        return plan(*args)
+
+    monkeypatch.setattr(EDAService, "plan_pipeline", staticmethod(recording_plan))
+
+    async def call():
+        return threading.current_thread(), await data_api.plan_pipeline("pipe", {"steps": [{"op": "scale"}]})
+
+    try:
+        loop_thread, result = asyncio.run(call())
+        assert result["stages"][-1]["stage"] == "project"
+        assert threads and threads[0] is not loop_thread
+    finally:
+        del DATASETS["pipe"]
+
+
+def test_saved_pipelines(tmp_path):
+    store = PipelineStore(str(tmp_path))
+    record = store.save("clean-v1", {"steps": [{"op": "dedupe"}]})
+    assert record["steps"] == [{"op": "dedupe", "subset": None, "keep": "first"}]
+    assert store.get("clean-v1")["steps"] == record["steps"]
+    assert [e["name"] for e in store.entries()] == ["clean-v1"]
+    assert store.delete("clean-v1") and store.get("clean-v1") is None
+    with pytest.raises(ValueError):
+        store.save("../escape", {"steps": [{"op": "dedupe"}]})
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services import dataset_store
+from src.services.dataset_store import ColumnarDatasetStore
+from src.services.query_engine import page_response, query_rows
+
+
+def _frame(rows=1000):
+    rng = np.random.RandomState(0)
+    price = (rng.rand(rows) * 100).round(1)
+    price[rng.rand(rows) < 0.05] = np.nan
+    return pd.DataFrame({
+        "id": np.arange(rows),
+        "price": price,
+        "city": rng.choice(["Paris", "Rome", "Oslo"], rows),
+        "ok": rng.rand(rows) > 0.5,
+        "day": pd.date_range("2024-01-01", periods=rows, freq="h"),
+    })
+
+
+def _all_pages(df, limit, **query):
+    rows, cursor = [], None
+    while True:
+        result = query_rows(df, limit=limit, cursor=cursor, **query)
+        rows.append(result["frame"])
+        cursor = result["next_cursor"]
+        if cursor is None:
+            return pd.concat(rows)
+
+
+QUERIES = [
+    ({"filters": ["price:gt:50", "city:in:Paris|Oslo"]},
+     lambda df: df[(df["price"] > 50) & df["city"].isin(["Paris", "Oslo"])]),
+    ({"filters": ["city:contains:o", "ok:eq:true"]}, lambda df: df[df["city"].str.contains("o") & df["ok"]]),
+    ({"filters": ["price:isnull"]}, lambda df: df[df["price"].isna()]),
+    ({"filters": ["day:ge:2024-01-20", "price:ne:10"]}, lambda df: df[(df["day"] >= "2024-01-20") & (df["price"] != 10) & df["price"].notna()]),
+    ({"sort": "-price,id"}, lambda df: df.sort_values(["price", "id"], ascending=[False, True], kind="mergesort", na_position="last")),
+    ({"filters": ["ok:eq:false"], "sort": "city,-day"},
+     lambda df: df[~df["ok"]].sort_values(["city", "day"], ascending=[True, False], kind="mergesort")),
+]
+
+
+@pytest.mark.parametrize("query, expected", QUERIES)
+def test_pages_match_pandas(query, expected):
+    df = _frame()
+    pd.testing.assert_frame_equal(_all_pages(df, 37, **query), expected(df))
+    first = query_rows(df, offset=5, limit=10, count=True, **query)
+    pd.testing.assert_frame_equal(first["frame"], expected(df).iloc[5:15])
+    assert first["total"] == len(expected(df))
+
+
+def test_projection_and_json_rows():
+    df = _frame()
+    result = query_rows(df, columns="city,price", filters=["price:isnull"], limit=2)
+    body = page_response(result)
+    assert body["columns"] == ["city", "price"]
+    assert body["rows"] == [{"city": c, "price": None} for c in df[df["price"].isna()]["city"].head(2)]
+
+
+def test_zone_maps_skip_blocks_that_cannot_match(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_store, "ZONE_BLOCK_ROWS", 100)
+    store = ColumnarDatasetStore(str(tmp_path))
+    df = _frame()
+    store["d"] = df
+    zones = store.zone_maps("d")
+    result = query_rows(store["d"], zones, store.version("d"), filters=["id:ge:850"], limit=500)
+    assert result["blocks_skipped"] == 8 and result["blocks_scanned"] == 2
+    pd.testing.assert_frame_equal(result["frame"], df[df["id"] >= 850])
+
+
+def test_cursors_are_tied_to_query_and_version():
+    df = _frame()
+    cursor = query_rows(df, version=1, filters=["price:gt:10"], limit=5)["next_cursor"]
+    assert query_rows(df, version=1, filters=["price:gt:10"], limit=5, cursor=cursor)["returned"] == 5
+    with pytest.raises(ValueError, match="stale"):
+        query_rows(df, version=2, filters=["price:gt:10"], limit=5, cursor=cursor)
+    with pytest.raises(ValueError, match="different filter"):
+        query_rows(df, version=1, filters=["price:gt:20"], limit=5, cursor=cursor)
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        query_rows(df, version=1, cursor="%%%")
+
+
+@pytest.mark.parametrize("query, message", [
+    ({"limit": 0}, "limit must be"),
+    ({"offset": -1}, "offset must be"),
+    ({"filters": ["nope:eq:1"]}, "Column not found"),
+    ({"filters": ["price:eq:cheap"]}, "Invalid value"),
+    ({"filters": ["price:between:1"]}, "Invalid filter"),
+])
+def test_invalid_queries(query, message):
+    with pytest.raises(ValueError, match=message):
+        query_rows(_frame(), **query)
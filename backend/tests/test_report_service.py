@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services import report_service
+from src.services.eda_service import DATASETS, EDAService
+from src.services.report_service import ReportJobs, render_fragment, report_fragments
+
+
+def _frame(rows=300, seed=0):
+    rng = np.random.RandomState(seed)
+    df = pd.DataFrame({f"x{i}": rng.rand(rows) * (i + 1) for i in range(5)})
+    df["x1"] = df["x0"] * 2 + rng.rand(rows) * 0.01
+    df["city"] = rng.choice(["Paris", "Rome", "Oslo"], rows)
+    df.loc[::7, "x3"] = np.nan
+    return df
+
+
+@pytest.fixture
+def dataset():
+    DATASETS["report"] = _frame()
+    yield "report"
+    if "report" in DATASETS:
+        del DATASETS["report"]
+
+
+@pytest.fixture
+def jobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_service, "REPORT_DIR", str(tmp_path / "reports"))
+    monkeypatch.setattr(report_service, "_profile_report_html", lambda df: None)
+    jobs = ReportJobs(max_workers=2)
+    yield jobs
+    jobs.shutdown()
+
+
+def _wait(jobs, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while jobs.get(job_id)["status"] in report_service.ACTIVE_STATUSES:
+        assert time.time() < deadline, "report job did not finish"
+        time.sleep(0.05)
+    return jobs.get(job_id)
+
+
+def test_sharded_tables_match_the_baseline_report(dataset, monkeypatch):
+    monkeypatch.setattr(report_service, "REPORT_SHARD_COLUMNS", 2)
+    df = DATASETS[dataset]
+    fragments = report_fragments(dataset)
+    tables = [payload for kind, payload in fragments if kind == "table"]
+    # describe shards, then missing-count shards, then the correlation matrix (as the baseline report)
+    expected = df.describe(include='all')
+    # Shards of numeric columns only have the numeric statistics rows
+    described = pd.concat([t for t in tables if "count" in t.index], axis=1).reindex(expected.index)
+    pd.testing.assert_frame_equal(described, expected, check_exact=False)
+    missing = pd.concat([t for t in tables if list(t.columns) == ["Missing Count"]])
+    pd.testing.assert_frame_equal(missing, df.isnull().sum().to_frame('Missing Count'))
+    pd.testing.assert_frame_equal(tables[-1], df.corr(numeric_only=True), check_exact=False)
+    charts = [payload for kind, payload in fragments if kind == "charts"]
+    assert [[c["column"] for c in shard] for shard in charts] == [["x0", "x1"], ["x2", "x3"], ["x4"], ["city"]]
+    html = "".join(render_fragment(fragment) for fragment in fragments)
+    assert html.startswith("<html>") and html.endswith("</body></html>")
+    assert html.count("<img src=\"data:image/png;base64,") == 6
+
+
+def test_job_writes_report_and_reports_progress(jobs, dataset):
+    job = jobs.submit(dataset)
+    assert job["status"] in ("queued", "running") and not job["cached"]
+    done = _wait(jobs, job["job_id"])
+    assert done["status"] == "completed", done["error"]
+    assert done["progress"]["done"] == done["progress"]["total"] > 0
+    assert done["revision"] >= done["progress"]["total"]
+    with open(jobs.path(job["job_id"]), encoding="utf-8") as f:
+        html = f.read()
+    assert "<h2>Shape</h2><p>300 rows × 6 columns</p>" in html
+    assert [n for n in os.listdir(report_service.REPORT_DIR) if n.endswith(".part")] == []
+    # Reused until the dataset changes
+    cached = jobs.submit(dataset)
+    assert cached["cached"] and cached["status"] == "completed"
+    assert jobs.stats()["cache_hits"] == 1 and jobs.stats()["completed"] == 1
+
+
+def test_new_version_replaces_the_old_report(jobs, dataset):
+    first = _wait(jobs, jobs.submit(dataset)["job_id"])
+    old_path = jobs.path(first["job_id"])
+    EDAService.replace_dataset(dataset, _frame(rows=100, seed=1))
+    second = jobs.submit(dataset)
+    assert not second["cached"] and second["version"] == first["version"] + 1
+    _wait(jobs, second["job_id"])
+    with open(jobs.path(second["job_id"]), encoding="utf-8") as f:
+        assert "100 rows × 6 columns" in f.read()
+    assert not os.path.exists(old_path)
+
+
+def test_concurrent_submits_share_one_job(jobs, dataset, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    real_fragments = report_service.report_fragments
+
+    def blocked(dataset_id):
+        started.set()
+        release.wait(30)
+        return real_fragments(dataset_id)
+    monkeypatch.setattr(report_service, "report_fragments", blocked)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(jobs.submit(dataset))) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert started.wait(30)
+    assert len({job["job_id"] for job in results}) == 1
+    assert jobs.stats()["submitted"] == 1 and jobs.stats()["running"] == 1
+    with pytest.raises(ValueError, match="running"):
+        jobs.path(results[0]["job_id"])
+    release.set()
+    assert _wait(jobs, results[0]["job_id"])["status"] == "completed"
+
+
+def test_failed_job_keeps_no_file(jobs, dataset, monkeypatch):
+    def broken(dataset_id):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(report_service, "report_fragments", broken)
+    job = _wait(jobs, jobs.submit(dataset)["job_id"])
+    assert job["status"] == "failed" and job["error"] == "boom"
+    assert jobs.stats()["failed"] == 1
+    assert os.listdir(report_service.REPORT_DIR) == []
+
+
+def test_invalid_requests(jobs, dataset):
+    with pytest.raises(ValueError, match="Unsupported format"):
+        jobs.submit(dataset, "docx")
+    with pytest.raises(ValueError, match="Dataset not found"):
+        jobs.submit("missing")
+    with pytest.raises(KeyError):
+        jobs.path("nope")
+    assert jobs.get("nope") is None
+
+
+def _block_first_report(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    real_fragments = report_service.report_fragments
+
+    def blocked(dataset_id):
+        if not started.is_set():
+            started.set()
+            release.wait(30)
+        return real_fragments(dataset_id)
+    monkeypatch.setattr(report_service, "report_fragments", blocked)
+    return started, release
+
+
+def test_write_during_generation_fails_the_stale_job(jobs, dataset, monkeypatch):
+    started, release = _block_first_report(monkeypatch)
+    stale = jobs.submit(dataset)
+    assert started.wait(30)
+    EDAService.replace_dataset(dataset, _frame(rows=100, seed=1))
+    current = _wait(jobs, jobs.submit(dataset)["job_id"])
+    assert current["status"] == "completed"
+    release.set()
+    stale = _wait(jobs, stale["job_id"])
+    assert stale["status"] == "failed" and "Dataset changed" in stale["error"]
+    # The stale job neither published its report nor removed the newer one
+    assert os.listdir(report_service.REPORT_DIR) == [os.path.basename(jobs.path(current["job_id"]))]
+
+
+def test_shutdown_cancels_queued_jobs(jobs, dataset, monkeypatch):
+    monkeypatch.setattr(jobs, "max_workers", 1)
+    started, release = _block_first_report(monkeypatch)
+    DATASETS["report2"] = _frame(rows=50)
+    try:
+        running = jobs.submit(dataset)
+        assert started.wait(30)
+        queued = jobs.submit("report2")
+        jobs.shutdown()
+        cancelled = jobs.get(queued["job_id"])
+        assert cancelled["status"] == "cancelled" and cancelled["status"] not in report_service.ACTIVE_STATUSES
+        assert cancelled["revision"] > queued["revision"] and jobs.stats()["cancelled"] == 1
+        with pytest.raises(ValueError, match="cancelled"):
+            jobs.path(queued["job_id"])
+        # The job already running still finishes
+        release.set()
+        assert _wait(jobs, running["job_id"])["status"] == "completed"
+    finally:
+        del DATASETS["report2"]
@@ -0,0 +1,146 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services import script_runner
+from src.services.dataset_store import read_columnar, write_columnar
+from src.services.eda_service import DATASETS, EDAService
+from src.services.script_runner import ScriptLimitExceeded, ScriptPool
+
+SCRIPT = """
+df["total"] = df["price"] * df["qty"]
+df["city"] = df["city"].str.upper()
+df = df[df["qty"] > 2].reset_index(drop=True)
+"""
+
+
+def _frame(rows=500):
+    rng = np.random.RandomState(0)
+    return pd.DataFrame({
+        "price": (rng.rand(rows) * 100).round(2),
+        "qty": rng.randint(1, 10, rows),
+        "city": pd.Categorical(rng.choice(["Paris", "Rome", "Oslo"], rows)),
+    })
+
+
+def baseline_script(df, script):
+    # How /preprocess ran scripts before the sandbox: exec in the API process on a copy
+    local_vars = {"df": df.copy(), "pd": pd}
+    exec(script, {}, local_vars)
+    return local_vars["df"]
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ScriptPool(workers=2, cpu_seconds=60, wall_seconds=60, memory_bytes=512 * 1024 * 1024)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / "source")
+    write_columnar(_frame(), path)
+    return path
+
+
+def _decoded(df):
+    return df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+
+
+def test_result_matches_in_process_exec(pool, source, tmp_path):
+    pool.run(source, SCRIPT, str(tmp_path / "out"))
+    result = read_columnar(str(tmp_path / "out"))
+    expected = baseline_script(_decoded(_frame()), SCRIPT)
+    pd.testing.assert_frame_equal(_decoded(result), expected)
+    # Text the script left alone stays categorical in the store
+    pool.run(source, "df = df.head(10)", str(tmp_path / "head"))
+    assert isinstance(read_columnar(str(tmp_path / "head"))["city"].dtype, pd.CategoricalDtype)
+
+
+def test_script_errors_keep_the_worker(pool, source, tmp_path):
+    restarts = pool.stats()["restarts"]
+    with pytest.raises(ValueError, match="'missing'") as error:
+        pool.run(source, "df = df['missing']", str(tmp_path / "a"))
+    assert not isinstance(error.value, ScriptLimitExceeded)
+    with pytest.raises(ValueError, match="assign the processed DataFrame"):
+        pool.run(source, "df = 1", str(tmp_path / "b"))
+    with pytest.raises(ValueError, match="stop"):
+        pool.run(source, "raise SystemExit('stop')", str(tmp_path / "c"))
+    assert pool.stats()["restarts"] == restarts
+    pool.run(source, SCRIPT, str(tmp_path / "ok"))
+
+
+def test_wall_time_limit_replaces_the_worker(pool, source, tmp_path, monkeypatch):
+    monkeypatch.setattr(pool, "wall_seconds", 1)
+    restarts = pool.stats()["restarts"]
+    with pytest.raises(ScriptLimitExceeded, match="wall time limit"):
+        pool.run(source, "import time\ntime.sleep(30)", str(tmp_path / "out"))
+    assert pool.stats()["restarts"] == restarts + 1
+    assert not (tmp_path / "out").exists()
+    monkeypatch.setattr(pool, "wall_seconds", 60)
+    pool.run(source, SCRIPT, str(tmp_path / "after"))
+
+
+@pytest.mark.skipif(script_runner.resource is None, reason="resource limits are POSIX only")
+def test_cpu_limit(pool, source, tmp_path, monkeypatch):
+    monkeypatch.setattr(pool, "cpu_seconds", 1)
+    with pytest.raises(ScriptLimitExceeded, match="CPU time limit"):
+        pool.run(source, "while True:\n    pass", str(tmp_path / "out"))
+    assert pool.stats()["cpu_limit"] >= 1
+
+
+@pytest.mark.skipif(script_runner.resource is None, reason="resource limits are POSIX only")
+def test_memory_limit(pool, source, tmp_path, monkeypatch):
+    monkeypatch.setattr(pool, "memory_bytes", 64 * 1024 * 1024)
+    with pytest.raises(ScriptLimitExceeded, match="memory limit"):
+        pool.run(source, "block = bytearray(1024 * 1024 * 1024)", str(tmp_path / "out"))
+    # The limit only applied to that job
+    monkeypatch.setattr(pool, "memory_bytes", 512 * 1024 * 1024)
+    pool.run(source, "block = bytearray(128 * 1024 * 1024)", str(tmp_path / "after"))
+
+
+def test_crashed_worker_is_replaced(pool, source, tmp_path):
+    with pytest.raises(ScriptLimitExceeded, match="exit code 3"):
+        pool.run(source, "import os\nos._exit(3)", str(tmp_path / "out"))
+    pool.run(source, SCRIPT, str(tmp_path / "after"))
+
+
+def test_concurrent_jobs(pool, source, tmp_path):
+    errors = []
+
+    def run(i):
+        try:
+            pool.run(source, f"df = df.assign(job={i})", str(tmp_path / f"out{i}"))
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    for i in range(6):
+        assert (read_columnar(str(tmp_path / f"out{i}"))["job"] == i).all()
+    assert pool.stats()["idle"] == pool.workers
+
+
+def test_run_script_stores_the_next_version():
+    DATASETS["script"] = _frame()
+    try:
+        version = DATASETS.version("script")
+        columns = EDAService.run_script("script", SCRIPT)
+        assert columns is None
+        assert DATASETS.version("script") == version + 1
+        expected = baseline_script(_decoded(_frame()), SCRIPT)
+        pd.testing.assert_frame_equal(_decoded(DATASETS["script"]), expected, check_dtype=False)
+        # Same rows: only the touched columns are reported
+        assert EDAService.run_script("script", "df['qty'] = df['qty'] + 1") == \
+            {"added": [], "removed": [], "changed": ["qty"]}
+        with pytest.raises(ValueError, match="boom"):
+            EDAService.run_script("script", "raise ValueError('boom')")
+        assert DATASETS.version("script") == version + 2
+    finally:
+        del DATASETS["script"]
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services.eda_service import DATASETS, EDAService
+from src.services.sketches import HeavyHitters, HyperLogLog, KLLSketch, sketch_dataframe
+
+
+def _frame(rows=20000, seed=0):
+    rng = np.random.RandomState(seed)
+    x = rng.lognormal(size=rows)
+    x[rng.rand(rows) < 0.05] = np.nan
+    return pd.DataFrame({
+        "x": x,
+        "y": 3 * np.nan_to_num(x) + rng.normal(size=rows),
+        "n": rng.randint(0, 1000, rows),
+        "flag": rng.rand(rows) > 0.3,
+        "s": rng.choice(["a", "b", "c", "d"], rows, p=[0.5, 0.3, 0.15, 0.05]),
+        "t": pd.date_range("2024-01-01", periods=rows, freq="min"),
+    })
+
+
+def test_kll_quantiles_within_rank_error():
+    values = np.random.RandomState(1).normal(size=200_000)
+    sketch, other = KLLSketch(seed=0), KLLSketch(seed=1)
+    for chunk in np.array_split(values[:100_000], 7):
+        sketch.update(chunk)
+    other.update(values[100_000:])
+    sketch.merge(other)
+    assert sketch.n == len(values) and (sketch.min, sketch.max) == (values.min(), values.max())
+    ordered = np.sort(values)
+    for q, estimate in zip([0.01, 0.25, 0.5, 0.75, 0.99], sketch.quantiles([0.01, 0.25, 0.5, 0.75, 0.99])):
+        true_rank = np.searchsorted(ordered, estimate) / len(values)
+        assert abs(true_rank - q) <= sketch.rank_error()
+
+
+def test_hll_and_heavy_hitters():
+    rng = np.random.RandomState(2)
+    values = rng.randint(0, 50_000, 300_000)
+    hll = HyperLogLog()
+    for chunk in np.array_split(values, 5):
+        hll.update(chunk)
+    true = len(np.unique(values))
+    assert abs(hll.estimate() - true) <= 3 * hll.relative_error() * true
+
+    series = pd.Series(rng.choice(list("abcdefghij") + [str(i) for i in range(500)], 100_000,
+                                  p=[0.3] + [0.02] * 9 + [0.52 / 500] * 500))
+    hitters = HeavyHitters(k=16)
+    for chunk in np.array_split(series, 4):
+        hitters.update(chunk)
+    top, count = hitters.top()
+    true_counts = series.value_counts()
+    assert top == "a"
+    assert true_counts["a"] - hitters.error <= count <= true_counts["a"]
+
+
+def test_exact_parts_match_pandas():
+    df = _frame()
+    profile = sketch_dataframe(df, chunk_rows=3000).profile()
+    described = df.describe()
+    for col in ("x", "y", "n"):
+        for stat in ("count", "mean", "std", "min", "max"):
+            assert profile["stats"].loc[col, stat] == pytest.approx(described.loc[stat, col], rel=1e-9)
+    pd.testing.assert_series_equal(profile["missing"], df.isnull().sum())
+    pd.testing.assert_frame_equal(profile["corr"], df.corr(numeric_only=True), atol=1e-9, check_exact=False)
+    assert profile["described"]["s"]["top"] == "a" and profile["described"]["s"]["unique"] == 4
+    assert profile["described"]["t"]["min"] == df["t"].min()
+
+
+def test_merged_sketches_equal_one_pass():
+    df = _frame()
+    whole = sketch_dataframe(df, chunk_rows=5000)
+    merged = sketch_dataframe(df.iloc[:7000])
+    merged.merge(sketch_dataframe(df.iloc[7000:]))
+    a, b = whole.profile(), merged.profile()
+    assert a["rows"] == b["rows"] == len(df)
+    pd.testing.assert_frame_equal(a["corr"], b["corr"], atol=1e-9, check_exact=False)
+    for stat in ("count", "mean", "std", "min", "max"):
+        np.testing.assert_allclose(a["stats"][stat], b["stats"][stat], rtol=1e-9)
+    with pytest.raises(ValueError):
+        merged.merge(sketch_dataframe(df[["x", "y"]]))
+    with pytest.raises(ValueError):
+        merged.update(df[["x"]])
+
+
+def test_approx_endpoints_are_close_to_exact():
+    DATASETS["sketch"] = _frame()
+    try:
+        exact = EDAService.analyze_dataset("sketch")
+        approx = EDAService.analyze_dataset("sketch", "approx")
+        bounds = approx["error_bounds"]
+        assert bounds["quantile_rank_error"] > 0
+        ordered = np.sort(_frame()["x"].dropna().to_numpy())
+        for stat, q in (("25%", 0.25), ("50%", 0.5), ("75%", 0.75)):
+            rank = np.searchsorted(ordered, approx["summary"]["x"][stat]) / len(ordered)
+            assert abs(rank - q) <= bounds["quantile_rank_error"]
+        assert approx["summary"]["x"]["mean"] == pytest.approx(exact["summary"]["x"]["mean"])
+        exact_outliers = EDAService.detect_outliers("sketch")["x"]["count"]
+        approx_outliers = EDAService.detect_outliers("sketch", "approx")["x"]
+        assert abs(approx_outliers["count"] - exact_outliers) <= 0.05 * len(ordered)
+        with pytest.raises(ValueError, match="Unsupported mode"):
+            EDAService.analyze_dataset("sketch", "fast")
+    finally:
+        del DATASETS["sketch"]
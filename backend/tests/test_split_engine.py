@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services.eda_service import DATASETS, EDAService
+from src.services.split_engine import check_ratios, split_positions
+
+
+def _frame(rows=1000, seed=0):
+    rng = np.random.RandomState(seed)
+    return pd.DataFrame({
+        "x": rng.rand(rows),
+        "label": rng.choice(["a", "b", "c"], rows, p=[0.7, 0.2, 0.1]),
+        "user": rng.randint(0, 60, rows),
+        "when": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.permutation(rows), unit="h"),
+    })
+
+
+def baseline_split(df, train_ratio):
+    # The old /split: shuffle with seed 42, then cut at int(len * train_ratio)
+    shuffled = df.sample(frac=1, random_state=42)
+    train_size = int(len(shuffled) * train_ratio)
+    return shuffled.iloc[:train_size], shuffled.iloc[train_size:]
+
+
+def _assert_partition(parts, n):
+    rows = np.concatenate(list(parts.values()))
+    assert len(rows) == n and set(rows.tolist()) == set(range(n))
+
+
+@pytest.mark.parametrize("rows,train_ratio", [(1000, 0.8), (10, 0.7), (997, 0.33), (2, 0.5), (10, 1.0), (10, 0.0)])
+def test_random_split_has_the_baseline_rows(rows, train_ratio):
+    df = _frame(rows)
+    parts = split_positions(df, ratios={"train": train_ratio, "test": 1 - train_ratio})
+    train, test = baseline_split(df, train_ratio)
+    assert parts["train"].tolist() == sorted(train.index)
+    assert parts["test"].tolist() == sorted(test.index)
+
+
+def test_stratified_split_keeps_class_shares():
+    df = _frame()
+    ratios = {"train": 0.7, "val": 0.15, "test": 0.15}
+    parts = split_positions(df, "stratified", ratios, column="label")
+    _assert_partition(parts, len(df))
+    counts = df["label"].value_counts()
+    for part, ratio in ratios.items():
+        share = df["label"].iloc[parts[part]].value_counts()
+        for label, total in counts.items():
+            assert abs(share[label] - ratio * total) <= 1
+
+
+def test_group_split_keeps_groups_together():
+    df = _frame()
+    parts = split_positions(df, "group", {"train": 0.8, "test": 0.2}, column="user")
+    _assert_partition(parts, len(df))
+    train_users = set(df["user"].iloc[parts["train"]])
+    assert train_users.isdisjoint(df["user"].iloc[parts["test"]])
+    largest = df["user"].value_counts().max()
+    assert abs(len(parts["train"]) - 800) <= largest
+    with pytest.raises(ValueError, match="fewer groups"):
+        split_positions(df.assign(user=1), "group", {"train": 0.8, "test": 0.2}, column="user")
+
+
+def test_time_split_orders_parts():
+    df = _frame()
+    parts = split_positions(df, "time", {"train": 0.6, "val": 0.2, "test": 0.2}, column="when")
+    _assert_partition(parts, len(df))
+    assert [len(parts[p]) for p in ("train", "val", "test")] == [600, 200, 200]
+    when = df["when"]
+    assert when.iloc[parts["train"]].max() < when.iloc[parts["val"]].min()
+    assert when.iloc[parts["val"]].max() < when.iloc[parts["test"]].min()
+    assert when.iloc[parts["train"]].is_monotonic_increasing
+
+
+@pytest.mark.parametrize("column", [None, "label"])
+def test_kfold(column):
+    df = _frame()
+    parts = split_positions(df, "kfold", column=column, folds=4)
+    tests = [parts[f"fold{i}_test"] for i in range(4)]
+    _assert_partition(dict(enumerate(tests)), len(df))
+    for i, test in enumerate(tests):
+        assert sorted(set(range(len(df))) - set(test.tolist())) == parts[f"fold{i}_train"].tolist()
+        assert len(test) == 250
+        if column:
+            share = df["label"].iloc[test].value_counts()
+            for label, total in df["label"].value_counts().items():
+                assert abs(share[label] - total / 4) <= 1
+
+
+def test_splits_are_reproducible():
+    df = _frame()
+    first = split_positions(df, "stratified", column="label", seed=7)
+    again = split_positions(df, "stratified", column="label", seed=7)
+    other = split_positions(df, "stratified", column="label", seed=8)
+    assert all(np.array_equal(first[p], again[p]) for p in first)
+    assert not np.array_equal(first["train"], other["train"])
+
+
+def test_invalid_options():
+    df = _frame(10)
+    with pytest.raises(ValueError, match="Unsupported split method"):
+        split_positions(df, "bogus")
+    with pytest.raises(ValueError, match="sum to 1"):
+        split_positions(df, ratios={"train": 0.5, "test": 0.4})
+    with pytest.raises(ValueError, match="Unknown split part"):
+        check_ratios({"train": 0.5, "holdout": 0.5})
+    with pytest.raises(ValueError, match="needs a column"):
+        split_positions(df, "stratified")
+    with pytest.raises(ValueError, match="Column not found"):
+        split_positions(df, "time", column="nope")
+    with pytest.raises(ValueError, match="folds must be between 2 and 10"):
+        split_positions(df, "kfold", folds=11)
+    with pytest.raises(ValueError, match="at least 2 rows"):
+        split_positions(df.iloc[:1])
+
+
+def test_parts_are_views_of_the_parent():
+    df = _frame()
+    DATASETS["split"] = df
+    parts = {}
+    try:
+        parts = EDAService.split_dataset("split", ratios={"train": 0.8, "test": 0.2})
+        train, test = baseline_split(df, 0.8)
+        assert (parts["train"]["rows"], parts["test"]["rows"]) == (800, 200)
+        for name, expected in (("train", train), ("test", test)):
+            view = parts[name]["dataset_id"]
+            assert DATASETS.view_of(view)["parent"] == "split"
+            pd.testing.assert_frame_equal(DATASETS[view], expected.sort_index().reset_index(drop=True))
+        # Rewriting the parent leaves the parts as they were split
+        DATASETS["split"] = _frame(seed=1)
+        pd.testing.assert_frame_equal(DATASETS[parts["test"]["dataset_id"]],
+                                      test.sort_index().reset_index(drop=True), check_dtype=False)
+    finally:
+        for part in parts.values():
+            del DATASETS[part["dataset_id"]]
+        del DATASETS["split"]
@@ -0,0 +1,156 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services.eda_service import DATASETS, EDAService
+from src.services.stats_engine import compute_profile, describe_frame, diff_columns, update_profile
+
+
+# --- The pandas computations the EDA endpoints made before the fused profile ---
+
+def _json(value):
+    if isinstance(value, dict):
+        return {k: _json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_json(v) for v in value]
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    return value
+
+
+def baseline_summary(df):
+    return _json(df.describe(include='all').to_dict())
+
+
+def baseline_correlation(df):
+    return df.corr(numeric_only=True).replace({np.nan: None, np.inf: None, -np.inf: None}).to_dict()
+
+
+def baseline_outliers(df):
+    outliers = {}
+    for col in df.select_dtypes(include='number').columns:
+        series = df[col]
+        q1, q3 = series.quantile(0.25), series.quantile(0.75)
+        iqr = q3 - q1
+        mask = (series < q1 - 1.5 * iqr) | (series > q3 + 1.5 * iqr)
+        outliers[col] = {'count': int(mask.sum()), 'indices': series[mask].index.tolist(),
+                         'values': series[mask].replace({np.nan: None, np.inf: None, -np.inf: None}).tolist()}
+    return outliers
+
+
+def baseline_strong_pairs(df):
+    corr = df.corr(numeric_only=True)
+    return [(a, b, f"{corr.loc[a, b]:.2f}") for a in corr.columns for b in corr.columns
+            if a != b and abs(corr.loc[a, b]) > 0.8]
+
+
+def _assert_nested_close(actual, expected):
+    assert type(actual) is type(expected) or (actual is None) == (expected is None)
+    if isinstance(expected, dict):
+        assert list(actual) == list(expected)
+        for key in expected:
+            _assert_nested_close(actual[key], expected[key])
+    elif isinstance(expected, float):
+        assert actual == pytest.approx(expected, rel=1e-9, abs=1e-12)
+    else:
+        assert actual == expected
+
+
+def _infinite_frame():
+    rng = np.random.RandomState(0)
+    x = rng.rand(200)
+    df = pd.DataFrame({"a": x, "b": 2 * x + rng.rand(200) * 0.01, "c": rng.rand(200), "flag": x > 0.5,
+                       "text": rng.choice(["u", "v"], 200)})
+    df.loc[3, "a"] = np.inf
+    df.loc[7, "b"] = -np.inf
+    df.loc[11, "c"] = np.nan
+    return df
+
+
+def _duplicate_frame():
+    rng = np.random.RandomState(1)
+    x = rng.rand(200)
+    values = np.c_[x, 2 * x + rng.rand(200) * 0.1, rng.rand(200), rng.rand(200) * 100]
+    values[[5, 9], 3] = [900, -800]
+    return pd.DataFrame(values, columns=["a", "b", "a", "c"])
+
+
+@pytest.fixture
+def stored():
+    ids = []
+
+    def put(df):
+        dataset_id = f"stats-{len(ids)}"
+        DATASETS[dataset_id] = df
+        ids.append(dataset_id)
+        return dataset_id
+    yield put
+    for dataset_id in ids:
+        del DATASETS[dataset_id]
+
+
+def test_profile_matches_pandas():
+    df = _infinite_frame()
+    profile = compute_profile(df)
+    pd.testing.assert_frame_equal(profile['corr'], df.corr(numeric_only=True), check_exact=False)
+    pd.testing.assert_series_equal(profile['missing'], df.isnull().sum())
+    described = df.describe()
+    for col in ["a", "b", "c"]:
+        np.testing.assert_allclose(profile['stats'].loc[col, described.index].to_numpy(dtype=float),
+                                   described[col].to_numpy(dtype=float), rtol=1e-9)
+
+
+def test_infinite_values_match_baseline_endpoints(stored):
+    df = _infinite_frame()
+    dataset_id = stored(df)
+    correlation = EDAService.correlation_matrix(dataset_id)
+    _assert_nested_close(correlation, baseline_correlation(df))
+    assert correlation["a"]["b"] == pytest.approx(1.0, abs=1e-3)
+    _assert_nested_close(EDAService.analyze_dataset(dataset_id)["summary"], baseline_summary(df))
+    assert EDAService.detect_outliers(dataset_id) == baseline_outliers(df)
+    messages = [i["message"] for i in EDAService.generate_insights(dataset_id)]
+    for a, b, value in baseline_strong_pairs(df):
+        assert f"Columns '{a}' and '{b}' are strongly correlated (corr={value})." in messages
+
+
+def test_duplicate_column_names(stored):
+    df = _duplicate_frame()
+    dataset_id = stored(df)
+    _assert_nested_close(EDAService.analyze_dataset(dataset_id)["summary"], baseline_summary(df))
+    _assert_nested_close(EDAService.correlation_matrix(dataset_id), baseline_correlation(df))
+    # pandas' own loops fail on repeated labels; each label reports its last column, as to_dict does
+    outliers = EDAService.detect_outliers(dataset_id)
+    assert list(outliers) == ["a", "b", "c"]
+    assert outliers["c"]["count"] == 2 and outliers["c"]["indices"] == [5, 9]
+    assert EDAService.generate_insights(dataset_id)
+    tables = EDAService.analysis_tables(dataset_id)
+    assert list(tables["summary"]["column"]) == ["a", "b", "a", "c"]
+
+
+def test_describe_frame_subset_by_name():
+    df = _infinite_frame()
+    profile = compute_profile(df)
+    pd.testing.assert_frame_equal(describe_frame(df[["c", "text"]], profile), df[["c", "text"]].describe(include='all'),
+                                  check_exact=False)
+
+
+def test_update_profile_matches_full_recompute():
+    df = _infinite_frame()
+    profile = compute_profile(df)
+    changed = df.assign(c=df["c"] * 3 + np.where(np.arange(len(df)) == 20, np.inf, 0))
+    diff = diff_columns(df, changed)
+    assert diff["changed"] == ["c"]
+    updated = update_profile(profile, changed, diff["unchanged"])
+    fresh = compute_profile(changed)
+    pd.testing.assert_frame_equal(updated['corr'], fresh['corr'], check_exact=False)
+    pd.testing.assert_frame_equal(updated['stats'], fresh['stats'], check_exact=False)
+    pd.testing.assert_frame_equal(updated['corr'], changed.corr(numeric_only=True), check_exact=False)
+
+
+def test_diff_columns():
+    df = pd.DataFrame({"a": [1, 2], "b": [1.0, np.nan], "c": ["x", "y"]})
+    new = df.assign(b=[1.0, 2.0]).drop(columns="c").assign(d=1)
+    assert diff_columns(df, new) == {"added": ["d"], "removed": ["c"], "changed": ["b"], "unchanged": ["a"]}
+    assert diff_columns(df, df.iloc[:1]) is None
@@ -0,0 +1,139 @@
+import logging
+import os
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services import training_service
+from src.services.training_service import TrainingQueueFull, TrainingScheduler, fit_experiment
+
+CONFIG = {"task": "classification", "algorithm": "logistic_regression", "target": "target"}
+
+
+def _frame(rows=200):
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame({"a": rng.rand(rows), "b": rng.rand(rows)})
+    df["target"] = (df["a"] + df["b"] > 1).astype(int)
+    return df
+
+
+class FakePool:
+    """Process pool stand-in whose futures the test resolves"""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_running_or_notify_cancel()
+        self.futures.append((future, args))
+        return future
+
+    def finish(self, index, tmp_path):
+        future, args = self.futures[index]
+        with open(args[2], "wb") as f:
+            f.write(b"model")
+        future.set_result({"artifact_path": args[2], "metrics": {}, "features": ["a"], "training_seconds": 0.0})
+
+
+@pytest.fixture
+def scheduler(tmp_path, monkeypatch):
+    monkeypatch.setattr(training_service, "ARTIFACT_DIR", str(tmp_path))
+    scheduler = TrainingScheduler(max_workers=1, max_queue=2)
+    pool = FakePool()
+    monkeypatch.setattr(scheduler, "_pool", lambda: pool)
+    scheduler.pool = pool
+    yield scheduler
+    scheduler.shutdown()
+
+
+def _recorder():
+    updates = []
+    return updates, lambda job: updates.append((job["job_id"], job["status"]))
+
+
+def test_queue_limit_cancel_and_order(scheduler, tmp_path):
+    updates, on_update = _recorder()
+    jobs = [scheduler.submit(f"e{i}", _frame(), CONFIG, on_update) for i in range(3)]
+    assert [j["status"] for j in jobs] == ["training", "queued", "queued"]
+    assert scheduler.get("e2")["queue_position"] == 2
+    with pytest.raises(TrainingQueueFull):
+        scheduler.submit("e3", _frame(), CONFIG, on_update)
+    with pytest.raises(ValueError):
+        scheduler.submit("e0", _frame(), CONFIG, on_update)
+    assert scheduler.cancel("e2")["status"] == "cancelled"
+    scheduler.pool.finish(0, tmp_path)
+    scheduler.pool.finish(1, tmp_path)
+    scheduler.flush()
+    assert os.path.exists(tmp_path / "model_e0.pkl") and os.path.exists(tmp_path / "model_e1.pkl")
+    for job in jobs:
+        statuses = [status for job_id, status in updates if job_id == job["job_id"]]
+        assert statuses == (["queued", "cancelled"] if job is jobs[2] else ["queued", "training", "complete"])
+    stats = scheduler.stats()
+    assert (stats["completed"], stats["cancelled"], stats["rejected"], stats["running"]) == (2, 1, 1, 0)
+
+
+def test_callbacks_run_off_the_caller_and_without_the_lock(scheduler, tmp_path):
+    release = threading.Event()
+    seen = []
+
+    def on_update(job):
+        seen.append((threading.current_thread(), job["status"]))
+        # A slow callback (a database write) must not hold up the scheduler
+        release.wait(5)
+
+    job = scheduler.submit("e0", _frame(), CONFIG, on_update)
+    other = scheduler.submit("e1", _frame(), CONFIG)
+    assert scheduler.stats()["queue_depth"] == 1
+    assert scheduler.cancel(other["job_id"])["status"] == "cancelled"
+    scheduler.pool.finish(0, tmp_path)
+    assert scheduler.get(job["job_id"])["status"] == "complete"
+    release.set()
+    scheduler.flush()
+    assert [status for _, status in seen] == ["queued", "training", "complete"]
+    assert all(thread is not threading.current_thread() for thread, _ in seen)
+
+
+def test_failing_callback_is_logged(scheduler, caplog):
+    def on_update(job):
+        raise RuntimeError("database down")
+
+    with caplog.at_level(logging.ERROR, logger=training_service.__name__):
+        scheduler.submit("e0", _frame(), CONFIG, on_update)
+        scheduler.flush()
+    assert "Training status callback failed" in caplog.text
+
+
+def test_failed_fit_is_reported(scheduler):
+    updates, on_update = _recorder()
+    scheduler.submit("e0", _frame(), CONFIG, on_update)
+    scheduler.pool.futures[0][0].set_exception(ValueError("Target column 'x' not found"))
+    scheduler.flush()
+    assert scheduler.get("e0")["error"] == "Target column 'x' not found"
+    assert [status for _, status in updates] == ["queued", "training", "failed"]
+
+
+def test_worker_process_fit_matches_in_process_fit(tmp_path, monkeypatch):
+    monkeypatch.setattr(training_service, "ARTIFACT_DIR", str(tmp_path))
+    expected = fit_experiment(_frame(), CONFIG, str(tmp_path / "direct.pkl"))
+    scheduler = TrainingScheduler(max_workers=1)
+    done = threading.Event()
+    updates = []
+
+    def on_update(job):
+        updates.append(job)
+        if job["status"] not in ("queued", "training"):
+            done.set()
+
+    try:
+        scheduler.submit("e0", _frame(), CONFIG, on_update)
+        assert done.wait(120)
+    finally:
+        scheduler.shutdown()
+    result = updates[-1]["result"]
+    assert updates[-1]["status"] == "complete"
+    assert result["metrics"] == expected["metrics"] and result["features"] == ["a", "b"]
+    assert result["artifact_path"] == str(tmp_path / "model_e0.pkl") and os.path.exists(result["artifact_path"])
@@ -774,9 +774,9 @@ Notes:
       const data = await res.json();
       console.log('Training response:', data);
       if (data.success) {
-        setTrainingStatus('Training completed!');
+        setTrainingStatus('Training queued');
         setTrainingProgress(100);
-        toast({ title: 'Training completed!', description: `Experiment ${exp.experiment_id} has been trained successfully.` });
+        toast({ title: 'Training started!', description: `Experiment ${exp.experiment_id} is ${data.status}; results appear when it completes.` });
         
         // Wait for backend to complete training, then refresh to get the updated status and metrics
         setTimeout(async () => {